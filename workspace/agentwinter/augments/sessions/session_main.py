@@ -5,9 +5,11 @@ import readline
 import sys
 from ...core.config import get_anthropic_client, get_embedding_model, get_db_url, COLORS
 from ...indexing.auto_refresh import auto_refresh
-from ...core.context import build_full_context
-from ...indexing.parser import parse_all_files
-from ...indexing.indexer import build_index
+from ...core.main import (
+    get_parse_workers,
+    rebuild_context_and_index,
+    handle_file_changes,
+)
 from ...indexing.file_watcher import FileWatcher
 from ...indexing.cache import get_cache_stats, clear_all_caches
 from .session_config import get_redis_client
@@ -15,48 +17,14 @@ from .session_manager import SessionManager, generate_session_id
 from .session_query import process_query
 
 
-def rebuild_context_and_index():
-    """Rebuild context, parsed files, and symbol index"""
-    context = build_full_context()
-    parsed_files, parsed_count, total_files = parse_all_files()
-    symbol_index = build_index(parsed_files)
-    return context, parsed_files, symbol_index
-
-
-def handle_file_change(
-    file_path, event_type, context_ref, parsed_files_ref, symbol_index_ref
-):
-    """Handle file change events"""
-    print(f"\n{COLORS['YELLOW']}📝 {event_type.title()}: {file_path}{COLORS['RESET']}")
-    print(f"{COLORS['CYAN']}🔄 Re-parsing...{COLORS['RESET']}")
-
-    try:
-        # Re-parse all files
-        new_context, new_parsed_files, new_symbol_index = rebuild_context_and_index()
-
-        # Update references (can't reassign, must modify in place)
-        context_ref["value"] = new_context
-        parsed_files_ref.clear()
-        parsed_files_ref.update(new_parsed_files)
-        symbol_index_ref.clear()
-        symbol_index_ref.update(new_symbol_index)
-
-        print(
-            f"{COLORS['GREEN']}✅ Updated! ({len(new_symbol_index)} symbols){
-                COLORS['RESET']
-            }\n"
-        )
-    except Exception as e:
-        print(f"{COLORS['RED']}⚠️  Re-parse failed: {e}{COLORS['RESET']}\n")
-
-
 def main():
     """Main entry point with session persistence"""
     # Check for --watch flag
     watch_mode = "--watch" in sys.argv
+    parse_workers = get_parse_workers()
 
     # Initial setup
-    context, parsed_files, symbol_index = rebuild_context_and_index()
+    context, parsed_files, symbol_index = rebuild_context_and_index(parse_workers)
 
     # Auto-refresh CocoIndex and static docs
     auto_refresh()
@@ -74,8 +42,8 @@ def main():
 
             watcher = FileWatcher(
                 watch_path="src/",
-                on_change_callback=lambda path, event: handle_file_change(
-                    path, event, context_ref, parsed_files, symbol_index
+                on_batch_callback=lambda changes: handle_file_changes(
+                    changes, context_ref, parsed_files, symbol_index
                 ),
             )
             watcher.start()
@@ -112,10 +80,14 @@ def main():
             if query == "!refresh":
                 print(f"{COLORS['CYAN']}🔄 Refreshing...{COLORS['RESET']}")
                 if watch_mode:
-                    context, parsed_files, symbol_index = rebuild_context_and_index()
+                    context, parsed_files, symbol_index = rebuild_context_and_index(
+                        parse_workers
+                    )
                     context_ref["value"] = context
                 else:
-                    context, parsed_files, symbol_index = rebuild_context_and_index()
+                    context, parsed_files, symbol_index = rebuild_context_and_index(
+                        parse_workers
+                    )
                 print(f"{COLORS['GREEN']}✅ Refreshed!{COLORS['RESET']}")
                 continue
                 
@@ -141,7 +113,45 @@ def main():
                 print(f"{COLORS['CYAN']}📊 Cache Statistics:{COLORS['RESET']}")
                 print(f"  Parse cache: {stats['parse_cache_size']} files")
                 print(f"  Search cache: {stats['search_cache_size']} queries")
+                semantic = stats["semantic_cache"]
+                print(
+                    f"  Similar-query cache: {semantic['entries']} queries, "
+                    f"{semantic['hits']} hits (cosine >= {semantic['threshold']})"
+                )
                 print(f"  Embedding cache: {stats['embedding_cache_size']} embeddings")
+                for name, cache in stats["caches"].items():
+                    print(
+                        f"    {name}: {cache['entries']} entries, "
+                        f"{cache['bytes'] // 1024} KB, {cache['hits']} hits, "
+                        f"{cache['misses']} misses, {cache['evictions']} evicted"
+                    )
+                for store in stats["query_embeddings"]:
+                    print(
+                        f"  Query embeddings on disk: {store['entries']}/"
+                        f"{store['capacity']} ({store['hits']} reused, "
+                        f"{store['misses']} encoded)"
+                    )
+                shared = stats["redis"]
+                state = "connected" if shared["connected"] else "not connected"
+                print(
+                    f"  Redis (shared): {state}, {shared['hits']} hits, "
+                    f"{shared['misses']} misses, {shared['writes']} writes"
+                )
+                print(
+                    f"  Facts store: {stats['facts_store_size']} files "
+                    f"({stats['facts_store_hits']} reused, "
+                    f"{stats['facts_store_misses']} re-parsed)"
+                )
+                partial = stats["header_only_files"]
+                skipped = stats["skipped_files"]
+                if partial or skipped:
+                    print(
+                        f"  {COLORS['YELLOW']}⚠️  Partially indexed: "
+                        f"{len(partial)} header-only, {len(skipped)} skipped"
+                        f"{COLORS['RESET']}"
+                    )
+                    for path, reason in list({**partial, **skipped}.items())[:10]:
+                        print(f"    • {path.replace('src/', '')} ({reason})")
                 continue
 
             if query == "!clear-cache":
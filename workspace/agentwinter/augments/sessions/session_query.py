@@ -3,7 +3,7 @@
 import os
 import json
 import time
-from ...capabilities import TOOLS, execute_tool
+from ...capabilities import TOOLS, execute_tool, get_tool_memo_stats
 from ...core.config import COLORS
 from ...indexing.cache import get_cache_stats
 
@@ -47,6 +47,7 @@ def process_query(
 ):
     """Process a user query with LLM and tools (with session persistence)"""
     start_time = time.time()
+    memo_before = get_tool_memo_stats()
     print(f"\n{COLORS['CYAN']}🤖 Processing: {query_text[:60]}...{COLORS['RESET']}")
 
     # Load existing messages from session
@@ -150,8 +151,8 @@ PROJECT CONTEXT:
 
 Parsed: {len(symbol_index)} symbols from {len(parsed_files)} files.
 
-Available tools: find_usages, list_stores, list_components, semantic_search,
-run_shell_command, view, git_log, git_blame, git_recent_changes,
+Available tools: find_usages, code_search, impact_analysis, list_stores,
+list_components, semantic_search, run_shell_command, view, git_log, git_blame, git_recent_changes,
 git_contributors, git_diff, dependency_graph, format_code
 
 Use tools strategically. For planning questions: explore → findings → plan → visual tree → approve.
@@ -270,7 +271,17 @@ For simple queries: just answer.""",
             stats['search_cache_size']
         } queries{COLORS['RESET']}"
 
-    print(f"{timing_str}{cache_str}")
+    memo = get_tool_memo_stats()
+    memo_hits = memo["hits"] - memo_before["hits"]
+    memo_str = ""
+    if memo_hits:
+        saved = memo["seconds_saved"] - memo_before["seconds_saved"]
+        memo_str = (
+            f" {COLORS['GREEN']}| ♻️  {memo_hits} tool results reused "
+            f"(saved {saved:.2f}s){COLORS['RESET']}"
+        )
+
+    print(f"{timing_str}{cache_str}{memo_str}")
     print()
 
     return final_text
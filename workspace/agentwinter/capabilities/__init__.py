@@ -1,6 +1,15 @@
 """Tool registry and execution"""
 
+import json
+import threading
+import time
+
+from ..indexing.cache import tool_cache
+from ..indexing.discovery import index_lock
+from ..indexing.shared_cache import index_generation
 from .find_usages import find_usages
+from .code_search import code_search
+from .impact_analysis import impact_analysis
 from .list_stores import list_stores
 from .list_components import list_components
 from .semantic_search import semantic_search
@@ -14,12 +23,13 @@ from .git_history import (
     git_recent_changes,
     git_contributors,
     git_diff,
+    git_state,
 )
 
 TOOLS = [
     {
         "name": "find_usages",
-        "description": "Find where a symbol is defined/used. Use for: 'where is X used', 'what uses X', 'find X'.",
+        "description": "Find where a symbol is defined/used, with file:line locations and snippets. Case-insensitive; on a miss returns the closest symbol names. Use for: 'where is X used', 'what uses X', 'find X'.",
         "input_schema": {
             "type": "object",
             "properties": {
@@ -31,6 +41,47 @@ TOOLS = [
             "required": ["symbol"],
         },
     },
+    {
+        "name": "code_search",
+        "description": "Search source text (literal or regex) and get file:line matches, like grep but in-process and indexed. Use for: 'where does the string X appear', 'find TODOs', 'grep for X'. Prefer this over run_shell_command grep.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Text or regex to find (matched within single lines)",
+                },
+                "regex": {"type": "boolean", "default": False},
+                "case_sensitive": {"type": "boolean", "default": False},
+                "path": {
+                    "type": "string",
+                    "description": "Only search under this path (e.g., 'features/auth')",
+                },
+                "max_results": {"type": "integer", "default": 50},
+            },
+            "required": ["query"],
+        },
+    },
+    {
+        "name": "impact_analysis",
+        "description": "Blast radius in one call: every file that transitively imports (dependents) or is imported by (dependencies) a file or symbol, grouped by feature, plus import cycles. Use for: 'what breaks if I change X', 'what depends on X', 'impact of changing X'.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "target": {
+                    "type": "string",
+                    "description": "Symbol (e.g., 'authStore') or file path (e.g., 'features/auth/store/authStore.ts')",
+                },
+                "direction": {
+                    "type": "string",
+                    "enum": ["dependents", "dependencies", "both"],
+                    "default": "dependents",
+                },
+                "max_results": {"type": "integer", "default": 50},
+            },
+            "required": ["target"],
+        },
+    },
     {
         "name": "list_stores",
         "description": "List all stores. Use for: 'show stores', 'list stores', 'what stores exist'.",
@@ -144,7 +195,7 @@ TOOLS = [
     },
     {
         "name": "dependency_graph",
-        "description": "Generate visual dependency graphs. Use for: 'show dependency graph', 'visualize dependencies', 'graph architecture'. Creates mermaid diagrams.",
+        "description": "Generate visual dependency graphs. Use for: 'show dependency graph', 'visualize dependencies', 'graph architecture'. Creates mermaid (or DOT/JSON) diagrams that stay small on big repos.",
         "input_schema": {
             "type": "object",
             "properties": {
@@ -157,6 +208,15 @@ TOOLS = [
                     "type": "string",
                     "description": "Target name (feature name like 'proximity', or store name like 'authStore')",
                 },
+                "format": {
+                    "type": "string",
+                    "enum": ["mermaid", "dot", "json"],
+                    "description": "Output format (default: mermaid). 'json' is compact adjacency lists - cheapest to read",
+                },
+                "max_nodes": {
+                    "type": "integer",
+                    "description": "Node budget (default: 40). Larger graphs are grouped by directory and the least connected nodes dropped",
+                },
             },
             "required": ["graph_type"],
         },
@@ -185,14 +245,139 @@ TOOLS = [
 ]
 
 
+# Tools whose result depends only on their input and repository state, so it
+# is reused (via tool_cache) until that state changes. Index tools read the
+# indexed sources (state: the index generation), git tools read .git (state:
+# HEAD and refs, plus the file itself for blame).
+INDEX_TOOLS = {
+    "find_usages",
+    "code_search",
+    "impact_analysis",
+    "list_stores",
+    "list_components",
+    "dependency_graph",
+    "run_treesitter_query",
+}
+GIT_TOOLS = {"git_log", "git_blame", "git_diff", "git_contributors"}
+
+# Memoization counters for the per-query stats line
+_memo_lock = threading.Lock()
+_memo_stats = {"hits": 0, "misses": 0, "seconds_saved": 0.0}
+
+
+def get_tool_memo_stats():
+    """Memoized tool hits/misses and run time saved, since startup"""
+    with _memo_lock:
+        return dict(_memo_stats)
+
+
+def _count(hit, seconds=0.0):
+    with _memo_lock:
+        _memo_stats["hits" if hit else "misses"] += 1
+        _memo_stats["seconds_saved"] += seconds
+
+
+def _normalize_input(tool_name, tool_input):
+    """tool_input with schema defaults filled in, so {'file_path': x} and
+    {'file_path': x, 'limit': 10} share one entry"""
+    schema = next((t["input_schema"] for t in TOOLS if t["name"] == tool_name), {})
+    normalized = {
+        name: prop["default"]
+        for name, prop in schema.get("properties", {}).items()
+        if "default" in prop
+    }
+    normalized.update((k, v) for k, v in tool_input.items() if v is not None)
+    return normalized
+
+
+def _repo_state(tool_name, tool_input, parsed_files):
+    """State token the tool's result depends on (None: don't memoize)"""
+    if tool_name in GIT_TOOLS:
+        blamed = tool_input.get("file_path") if tool_name == "git_blame" else None
+        # log and blame only read HEAD; diff takes any revision, and
+        # contributors runs shortlog --all
+        all_refs = tool_name in ("git_diff", "git_contributors")
+        return git_state(blamed, all_refs)
+    if tool_name in INDEX_TOOLS:
+        # Most index tools read parsed_files, which is empty until indexed
+        if parsed_files or tool_name in ("code_search", "run_treesitter_query"):
+            return index_generation()
+    return None
+
+
 def execute_tool(
     tool_name, tool_input, symbol_index, parsed_files, embedding_model, db_url
 ):
-    """Execute a tool by name"""
+    """Execute a tool by name (deterministic tools are memoized)"""
+    if tool_name in INDEX_TOOLS:
+        # Not during a watcher batch: its generation is bumped before the
+        # indexes are updated, and a result read in between would be cached
+        # under the new generation
+        with index_lock:
+            return _execute_memoized(
+                tool_name,
+                tool_input,
+                symbol_index,
+                parsed_files,
+                embedding_model,
+                db_url,
+            )
+    return _execute_memoized(
+        tool_name, tool_input, symbol_index, parsed_files, embedding_model, db_url
+    )
+
+
+def _execute_memoized(
+    tool_name, tool_input, symbol_index, parsed_files, embedding_model, db_url
+):
+    """Reuse a result computed under the same repo state, else run the tool"""
+    state = _repo_state(tool_name, tool_input, parsed_files)
+    if state is None:
+        return _run_tool(
+            tool_name, tool_input, symbol_index, parsed_files, embedding_model, db_url
+        )
+
+    normalized = json.dumps(_normalize_input(tool_name, tool_input), sort_keys=True)
+    key = f"{tool_name}:{state}:{normalized}"
+    cached = tool_cache.get(key)
+    if cached is not None:
+        _count(True, cached["seconds"])
+        return cached["result"]
+
+    start = time.perf_counter()
+    result = _run_tool(
+        tool_name, tool_input, symbol_index, parsed_files, embedding_model, db_url
+    )
+    _count(False)
+    if isinstance(result, dict) and "error" not in result:
+        tool_cache.put(key, {"result": result, "seconds": time.perf_counter() - start})
+    return result
+
+
+def _run_tool(
+    tool_name, tool_input, symbol_index, parsed_files, embedding_model, db_url
+):
+    """Run a tool, uncached"""
     if tool_name == "find_usages":
-        return find_usages(tool_input["symbol"], symbol_index)
+        return find_usages(tool_input["symbol"], symbol_index, parsed_files)
+    elif tool_name == "code_search":
+        return code_search(
+            tool_input["query"],
+            tool_input.get("regex", False),
+            tool_input.get("case_sensitive", False),
+            tool_input.get("path"),
+            tool_input.get("max_results", 50),
+        )
+    elif tool_name == "impact_analysis":
+        return impact_analysis(
+            tool_input["target"],
+            symbol_index,
+            parsed_files,
+            tool_input.get("direction", "dependents"),
+            tool_input.get("max_results", 50),
+        )
     elif tool_name == "list_stores":
-        return list_stores(symbol_index)
+        return list_stores(symbol_index, parsed_files)
     elif tool_name == "list_components":
         return list_components(symbol_index, parsed_files)
     elif tool_name == "semantic_search":
@@ -233,7 +418,12 @@ def execute_tool(
         )
     elif tool_name == "dependency_graph":
         return dependency_graph(
-            tool_input["graph_type"], tool_input.get("target")
+            tool_input["graph_type"],
+            tool_input.get("target"),
+            symbol_index,
+            parsed_files,
+            fmt=tool_input.get("format", "mermaid"),
+            max_nodes=tool_input.get("max_nodes", 40),
         )
     elif tool_name == "format_code":
         return format_code(
@@ -0,0 +1,46 @@
+"""Literal/regex search over src/ using the in-memory trigram index"""
+
+import os
+import re
+
+from ..indexing.discovery import get_manifest
+from ..indexing.text_index import MAX_RESULTS, get_text_index
+
+
+def code_search(
+    query, regex=False, case_sensitive=False, path=None, max_results=MAX_RESULTS
+):
+    """Find lines matching query, with file:line results (grep without a shell)"""
+    if not query:
+        return {"error": "Empty query"}
+
+    path_prefix = None
+    if path:
+        root = get_manifest().root
+        path_prefix = path if path.startswith(root) else os.path.join(root, path)
+        # A directory shouldn't also match its siblings (auth vs auth1)
+        if os.path.isdir(path_prefix):
+            path_prefix = os.path.join(path_prefix, "")
+
+    try:
+        matches, total = get_text_index().search(
+            query,
+            regex=regex,
+            case_sensitive=case_sensitive,
+            path_prefix=path_prefix,
+            max_results=max_results,
+        )
+    except re.error as e:
+        return {"error": f"Invalid regex: {e}"}
+    except RuntimeError as e:
+        return {"error": str(e)}
+
+    return {
+        "query": query,
+        "total": total,
+        "truncated": total > len(matches),
+        "matches": [
+            {"file": filepath.replace("src/", ""), "line": line, "text": text}
+            for filepath, line, text in matches
+        ],
+    }
@@ -1,11 +1,15 @@
-"""Dependency graph visualization with mermaid"""
+"""Dependency graph visualization (Mermaid, DOT or JSON)"""
 
-import os
-from collections import defaultdict
+from collections import Counter, defaultdict
+
+from ..indexing.import_graph import build_graph, feature_of, get_import_graph
+from ..indexing.indexer import list_symbols_by_type
+from ..indexing.resolver import get_resolver
+from .graph_render import MAX_BYTES, MAX_NODES, render_graph
 
 
 def build_import_graph(parsed_files):
-    """Build dependency graph from parsed files
+    """Build dependency graph from parsed files, as plain data
 
     Returns:
         dict: {
@@ -15,287 +19,202 @@ def build_import_graph(parsed_files):
             'stores': {store_name: file},
             'components': {component_name: file}
         }
+
+    The tools read the long-lived ImportGraph (get_import_graph) instead;
+    this is for callers that want a snapshot.
     """
+    import_graph = build_graph(parsed_files)
     graph = {
-        "nodes": [],
+        "nodes": list(parsed_files),
         "edges": [],
         "features": defaultdict(list),
         "stores": {},
         "components": {},
     }
 
-    # Build node list and categorize files
     for filepath, facts in parsed_files.items():
-        graph["nodes"].append(filepath)
-
-        # Categorize by feature
-        if "features/" in filepath:
-            parts = filepath.split("features/")[1].split("/")
-            if len(parts) > 0:
-                feature = parts[0]
-                graph["features"][feature].append(filepath)
+        feature = feature_of(filepath)
+        if feature:
+            graph["features"][feature].append(filepath)
 
         # Identify stores
         if "/store/" in filepath or "Store" in filepath:
-            for store in facts.get("stores", []):
+            for store in facts.stores:
                 graph["stores"][store] = filepath
 
         # Identify components
-        for component in facts.get("components", []):
+        for component in facts.components:
             graph["components"][component] = filepath
 
-    # Build edges from imports
-    for filepath, facts in parsed_files.items():
-        imports = facts.get("imports", [])
-
-        for imp in imports:
-            # Try to resolve import to actual file
-            target_file = resolve_import(imp, filepath, parsed_files)
-            if target_file and target_file in graph["nodes"]:
-                graph["edges"].append((filepath, target_file))
+        graph["edges"].extend(
+            (filepath, target)
+            for target in import_graph.imports_of(filepath)
+            if target in parsed_files
+        )
 
     return graph
 
 
-def resolve_import(import_dict, source_file, parsed_files):
-    """Try to resolve an import dict to an actual file
+def resolve_import(import_ref, source_file, parsed_files):
+    """Resolve an ImportRef to a parsed file, or None
 
-    import_dict example: {'name': 'createStore', 'from': 'solid-js/store'}
+    import_ref example: ImportRef('useAuth', '../hooks/useAuth')
+    External packages ('solid-js/store') resolve to None.
     """
-    if not isinstance(import_dict, dict):
-        return None
-
-    import_path = import_dict.get("from", "")
-    if not import_path:
-        return None
-
-    # Skip external imports (node_modules, external libraries)
-    if not import_path.startswith(".") and not import_path.startswith("src/"):
-        return None
-
-    # Simple resolution - check if any parsed file matches
-    for filepath in parsed_files.keys():
-        # Check if import path matches file path
-        if import_path in filepath:
-            return filepath
+    target_file = get_resolver().resolve(import_ref.source, source_file)
+    return target_file if target_file in parsed_files else None
 
-        # Handle relative imports
-        if import_path.startswith("."):
-            # Try to resolve relative to source file
-            import_parts = import_path.split("/")
-            for part in import_parts:
-                if part in filepath:
-                    return filepath
 
-        # Check if the imported name matches filename
-        import_name = import_path.split("/")[-1]
-        if import_name in filepath:
-            return filepath
+def _node_id(filepath):
+    return filepath.replace("src/", "", 1)
 
-    return None
 
-
-def generate_feature_graph(feature_name, graph):
-    """Generate mermaid graph for a specific feature
+def generate_feature_graph(feature_name, graph, **render):
+    """Diagram of one feature's files and the features they import
 
     Args:
         feature_name: Name of feature (e.g., 'proximity', 'auth')
-        graph: Full dependency graph from build_import_graph
+        graph: ImportGraph (get_import_graph)
+        **render: render_graph options (fmt, max_nodes, max_bytes)
 
     Returns:
-        str: Mermaid diagram syntax
+        dict: render_graph result, or {'error': ...}
     """
-    if feature_name not in graph["features"]:
-        return f"Error: Feature '{feature_name}' not found"
-
-    feature_files = graph["features"][feature_name]
-
-    # Find external dependencies
-    external_deps = defaultdict(list)
-    internal_edges = []
-
-    for src, dst in graph["edges"]:
-        if src in feature_files:
-            if dst in feature_files:
-                internal_edges.append((src, dst))
-            else:
-                # External dependency
-                if "features/" in dst:
-                    ext_feature = dst.split("features/")[1].split("/")[0]
-                    if ext_feature not in external_deps:
-                        external_deps[ext_feature] = []
-                    external_deps[ext_feature].append(dst)
-
-    # Generate mermaid
-    mermaid = ["graph TD"]
-    mermaid.append(f"    {feature_name}[{feature_name.title()} Feature]")
-    mermaid.append("")
-
-    # Add external dependencies
-    for ext_feature in external_deps.keys():
-        node_id = ext_feature.replace("-", "_")
-        mermaid.append(f"    {node_id}[{ext_feature.title()}]")
-        mermaid.append(f"    {feature_name} --> {node_id}")
-
-    mermaid.append("")
-
-    # Add key files in the feature
-    for filepath in feature_files[:10]:  # Limit to 10 files
-        basename = os.path.basename(filepath)
-        node_id = basename.replace(".", "_").replace("-", "_")
-        mermaid.append(f"    {node_id}[{basename}]")
-        mermaid.append(f"    {feature_name} --> {node_id}")
-
-    # Styling
-    mermaid.append("")
-    mermaid.append(
-        f"    style {feature_name} fill:#ff6b6b,stroke:#333,stroke-width:4px"
-    )
-
-    for i, ext_feature in enumerate(external_deps.keys()):
-        colors = ["#4ecdc4", "#ffe66d", "#95e1d3", "#f38181"]
-        color = colors[i % len(colors)]
-        node_id = ext_feature.replace("-", "_")
-        mermaid.append(f"    style {node_id} fill:{color}")
-
-    return "\n".join(mermaid)
-
-
-def generate_store_graph(store_name, symbol_index, parsed_files):
-    """Generate mermaid graph showing store dependencies
+    feature_files = graph.feature_files(feature_name)
+    if not feature_files:
+        return {"error": f"Feature '{feature_name}' not found"}
+
+    nodes = {_node_id(f): 1 for f in feature_files}
+    edges = Counter()
+    labels = {}
+    for src in feature_files:
+        for dst in graph.imports_of(src):
+            ext_feature = feature_of(dst)
+            if ext_feature == feature_name:
+                # May be a file that isn't parsed itself (e.g. types only)
+                nodes.setdefault(_node_id(dst), 1)
+                edges[(_node_id(src), _node_id(dst))] += 1
+            elif ext_feature:
+                # Other features collapse to one node each
+                ext_id = f"features/{ext_feature}"
+                nodes.setdefault(ext_id, 1)
+                labels[ext_id] = f"{ext_feature.title()} Feature"
+                edges[(_node_id(src), ext_id)] += 1
+
+    return render_graph(nodes, edges, highlight=labels, labels=labels, **render)
+
+
+def generate_store_graph(store_name, symbol_index, parsed_files, **render):
+    """Diagram of the files that use a store
 
     Args:
         store_name: Name of store (e.g., 'authStore')
         symbol_index: Symbol index from build_index
         parsed_files: Parsed files data
+        **render: render_graph options (fmt, max_nodes, max_bytes)
 
     Returns:
-        str: Mermaid diagram syntax
+        dict: render_graph result, or {'error': ...}
     """
     if store_name not in symbol_index:
-        return f"Error: Store '{store_name}' not found"
-
-    usages = symbol_index[store_name]
-
-    # Convert to list if it's a set or other type
-    if not isinstance(usages, list):
-        usages = list(usages)
+        return {"error": f"Store '{store_name}' not found"}
 
-    mermaid = ["graph LR"]
-    mermaid.append(f"    store[{store_name}]")
-    mermaid.append("")
+    # used_in is an ordered set (dict keys); store names never contain '/',
+    # so the store node is never folded into a directory
+    nodes = {store_name: 1}
+    edges = {}
+    for filepath in symbol_index[store_name]["used_in"]:
+        nodes[_node_id(filepath)] = 1
+        edges[(store_name, _node_id(filepath))] = 1
 
-    # Add files that use this store
-    for i, filepath in enumerate(usages[:15]):  # Limit to 15
-        basename = os.path.basename(filepath)
-        node_id = f"file{i}"
-        mermaid.append(f"    {node_id}[{basename}]")
-        mermaid.append(f"    store --> {node_id}")
+    return render_graph(nodes, edges, highlight=[store_name], direction="LR", **render)
 
-    # Styling
-    mermaid.append("")
-    mermaid.append("    style store fill:#ff6b6b,stroke:#333,stroke-width:4px")
 
-    return "\n".join(mermaid)
-
-
-def generate_cross_feature_graph(graph):
-    """Generate high-level cross-feature dependency graph
+def generate_cross_feature_graph(graph, **render):
+    """High-level diagram of features and the imports between them
 
     Args:
-        graph: Full dependency graph from build_import_graph
+        graph: ImportGraph (get_import_graph)
+        **render: render_graph options (fmt, max_nodes, max_bytes)
 
     Returns:
-        str: Mermaid diagram syntax
+        dict: render_graph result, or {'error': ...}
     """
-    # Build feature-to-feature edges
-    feature_edges = set()
-
-    for src, dst in graph["edges"]:
-        src_feature = None
-        dst_feature = None
-
-        if "features/" in src:
-            src_feature = src.split("features/")[1].split("/")[0]
-        if "features/" in dst:
-            dst_feature = dst.split("features/")[1].split("/")[0]
-
-        if src_feature and dst_feature and src_feature != dst_feature:
-            feature_edges.add((src_feature, dst_feature))
-
-    # Generate mermaid
-    mermaid = ["graph TB"]
-
-    # Add all features as nodes
-    features = sorted(graph["features"].keys())
-    for feature in features:
-        node_id = feature.replace("-", "_")
-        mermaid.append(f"    {node_id}[{feature.title()} Feature]")
-
-    mermaid.append("")
-
-    # Add edges
-    for src, dst in sorted(feature_edges):
-        src_id = src.replace("-", "_")
-        dst_id = dst.replace("-", "_")
-        mermaid.append(f"    {src_id} --> {dst_id}")
-
-    # Styling with different colors
-    mermaid.append("")
-    colors = ["#ff6b6b", "#4ecdc4", "#ffe66d", "#95e1d3", "#f38181", "#aa96da"]
-    for i, feature in enumerate(features):
-        node_id = feature.replace("-", "_")
-        color = colors[i % len(colors)]
-        mermaid.append(f"    style {node_id} fill:{color}")
-
-    return "\n".join(mermaid)
+    if not graph.features:
+        return {"error": "No features found"}
+    nodes = {feature: len(files) for feature, files in graph.features.items()}
+    labels = {feature: f"{feature.title()} Feature" for feature in nodes}
+    return render_graph(
+        nodes, graph.feature_edges(), labels=labels, direction="TB", **render
+    )
 
 
-def dependency_graph(graph_type, target=None, symbol_index=None, parsed_files=None):
+def dependency_graph(
+    graph_type,
+    target=None,
+    symbol_index=None,
+    parsed_files=None,
+    dep_graph=None,
+    fmt="mermaid",
+    max_nodes=MAX_NODES,
+    max_bytes=MAX_BYTES,
+):
     """Main entry point for dependency graph generation
 
     Args:
-        graph_type: 'feature', 'store', 'cross-feature', 'full'
+        graph_type: 'feature', 'store', 'cross-feature'
         target: Target name (feature name, store name, etc.)
         symbol_index: Symbol index (required for store graphs)
         parsed_files: Parsed files (required)
+        dep_graph: ImportGraph to read; defaults to the shared one, which is
+            built once and then kept current by the watcher
+        fmt: 'mermaid', 'dot' or 'json'
+        max_nodes / max_bytes: Diagram budget; bigger graphs are clustered
+            by directory and pruned to fit (see graph_render)
 
     Returns:
-        dict with mermaid diagram and metadata
+        dict with the diagram and metadata
     """
     if not parsed_files:
         return {"error": "No parsed files available"}
 
-    # Build full graph
-    graph = build_import_graph(parsed_files)
+    graph = dep_graph if dep_graph is not None else get_import_graph(parsed_files)
 
+    render = {"fmt": fmt, "max_nodes": max_nodes, "max_bytes": max_bytes}
     if graph_type == "feature":
         if not target:
             return {
                 "error": "Feature name required",
-                "available_features": list(graph["features"].keys()),
+                "available_features": sorted(graph.features),
             }
-        mermaid = generate_feature_graph(target, graph)
+        result = generate_feature_graph(target, graph, **render)
 
     elif graph_type == "store":
         if not target or not symbol_index:
+            stores = {}
+            if symbol_index:
+                stores = list_symbols_by_type(symbol_index, "stores")
             return {
                 "error": "Store name and symbol_index required",
-                "available_stores": list(graph["stores"].keys()),
+                "available_stores": sorted(stores),
             }
-        mermaid = generate_store_graph(target, symbol_index, parsed_files)
+        result = generate_store_graph(target, symbol_index, parsed_files, **render)
 
     elif graph_type == "cross-feature":
-        mermaid = generate_cross_feature_graph(graph)
+        result = generate_cross_feature_graph(graph, **render)
 
     else:
         return {"error": f"Unknown graph type: {graph_type}"}
 
-    return {
-        "diagram": mermaid,
-        "type": graph_type,
-        "target": target,
-        "node_count": len(graph["nodes"]),
-        "edge_count": len(graph["edges"]),
-        "feature_count": len(graph["features"]),
-    }
+    if "error" in result:
+        return result
+    result.update(
+        {
+            "type": graph_type,
+            "target": target,
+            "node_count": len(graph),
+            "edge_count": graph.edge_count(),
+            "feature_count": len(graph.features),
+        }
+    )
+    return result
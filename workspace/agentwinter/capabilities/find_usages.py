@@ -1,15 +1,84 @@
 """Find where a symbol is defined and used"""
 
+from ..indexing.name_index import NameIndex
 
-def find_usages(symbol, symbol_index):
-    """Find usages of a symbol"""
-    if symbol not in symbol_index:
-        return {"error": f"Symbol '{symbol}' not found"}
+DEFINITION_KINDS = ("functions", "components", "stores")
+SNIPPET_LINES = 3
 
-    data = symbol_index[symbol]
-    return {
-        "symbol": symbol,
+
+def _locations(symbol, files, parsed_files, kinds):
+    """file:line:column (1-based) plus a short snippet for each occurrence"""
+    locations = []
+    for filepath in files:
+        facts = parsed_files.get(filepath)
+        if facts is None:
+            continue
+        for kind, span in facts.locate(symbol, kinds):
+            locations.append(
+                {
+                    "file": filepath.replace("src/", ""),
+                    "kind": kind,
+                    "line": span.start_line + 1,
+                    "column": span.start_col + 1,
+                    "end_line": span.end_line + 1,
+                    "snippet": facts.snippet(span, SNIPPET_LINES),
+                }
+            )
+    return locations
+
+
+def _suggestions(symbol, symbol_index):
+    """Closest symbol names, so a typo doesn't cost another round trip"""
+    if hasattr(symbol_index, "suggest"):
+        ranked = symbol_index.suggest(symbol)
+    else:
+        ranked = NameIndex(symbol_index).similar(symbol)
+    suggestions = []
+    for name, score in ranked:
+        data = symbol_index[name]
+        defined_in = next(iter(data["defined_in"]), None)
+        suggestions.append(
+            {
+                "symbol": name,
+                "score": score,
+                "kind": data.get("kind"),
+                "defined_in": defined_in.replace("src/", "") if defined_in else None,
+                "usage_count": len(data["used_in"]),
+            }
+        )
+    return suggestions
+
+
+def find_usages(symbol, symbol_index, parsed_files=None):
+    """Find usages of a symbol (case-insensitive fallback, suggestions on a miss)"""
+    if hasattr(symbol_index, "resolve"):
+        resolved = symbol_index.resolve(symbol)
+    else:
+        resolved = symbol if symbol in symbol_index else None
+
+    if resolved is None:
+        suggestions = _suggestions(symbol, symbol_index)
+        error = f"Symbol '{symbol}' not found"
+        if suggestions:
+            names = ", ".join(s["symbol"] for s in suggestions)
+            error += f". Did you mean: {names}?"
+        return {"error": error, "suggestions": suggestions}
+
+    data = symbol_index[resolved]
+    result = {
+        "symbol": resolved,
+        "kind": data.get("kind"),
         "defined_in": [f.replace("src/", "") for f in data["defined_in"]],
         "used_in": [f.replace("src/", "") for f in data["used_in"]],
         "usage_count": len(data["used_in"]),
     }
+    if resolved != symbol:
+        result["requested"] = symbol
+    if parsed_files:
+        result["definitions"] = _locations(
+            resolved, data["defined_in"], parsed_files, DEFINITION_KINDS
+        )
+        result["imports"] = _locations(
+            resolved, data["used_in"], parsed_files, ("imports",)
+        )
+    return result
@@ -1,8 +1,11 @@
 """Git history and analysis tools"""
 
+import os
 import subprocess
 from datetime import datetime
 
+from ..indexing.facts_store import stat_key
+
 
 def git_log(file_path, limit=10):
     """Get git commit history for a file
@@ -233,3 +236,93 @@ def git_diff(file_path, commit1="HEAD~1", commit2="HEAD"):
 
     except Exception as e:
         return {"error": str(e)}
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _git_dirs(start="."):
+    """(git dir, common dir) of the repo containing start, or None"""
+    path = os.path.realpath(start)
+    while True:
+        git_dir = os.path.join(path, ".git")
+        if os.path.isfile(git_dir):
+            # Worktree or submodule: '.git' is a 'gitdir: <path>' file
+            line = _read(git_dir) or ""
+            if not line.startswith("gitdir:"):
+                return None
+            git_dir = os.path.normpath(os.path.join(path, line[7:].strip()))
+        if os.path.isdir(git_dir):
+            common = _read(os.path.join(git_dir, "commondir"))
+            common = os.path.normpath(os.path.join(git_dir, common or "."))
+            return git_dir, common
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def _stamp(path):
+    try:
+        return stat_key(os.stat(path))
+    except OSError:
+        return None
+
+
+def _ref_stamps(common):
+    """stat key of refs/, every directory under it and packed-refs.
+
+    git updates a loose ref by renaming a lock file over it, which bumps the
+    directory's mtime - so directories are enough, with no stat per ref
+    (repos can have thousands of tags and remote branches).
+    """
+    stamps = []
+    stack = [os.path.join(common, "refs")]
+    while stack:
+        directory = stack.pop()
+        stamp = _stamp(directory)
+        if stamp is None:
+            continue
+        stamps.append((os.path.relpath(directory, common), stamp))
+        try:
+            with os.scandir(directory) as entries:
+                stack.extend(e.path for e in entries if e.is_dir(follow_symlinks=False))
+        except OSError:
+            continue
+    stamps.sort()
+    stamps.append(("packed-refs", _stamp(os.path.join(common, "packed-refs"))))
+    return stamps
+
+
+def git_state(file_path=None, all_refs=False):
+    """Token that changes whenever git output could: HEAD, with all_refs
+    every ref, and with file_path that file in the working tree. None
+    outside a repo.
+
+    Read straight from .git - much cheaper than running git.
+    """
+    dirs = _git_dirs()
+    if dirs is None:
+        return None
+    git_dir, common = dirs
+    head = _read(os.path.join(git_dir, "HEAD"))
+    if head is None:
+        return None
+    if head.startswith("ref: "):
+        ref = head[5:]
+        sha = _read(os.path.join(git_dir, ref)) or _read(os.path.join(common, ref))
+        if sha is None:
+            # Only in packed-refs, so it changes when that file does
+            sha = _stamp(os.path.join(common, "packed-refs"))
+        head = f"{ref}@{sha}"
+    state = [head]
+    if all_refs:
+        state.append(_ref_stamps(common))
+    if file_path:
+        state.append(_stamp(file_path))
+    return repr(state)
@@ -0,0 +1,223 @@
+"""Render dependency graphs as Mermaid, DOT or JSON within a size budget"""
+
+import json
+from collections import Counter
+
+FORMATS = ("mermaid", "dot", "json")
+MAX_NODES = 40
+MAX_BYTES = 8000
+HIGHLIGHT_STYLE = "fill:#ff6b6b,stroke:#333,stroke-width:4px"
+
+
+def _cluster(node, depth):
+    """'features/auth/components' for 'features/auth/components/X.tsx' at 3"""
+    parts = node.split("/")
+    return "/".join(parts[:depth]) if len(parts) > depth else node
+
+
+def _pick_depth(nodes, budget):
+    """Directory depth to cluster at so the graph fits budget (None: don't).
+
+    The deepest depth that fits wins, unless it leaves so few clusters
+    that the picture is meaningless (e.g. everything under 'features/') -
+    then the next depth down is used and pruning does the rest. Depths
+    that merge everything into one node are never used.
+    """
+    deepest = max(node.count("/") for node in nodes)
+    finer = None
+    for depth in range(deepest, 0, -1):
+        count = len({_cluster(node, depth) for node in nodes})
+        if count <= 1 or (count <= budget and count < budget // 4 and finer):
+            break
+        if count <= budget:
+            return depth
+        finer = depth
+    return finer
+
+
+def _aggregate(nodes, edges, depth):
+    """Merge nodes into their directory at depth, summing weights"""
+    mapping = {node: _cluster(node, depth) for node in nodes}
+    merged = Counter()
+    for node, weight in nodes.items():
+        merged[mapping[node]] += weight
+    merged_edges = Counter()
+    for (src, dst), weight in edges.items():
+        src, dst = mapping[src], mapping[dst]
+        if src != dst:
+            merged_edges[(src, dst)] += weight
+    return merged, merged_edges, mapping
+
+
+def _common_dir(ids):
+    """Leading directory shared by every id ('' if none), for short labels"""
+    split = [node.split("/")[:-1] for node in ids]
+    if len(split) < 2:
+        return ""
+    common = []
+    for parts in zip(*split):
+        if len(set(parts)) != 1:
+            break
+        common.append(parts[0])
+    return "/".join(common) + "/" if common else ""
+
+
+def _reduce(nodes, edges, budget, highlight, labels):
+    """Cluster then prune to at most budget nodes and 2 * budget edges
+    (highlighted nodes rank first, so they go only if they outnumber budget)"""
+    total_files = sum(nodes.values())
+    depth = _pick_depth(nodes, budget) if len(nodes) > budget else None
+    mapping = {}
+    if depth is not None:
+        nodes, edges, mapping = _aggregate(nodes, edges, depth)
+    highlight = {mapping.get(node, node) for node in highlight}
+    clusters = {cluster for node, cluster in mapping.items() if cluster != node}
+
+    degree = Counter()
+    for (src, dst), weight in edges.items():
+        degree[src] += weight
+        degree[dst] += weight
+    ranked = sorted(nodes, key=lambda n: (n not in highlight, -degree[n], -nodes[n], n))
+    kept = sorted(ranked[:budget])
+    index = {node: i for i, node in enumerate(kept)}
+
+    kept_edges = [
+        (index[src], index[dst], weight)
+        for (src, dst), weight in edges.items()
+        if src in index and dst in index
+    ]
+    kept_edges.sort(key=lambda e: (-e[2], e[0], e[1]))
+    kept_edges = sorted(kept_edges[: 2 * budget])
+
+    prefix = _common_dir(kept)
+    view_nodes = []
+    for node in kept:
+        if node in labels:
+            label = labels[node]
+        else:
+            label = node[len(prefix) :] if node.startswith(prefix) else node
+            if node in clusters:
+                label = f"{label}/ ({nodes[node]} files)"
+        view_nodes.append((label, node in highlight))
+
+    shown_files = sum(nodes[node] for node in kept)
+    return {
+        "nodes": view_nodes,
+        "edges": kept_edges,
+        "omitted_nodes": len(nodes) - len(kept),
+        "omitted_highlights": sum(n in nodes and n not in index for n in highlight),
+        "omitted_files": total_files - shown_files,
+        "omitted_edges": len(edges) - len(kept_edges),
+        "clustered_depth": depth,
+    }
+
+
+def _mermaid_label(label):
+    return '"' + label.replace('"', "#quot;") + '"'
+
+
+def _to_mermaid(view, direction):
+    lines = [f"graph {direction}"]
+    for i, (label, _) in enumerate(view["nodes"]):
+        lines.append(f"    n{i}[{_mermaid_label(label)}]")
+    for src, dst, weight in view["edges"]:
+        arrow = f"-->|{weight}|" if weight > 1 else "-->"
+        lines.append(f"    n{src} {arrow} n{dst}")
+    if view["omitted_nodes"]:
+        more = f"+{view['omitted_nodes']} more ({view['omitted_files']} files)"
+        lines.append(f"    more[{_mermaid_label(more)}]")
+    highlighted = [f"n{i}" for i, (_, hl) in enumerate(view["nodes"]) if hl]
+    if highlighted:
+        lines.append(f"    classDef hl {HIGHLIGHT_STYLE}")
+        lines.append(f"    class {','.join(highlighted)} hl")
+    return "\n".join(lines)
+
+
+def _dot_label(label):
+    return '"' + label.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _to_dot(view, direction):
+    rankdir = "LR" if direction == "LR" else "TB"
+    lines = ["digraph deps {", f"  rankdir={rankdir};", "  node [shape=box];"]
+    for i, (label, hl) in enumerate(view["nodes"]):
+        style = ' style=filled fillcolor="#ff6b6b"' if hl else ""
+        lines.append(f"  n{i} [label={_dot_label(label)}{style}];")
+    for src, dst, weight in view["edges"]:
+        attrs = f' [label="{weight}"]' if weight > 1 else ""
+        lines.append(f"  n{src} -> n{dst}{attrs};")
+    if view["omitted_nodes"]:
+        more = f"+{view['omitted_nodes']} more ({view['omitted_files']} files)"
+        lines.append(f"  more [label={_dot_label(more)} shape=note];")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def _to_json(view, direction):
+    data = {
+        "nodes": [label for label, _ in view["nodes"]],
+        "edges": [list(edge) for edge in view["edges"]],
+        "highlight": [i for i, (_, hl) in enumerate(view["nodes"]) if hl],
+    }
+    if view["omitted_nodes"]:
+        data["omitted"] = view["omitted_nodes"]
+    return json.dumps(data, separators=(",", ":"))
+
+
+_RENDERERS = {"mermaid": _to_mermaid, "dot": _to_dot, "json": _to_json}
+
+
+def render_graph(
+    nodes,
+    edges,
+    fmt="mermaid",
+    max_nodes=MAX_NODES,
+    max_bytes=MAX_BYTES,
+    highlight=(),
+    labels=None,
+    direction="TD",
+):
+    """Diagram of a graph that stays small however big the graph is.
+
+    Args:
+        nodes: {node id: weight} - ids are '/'-separated paths (files, or
+            anything else; ids without '/' are never clustered)
+        edges: {(src id, dst id): weight}
+        fmt: 'mermaid', 'dot' or 'json' (compact adjacency lists)
+        max_nodes / max_bytes: Budgets; over max_nodes, nodes are first
+            merged into their directories (deepest depth that fits), then
+            the least connected are dropped. The node budget shrinks until
+            the output fits max_bytes.
+        highlight: Node ids to emphasize. They are kept ahead of every other
+            node, but the budgets still win: if more are highlighted than
+            fit, the rest are dropped and counted in omitted_highlights
+        labels: {node id: label} overrides
+
+    Returns:
+        dict: diagram plus what was shown and what was folded away
+    """
+    if fmt not in _RENDERERS:
+        return {"error": f"Unknown format: {fmt} (use one of {', '.join(FORMATS)})"}
+    if not nodes:
+        return {"error": "Nothing to draw"}
+
+    budget = max(1, max_nodes)
+    while True:
+        view = _reduce(nodes, edges, budget, set(highlight), labels or {})
+        diagram = _RENDERERS[fmt](view, direction)
+        size = len(diagram.encode("utf-8"))
+        if size <= max_bytes or budget == 1:
+            break
+        budget = max(1, budget * 3 // 4)
+
+    return {
+        "diagram": diagram,
+        "format": fmt,
+        "shown_nodes": len(view["nodes"]),
+        "shown_edges": len(view["edges"]),
+        "omitted_nodes": view["omitted_nodes"],
+        "omitted_highlights": view["omitted_highlights"],
+        "omitted_edges": view["omitted_edges"],
+        "clustered_depth": view["clustered_depth"],
+        "bytes": size,
+    }
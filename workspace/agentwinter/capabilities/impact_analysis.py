@@ -0,0 +1,121 @@
+"""Blast radius: what transitively depends on a file or symbol"""
+
+import os
+from collections import Counter
+
+from ..indexing.discovery import get_manifest
+from ..indexing.import_graph import (
+    DEPENDENCIES,
+    DEPENDENTS,
+    feature_of,
+    get_import_graph,
+)
+from ..indexing.resolver import get_resolver
+from .find_usages import _suggestions
+
+DIRECTIONS = (DEPENDENTS, DEPENDENCIES)
+MAX_RESULTS = 50
+MAX_FEATURES = 20
+
+
+def _short(filepath):
+    return filepath.replace("src/", "")
+
+
+def _target_files(target, symbol_index, parsed_files):
+    """(files, symbol) for a file path or a symbol name; files empty on a miss"""
+    manifest = get_manifest()
+    for candidate in (target, os.path.join(manifest.root, target)):
+        if os.path.normpath(candidate) in manifest:
+            return [os.path.normpath(candidate)], None
+
+    if symbol_index is None:
+        return [], None
+    if hasattr(symbol_index, "resolve"):
+        symbol = symbol_index.resolve(target)
+    else:
+        symbol = target if target in symbol_index else None
+    if symbol is None:
+        return [], None
+    data = symbol_index[symbol]
+    if data["defined_in"]:
+        return list(data["defined_in"]), symbol
+    # Only seen as an import (e.g. destructured `[authStore, setStore]`):
+    # use the modules it is imported from
+    return _import_targets(symbol, data["used_in"], parsed_files), symbol
+
+
+def _import_targets(symbol, importers, parsed_files):
+    resolver = get_resolver()
+    targets = {}
+    for filepath in importers:
+        facts = parsed_files.get(filepath)
+        for imp in facts.imports if facts else ():
+            if imp.name == symbol:
+                target = resolver.resolve(imp.source, filepath)
+                if target is not None:
+                    targets[target] = None
+    return list(targets)
+
+
+def _direction_summary(graph, files, direction, max_results):
+    reached = set()
+    direct = set()
+    for filepath in files:
+        reached |= graph.transitive(filepath, direction)
+        if direction == DEPENDENTS:
+            direct.update(graph.imported_by(filepath))
+        else:
+            direct.update(graph.imports_of(filepath))
+    reached.difference_update(files)
+    direct.difference_update(files)
+
+    ordered = sorted(direct) + sorted(reached - direct)
+    by_feature = Counter(feature_of(f) or "(shared)" for f in reached)
+    return {
+        "count": len(reached),
+        "direct_count": len(direct),
+        "files": [_short(f) for f in ordered[:max_results]],
+        "truncated": len(ordered) > max_results,
+        "feature_count": len(by_feature),
+        "by_feature": dict(by_feature.most_common(MAX_FEATURES)),
+    }
+
+
+def impact_analysis(
+    target,
+    symbol_index=None,
+    parsed_files=None,
+    direction=DEPENDENTS,
+    max_results=MAX_RESULTS,
+):
+    """Transitive dependents/dependencies of a file or symbol in one call"""
+    if not parsed_files:
+        return {"error": "No parsed files available"}
+    if direction not in DIRECTIONS + ("both",):
+        return {"error": f"Unknown direction: {direction}"}
+
+    files, symbol = _target_files(target, symbol_index, parsed_files)
+    if not files:
+        error = f"'{target}' is not a source file or a defined symbol"
+        suggestions = _suggestions(target, symbol_index) if symbol_index else []
+        if suggestions:
+            names = ", ".join(s["symbol"] for s in suggestions)
+            error += f". Did you mean: {names}?"
+        return {"error": error, "suggestions": suggestions}
+
+    graph = get_import_graph(parsed_files)
+    result = {"target": target, "files": [_short(f) for f in files]}
+    if symbol is not None:
+        result["symbol"] = symbol
+
+    for name in DIRECTIONS if direction == "both" else (direction,):
+        result[name] = _direction_summary(graph, files, name, max_results)
+
+    cycles = {f: graph.cycle_of(f) for f in files}
+    cycles = {
+        _short(f): [_short(m) for m in mates] for f, mates in cycles.items() if mates
+    }
+    if cycles:
+        result["import_cycles"] = cycles
+    return result
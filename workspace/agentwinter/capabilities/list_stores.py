@@ -1,21 +1,39 @@
 """List all stores in the codebase"""
 
+from ..indexing.indexer import list_symbols_by_type
 
-def list_stores(symbol_index):
+
+def _definition(name, defined_in, parsed_files, kind):
+    """(file, 1-based line) of the first file whose facts define name as
+    kind - a name can be a component in one file and a store in another.
+    Falls back to the first defining file, line None."""
+    for filepath in defined_in:
+        facts = parsed_files.get(filepath) if parsed_files else None
+        found = facts.locate(name, (kind,)) if facts is not None else None
+        if found:
+            return filepath, found[0][1].start_line + 1
+    return next(iter(defined_in), None), None
+
+
+def symbol_summary(name, data, parsed_files, fact_kind):
+    """One list_stores/list_components row"""
+    defined_in, line = _definition(name, data["defined_in"], parsed_files, fact_kind)
+    return {
+        "name": name,
+        "defined_in": defined_in.replace("src/", "") if defined_in else None,
+        "line": line,
+        "usage_count": len(data["used_in"]),
+    }
+
+
+def list_stores(symbol_index, parsed_files=None):
     """List all stores"""
-    stores = {k: v for k, v in symbol_index.items() if "store" in k.lower()}
+    # Secondary index lookup, already sorted by name
+    stores = list_symbols_by_type(symbol_index, "stores")
     return {
         "count": len(stores),
         "stores": [
-            {
-                "name": name,
-                "defined_in": (
-                    data["defined_in"][0].replace("src/", "")
-                    if data["defined_in"]
-                    else None
-                ),
-                "usage_count": len(data["used_in"]),
-            }
-            for name, data in sorted(stores.items())
+            symbol_summary(name, data, parsed_files, "stores")
+            for name, data in stores.items()
         ],
     }
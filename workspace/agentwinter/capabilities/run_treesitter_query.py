@@ -1,8 +1,9 @@
 """Execute custom Tree-sitter queries across the codebase"""
 
-import glob
 import os
 
+from ..indexing.discovery import get_manifest
+
 try:
     from tree_sitter_languages import get_language, get_parser
 
@@ -25,16 +26,13 @@ def run_treesitter_query(query_pattern, language="tsx", max_results=20):
         # Compile query
         query = lang.query(query_pattern)
 
-        # Find all relevant files
-        extensions = {
-            "tsx": ["*.tsx", "*.ts"],
-            "typescript": ["*.ts"],
-            "javascript": ["*.js", "*.jsx"],
+        # Find all relevant files (from the shared manifest - no re-walk)
+        languages = {
+            "tsx": ("tsx", "typescript"),
+            "typescript": ("typescript",),
+            "javascript": ("javascript", "jsx"),
         }
-
-        files = []
-        for ext in extensions.get(language, ["*.tsx", "*.ts"]):
-            files.extend(glob.glob(f"src/**/{ext}", recursive=True))
+        files = get_manifest().paths(languages.get(language, ("tsx", "typescript")))
 
         results = []
 
@@ -64,7 +62,8 @@ def run_treesitter_query(query_pattern, language="tsx", max_results=20):
                                     "utf-8", errors="ignore"
                                 ),
                                 "context": context,
-                                "line": code[: node.start_byte].count(b"\n") + 1,
+                                "line": node.start_point[0] + 1,
+                                "column": node.start_point[1] + 1,
                             }
                         )
 
@@ -1,31 +1,51 @@
 """Semantic search using embeddings"""
 
 import psycopg2
-from ..indexing.cache import cached_semantic_search
+from ..indexing.cache import search_cache
+from ..indexing.query_embeddings import embed_query
+from ..indexing.semantic_cache import get_semantic_cache
 
 
 def semantic_search(query, embedding_model, db_url, limit=5):
     """Semantic search with caching and visual indicator"""
-    from ..indexing.cache import search_cache
-    from ..core.config import COLORS
+    from ..core.config import COLORS, EMBEDDING_MODEL_ID
 
     cache_key_str = f"{query}|{limit}"
 
-    if cache_key_str in search_cache:
+    cached = search_cache.get(cache_key_str)
+    if cached is not None:
         print(f"    {COLORS['GREEN']}💨 CACHE HIT{COLORS['RESET']}")
-        return search_cache[cache_key_str]
+        return cached
+
+    # Same question in other words? ("auth store logic" vs "authStore logic")
+    query_embedding = embed_query(query, embedding_model, EMBEDDING_MODEL_ID)
+    similar = get_semantic_cache().lookup(query_embedding, limit)
+    if similar is not None:
+        result, similar_query, similarity = similar
+        print(
+            f"    {COLORS['GREEN']}💨 SIMILAR QUERY HIT "
+            f"({similarity:.2f} ~ '{similar_query}'){COLORS['RESET']}"
+        )
+        return {**result, "query": query, "results": result["results"][:limit]}
 
     # Not in cache, do actual search
-    return cached_semantic_search(
-        query,
-        limit,
-        lambda q, l: semantic_search_uncached(q, embedding_model, db_url, l),
+    result = semantic_search_uncached(
+        query, embedding_model, db_url, limit, query_embedding
     )
+    search_cache.put(cache_key_str, result)
+    get_semantic_cache().put(query, query_embedding, limit, result)
+    return result
 
 
-def semantic_search_uncached(query, embedding_model, db_url, limit=5):
+def semantic_search_uncached(
+    query, embedding_model, db_url, limit=5, query_embedding=None
+):
     """Search codebase semantically"""
-    query_embedding = embedding_model.encode(query).tolist()
+    if query_embedding is None:
+        from ..core.config import EMBEDDING_MODEL_ID
+
+        query_embedding = embed_query(query, embedding_model, EMBEDDING_MODEL_ID)
+    query_embedding = query_embedding.tolist()
     conn = psycopg2.connect(db_url)
     cur = conn.cursor()
     cur.execute(
@@ -7,6 +7,11 @@ from sentence_transformers import SentenceTransformer
 
 load_dotenv()
 
+# Cached query embeddings are keyed by this, so changing it never mixes models
+EMBEDDING_MODEL_ID = os.getenv(
+    "AGENTWINTER_EMBEDDING_MODEL", "nomic-ai/nomic-embed-text-v1.5"
+)
+
 # ANSI colors
 COLORS = {
     "YELLOW": "\033[93m",
@@ -29,7 +34,7 @@ def get_anthropic_client():
 def get_embedding_model():
     """Load sentence transformer model"""
     print(f"{COLORS['CYAN']}Loading embedding model...{COLORS['RESET']}")
-    return SentenceTransformer("nomic-ai/nomic-embed-text-v1.5", trust_remote_code=True)
+    return SentenceTransformer(EMBEDDING_MODEL_ID, trust_remote_code=True)
 
 
 def get_db_url():
@@ -1,58 +1,159 @@
 """Main entry point for AgentWinter"""
 
+import os
 import sys
+from collections import Counter
 from .config import get_anthropic_client, get_embedding_model, get_db_url, COLORS
 from ..indexing.auto_refresh import auto_refresh
 from .context import build_full_context
-from ..indexing.parser import parse_all_files
+from ..indexing.discovery import scan_sources, get_manifest, index_lock
+from ..indexing.parser import parse_all_files, reparse_file, forget_file
 from ..indexing.indexer import build_index
+from ..indexing.snapshot import load_snapshot, save_snapshot
+from ..indexing.text_index import get_text_index
+from ..indexing.import_graph import get_import_graph
 from .query import process_query
 from ..indexing.file_watcher import FileWatcher
 from ..indexing.cache import get_cache_stats, clear_all_caches
 
 
-def rebuild_context_and_index():
-    """Rebuild context, parsed files, and symbol index"""
+def rebuild_context_and_index(parse_workers=0):
+    """Rebuild context, parsed files, and symbol index
+
+    If nothing under src/ changed since the last run, the symbol index is
+    opened from its on-disk snapshot instead of being rebuilt.
+    """
     context = build_full_context()
-    parsed_files, parsed_count, total_files = parse_all_files()
+    manifest = scan_sources()
+    # code_search index builds alongside; only changed files are re-read
+    get_text_index().build_in_background(manifest)
+    snapshot = load_snapshot(manifest.fingerprint)
+    if snapshot is not None:
+        return context, snapshot.parsed_files(), snapshot
+
+    parsed_files, parsed_count, total_files = parse_all_files(
+        workers=parse_workers, manifest=manifest
+    )
     symbol_index = build_index(parsed_files)
+    save_snapshot(symbol_index, parsed_files, manifest.fingerprint)
     return context, parsed_files, symbol_index
 
 
-def handle_file_change(
-    file_path, event_type, context_ref, parsed_files_ref, symbol_index_ref
-):
-    """Handle file change events"""
-    print(f"\n{COLORS['YELLOW']}📝 {event_type.title()}: {file_path}{COLORS['RESET']}")
-    print(f"{COLORS['CYAN']}🔄 Re-parsing...{COLORS['RESET']}")
+def get_parse_workers(argv=None):
+    """Read --parse-workers N from the command line (0 = parse in-process)"""
+    argv = sys.argv if argv is None else argv
+    for i, arg in enumerate(argv):
+        if arg.startswith("--parse-workers="):
+            value = arg.split("=", 1)[1]
+        elif arg == "--parse-workers" and i + 1 < len(argv):
+            value = argv[i + 1]
+        else:
+            continue
+        if value == "auto":
+            return os.cpu_count() or 1
+        try:
+            return max(int(value), 0)
+        except ValueError:
+            print(f"{COLORS['YELLOW']}⚠️  Invalid --parse-workers: {value}{COLORS['RESET']}")
+            return 0
+    return 0
+
+
+def _apply_batch(changes, context_ref, parsed_files_ref, symbol_index_ref):
+    """Update manifest, indexes, import graph and context for a batch.
+
+    Returns the paths that failed to re-parse (None if the batch failed).
+    """
+    manifest = get_manifest()
+    text_index = get_text_index()
+    failed = []
+    for file_path in sorted(changes):
+        try:
+            # None when the file is gone or discovery excludes it (.gitignore,
+            # hidden or default-excluded dirs) - either way it leaves the indexes
+            if manifest.update_path(file_path) is None:
+                forget_file(file_path)
+                text_index.remove_file(file_path)
+                facts = None
+            else:
+                facts = reparse_file(file_path)
+                text_index.update_file(file_path)
+
+            # Update references (can't reassign, must modify in place)
+            old_facts = parsed_files_ref.get(file_path)
+            if facts and facts.has_symbols():
+                parsed_files_ref[file_path] = facts
+                symbol_index_ref.apply_file(file_path, old_facts, facts)
+            else:
+                parsed_files_ref.pop(file_path, None)
+                symbol_index_ref.remove_file(file_path)
+        except Exception as e:
+            failed.append(file_path)
+            print(
+                f"{COLORS['RED']}⚠️  Re-parse failed: {file_path}: {e}{COLORS['RESET']}"
+            )
 
     try:
-        # Re-parse all files
-        new_context, new_parsed_files, new_symbol_index = rebuild_context_and_index()
+        # Files coming or going can change where other imports resolve and
+        # the directory listing - done once per batch, not per file
+        added_or_removed = any(event != "modified" for event in changes.values())
+
+        # Keep the import graph current if one has been built
+        graph = get_import_graph()
+        if graph is not None and graph.source is parsed_files_ref:
+            if added_or_removed:
+                graph.refresh(parsed_files_ref)
+            else:
+                for file_path in changes:
+                    graph.update_file(file_path, parsed_files_ref.get(file_path))
 
-        # Update references (can't reassign, must modify in place)
-        context_ref["value"] = new_context
-        parsed_files_ref.clear()
-        parsed_files_ref.update(new_parsed_files)
-        symbol_index_ref.clear()
-        symbol_index_ref.update(new_symbol_index)
+        if added_or_removed:
+            context_ref["value"] = build_full_context()
+    except Exception as e:
+        print(f"{COLORS['RED']}⚠️  Update failed: {e}{COLORS['RESET']}\n")
+        return None
+    return failed
 
+
+def handle_file_changes(changes, context_ref, parsed_files_ref, symbol_index_ref):
+    """Apply one watcher batch ({path: 'created' | 'modified' | 'deleted'})
+    as a single incremental update - re-parse only the files that changed"""
+    changes = {os.path.relpath(path): event for path, event in changes.items()}
+    if len(changes) == 1:
+        file_path, event_type = next(iter(changes.items()))
         print(
-            f"{COLORS['GREEN']}✅ Updated! ({len(new_symbol_index)} symbols){
-                COLORS['RESET']
-            }\n"
+            f"\n{COLORS['YELLOW']}📝 {event_type.title()}: {file_path}{COLORS['RESET']}"
         )
-    except Exception as e:
-        print(f"{COLORS['RED']}⚠️  Re-parse failed: {e}{COLORS['RESET']}\n")
+    else:
+        counts = Counter(changes.values())
+        summary = ", ".join(f"{n} {event}" for event, n in sorted(counts.items()))
+        print(
+            f"\n{COLORS['YELLOW']}📝 {len(changes)} files changed ({summary})"
+            f"{COLORS['RESET']}"
+        )
+    print(f"{COLORS['CYAN']}🔄 Re-parsing...{COLORS['RESET']}")
+
+    # Tools wait for the whole batch: the manifest generation moves first
+    with index_lock:
+        failed = _apply_batch(changes, context_ref, parsed_files_ref, symbol_index_ref)
+    if failed is None:
+        return
+
+    updated = len(changes) - len(failed)
+    print(
+        f"{COLORS['GREEN']}✅ Updated {updated} file{'s' if updated != 1 else ''}! "
+        f"({len(symbol_index_ref)} symbols){COLORS['RESET']}\n"
+    )
 
 
 def main():
     """Main entry point"""
     # Check for --watch flag
     watch_mode = "--watch" in sys.argv
+    parse_workers = get_parse_workers()
 
     # Initial setup
-    context, parsed_files, symbol_index = rebuild_context_and_index()
+    context, parsed_files, symbol_index = rebuild_context_and_index(parse_workers)
 
     # Auto-refresh CocoIndex and static docs
     auto_refresh()
@@ -70,8 +171,8 @@ def main():
 
             watcher = FileWatcher(
                 watch_path="src/",
-                on_change_callback=lambda path, event: handle_file_change(
-                    path, event, context_ref, parsed_files, symbol_index
+                on_batch_callback=lambda changes: handle_file_changes(
+                    changes, context_ref, parsed_files, symbol_index
                 ),
             )
             watcher.start()
@@ -100,10 +201,14 @@ def main():
             if query == "!refresh":
                 print(f"{COLORS['CYAN']}🔄 Refreshing...{COLORS['RESET']}")
                 if watch_mode:
-                    context, parsed_files, symbol_index = rebuild_context_and_index()
+                    context, parsed_files, symbol_index = rebuild_context_and_index(
+                        parse_workers
+                    )
                     context_ref["value"] = context
                 else:
-                    context, parsed_files, symbol_index = rebuild_context_and_index()
+                    context, parsed_files, symbol_index = rebuild_context_and_index(
+                        parse_workers
+                    )
                 print(f"{COLORS['GREEN']}✅ Refreshed!{COLORS['RESET']}")
                 continue
             if query == "!cache":
@@ -111,7 +216,45 @@ def main():
                 print(f"{COLORS['CYAN']}📊 Cache Statistics:{COLORS['RESET']}")
                 print(f"  Parse cache: {stats['parse_cache_size']} files")
                 print(f"  Search cache: {stats['search_cache_size']} queries")
+                semantic = stats["semantic_cache"]
+                print(
+                    f"  Similar-query cache: {semantic['entries']} queries, "
+                    f"{semantic['hits']} hits (cosine >= {semantic['threshold']})"
+                )
                 print(f"  Embedding cache: {stats['embedding_cache_size']} embeddings")
+                for name, cache in stats["caches"].items():
+                    print(
+                        f"    {name}: {cache['entries']} entries, "
+                        f"{cache['bytes'] // 1024} KB, {cache['hits']} hits, "
+                        f"{cache['misses']} misses, {cache['evictions']} evicted"
+                    )
+                for store in stats["query_embeddings"]:
+                    print(
+                        f"  Query embeddings on disk: {store['entries']}/"
+                        f"{store['capacity']} ({store['hits']} reused, "
+                        f"{store['misses']} encoded)"
+                    )
+                shared = stats["redis"]
+                state = "connected" if shared["connected"] else "not connected"
+                print(
+                    f"  Redis (shared): {state}, {shared['hits']} hits, "
+                    f"{shared['misses']} misses, {shared['writes']} writes"
+                )
+                print(
+                    f"  Facts store: {stats['facts_store_size']} files "
+                    f"({stats['facts_store_hits']} reused, "
+                    f"{stats['facts_store_misses']} re-parsed)"
+                )
+                partial = stats["header_only_files"]
+                skipped = stats["skipped_files"]
+                if partial or skipped:
+                    print(
+                        f"  {COLORS['YELLOW']}⚠️  Partially indexed: "
+                        f"{len(partial)} header-only, {len(skipped)} skipped"
+                        f"{COLORS['RESET']}"
+                    )
+                    for path, reason in list({**partial, **skipped}.items())[:10]:
+                        print(f"    • {path.replace('src/', '')} ({reason})")
                 continue
 
             if query == "!clear-cache":
@@ -1,9 +1,10 @@
 """Auto-refresh all documentation on startup"""
 
-import os
 import subprocess
 from pathlib import Path
 
+from .discovery import get_manifest
+
 
 class AutoRefresh:
     """Manages auto-refresh for CocoIndex and static documentation"""
@@ -20,26 +21,8 @@ class AutoRefresh:
         return 0
 
     def _get_latest_file_mtime(self, directory="src/"):
-        """Get newest file modification time in directory"""
-        latest = 0
-        for root, dirs, files in os.walk(directory):
-            # Skip node_modules, venv, etc.
-            dirs[:] = [
-                d
-                for d in dirs
-                if d not in ["node_modules", "venv", ".git", "__pycache__"]
-            ]
-
-            for file in files:
-                if file.endswith((".ts", ".tsx", ".js", ".jsx")):
-                    try:
-                        path = os.path.join(root, file)
-                        mtime = os.path.getmtime(path)
-                        if mtime > latest:
-                            latest = mtime
-                    except BaseException:
-                        pass
-        return latest
+        """Get newest file modification time in directory (from the shared manifest)"""
+        return get_manifest(directory).latest_mtime()
 
     def needs_coco_reindex(self):
         """Check if CocoIndex needs refresh"""
@@ -0,0 +1,154 @@
+"""Thread-safe LRU cache bounded by entry count and total bytes"""
+
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Every cache registers itself here so get_cache_stats() can report them all
+_registry = {}
+
+
+def estimate_size(value):
+    """Rough in-memory footprint of value, in bytes.
+
+    Text, buffers, numpy arrays and anything with an approx_size() method
+    (FileFacts) are measured directly. Anything else is pickled, which costs
+    about as much as copying it - callers caching big values pass size=.
+    """
+    if isinstance(value, (str, bytes, bytearray)):
+        return sys.getsizeof(value)
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    approx_size = getattr(value, "approx_size", None)
+    if approx_size is not None:
+        return approx_size()
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class BoundedCache:
+    """LRU map with entry-count, byte and optional TTL limits.
+
+    Entries can carry a fingerprint (e.g. a file's (mtime_ns, size, inode)):
+    a lookup with a different fingerprint is a miss and drops the entry, so
+    callers never see results for an older version of a file. All methods
+    take one lock, so the watcher thread and the query loop can share an
+    instance; values are computed outside the lock.
+    """
+
+    def __init__(self, name, max_entries=1000, max_bytes=64 * 1024 * 1024, ttl=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lock = threading.RLock()
+        self.entries = OrderedDict()  # key -> (value, fingerprint, size, expires)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0  # dropped to stay within max_entries / max_bytes
+        self.invalidations = 0  # dropped as stale (fingerprint or TTL)
+        _registry[name] = self
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry is not None and not self._expired(entry)
+
+    def _expired(self, entry):
+        return entry[3] is not None and entry[3] <= time.monotonic()
+
+    def _drop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+        return entry
+
+    def get(self, key, default=None, fingerprint=None):
+        """Cached value for key, or default (counted as a miss).
+
+        With a fingerprint, an entry stored under a different one is stale.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and (
+                self._expired(entry)
+                or (fingerprint is not None and entry[1] != fingerprint)
+            ):
+                self._drop(key)
+                self.invalidations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, fingerprint=None, size=None):
+        """Store value; evicts least recently used entries to stay in budget"""
+        if size is None:
+            size = estimate_size(value)
+        if size > self.max_bytes:
+            self.invalidate(key)
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self.lock:
+            self._drop(key)
+            self.entries[key] = (value, fingerprint, size, expires)
+            self.bytes += size
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._drop(next(iter(self.entries)))
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute, fingerprint=None, size=None):
+        """get(), else compute() and put() the result (None isn't cached)"""
+        missing = object()
+        value = self.get(key, missing, fingerprint)
+        if value is missing:
+            value = compute()
+            if value is not None:
+                self.put(key, value, fingerprint, size)
+        return value
+
+    def pop(self, key, default=None):
+        """Remove key and return its value (no hit/miss accounting)"""
+        with self.lock:
+            entry = self._drop(key)
+            return default if entry is None else entry[0]
+
+    def invalidate(self, key):
+        with self.lock:
+            if self._drop(key) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def all_cache_stats():
+    """{cache name: stats()} for every BoundedCache created so far"""
+    return {name: cache.stats() for name, cache in sorted(_registry.items())}
@@ -1,16 +1,37 @@
-"""Caching layer for performance optimization"""
+"""Caching layer for performance optimization
 
-from cachetools import TTLCache
-import hashlib
-
-# LRU cache for parse results (lasts entire session)
-parse_cache = {}
+Every cache here is a BoundedCache: thread-safe, LRU within an entry and
+byte budget, and reporting hits/misses/evictions through get_cache_stats().
+Search and tool results also go to Redis (SharedCache), when it's running.
+"""
 
-# TTL cache for embeddings (5 minutes)
-embedding_cache = TTLCache(maxsize=500, ttl=300)
-
-# TTL cache for semantic search results (5 minutes)
-search_cache = TTLCache(maxsize=200, ttl=300)
+import hashlib
+import os
+
+from .bounded_cache import all_cache_stats
+from .facts_store import get_facts_store, stat_key
+from .parser import get_parse_report, parse_cache
+from .query_embeddings import (
+    clear_query_embeddings,
+    embedding_cache,
+    query_embedding_stats,
+)
+from .semantic_cache import get_semantic_cache
+from .shared_cache import SharedCache, get_redis_tier
+from .snapshot import clear_snapshot
+
+# Semantic search results (5 minutes), shared with other processes via Redis
+search_cache = SharedCache("search", ttl=300)
+
+# Deterministic tool results; keys carry the repo state they were computed
+# from (index generation, or git HEAD/refs), see capabilities.execute_tool
+tool_cache = SharedCache(
+    "tools",
+    ttl=3600,
+    max_entries=500,
+    max_bytes=32 * 1024 * 1024,
+    per_generation=False,
+)
 
 
 def cache_key(func_name, *args, **kwargs):
@@ -23,48 +44,76 @@ def cache_key(func_name, *args, **kwargs):
 
 
 def cached_parse_file(filepath, parse_func):
-    """Cache parse results for files"""
-    if filepath in parse_cache:
-        return parse_cache[filepath]
+    """Cache parse results for files (until the file's stat key changes)"""
+    return parse_cache.get_or_compute(
+        filepath, lambda: parse_func(filepath), _file_fingerprint(filepath)
+    )
 
-    result = parse_func(filepath)
-    parse_cache[filepath] = result
-    return result
+
+def _file_fingerprint(filepath):
+    try:
+        return stat_key(os.stat(filepath))
+    except OSError:
+        return None
 
 
 def cached_semantic_search(query, limit, search_func):
     """Cache semantic search results"""
-    cache_key_str = f"{query}|{limit}"
-
-    if cache_key_str in search_cache:
-        return search_cache[cache_key_str]
+    return search_cache.get_or_compute(
+        f"{query}|{limit}", lambda: search_func(query, limit)
+    )
 
-    result = search_func(query, limit)
-    search_cache[cache_key_str] = result
-    return result
 
-
-def clear_parse_cache():
-    """Clear parse cache (call on file changes)"""
-    parse_cache.clear()
+def clear_parse_cache(filepath=None):
+    """Drop one file's cached parse (or all of them) on file changes"""
+    if filepath is None:
+        parse_cache.clear()
+    else:
+        parse_cache.invalidate(filepath)
 
 
 def clear_search_cache():
     """Clear search cache"""
     search_cache.clear()
+    get_semantic_cache().clear()
 
 
 def clear_all_caches():
-    """Clear all caches"""
+    """Clear all caches (including the on-disk facts store, index snapshot and
+    query embeddings)"""
     parse_cache.clear()
     search_cache.clear()
-    embedding_cache.clear()
+    get_semantic_cache().clear()
+    tool_cache.clear()
+    clear_query_embeddings()
+    store = get_facts_store()
+    if store:
+        store.clear()
+    clear_snapshot()
 
 
 def get_cache_stats():
     """Get cache statistics"""
+    store = get_facts_store()
+    store_stats = store.stats() if store else {}
+    report = get_parse_report()
+    caches = all_cache_stats()
+    semantic = get_semantic_cache().stats()
     return {
         "parse_cache_size": len(parse_cache),
         "search_cache_size": len(search_cache),
         "embedding_cache_size": len(embedding_cache),
+        "query_embeddings": query_embedding_stats(),
+        "redis": get_redis_tier().stats(),
+        "similar_query_hits": semantic["hits"],
+        "semantic_cache": semantic,
+        "caches": caches,
+        "cache_hits": sum(c["hits"] for c in caches.values()),
+        "cache_misses": sum(c["misses"] for c in caches.values()),
+        "cache_evictions": sum(c["evictions"] for c in caches.values()),
+        "facts_store_size": store_stats.get("files", 0),
+        "facts_store_hits": store_stats.get("hits", 0),
+        "facts_store_misses": store_stats.get("misses", 0),
+        "header_only_files": report["header"],
+        "skipped_files": report["skipped"],
     }
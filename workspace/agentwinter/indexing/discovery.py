@@ -0,0 +1,296 @@
+"""Single-pass source discovery shared by every indexing subsystem"""
+
+import fnmatch
+import hashlib
+import os
+import re
+import threading
+from collections import namedtuple
+
+SOURCE_LANGUAGES = {
+    ".ts": "typescript",
+    ".tsx": "tsx",
+    ".js": "javascript",
+    ".jsx": "jsx",
+}
+
+# Directory names never worth descending into (hidden dirs are skipped too)
+DEFAULT_EXCLUDED_DIRS = ("node_modules", "venv", "__pycache__")
+
+# Extra comma-separated globs, matched against the relative path
+EXTRA_EXCLUDES = tuple(
+    p.strip() for p in os.getenv("AGENTWINTER_EXCLUDE", "").split(",") if p.strip()
+)
+
+
+class SourceFile(namedtuple("SourceFile", "path size mtime_ns inode language")):
+    """One manifest entry"""
+
+    __slots__ = ()
+
+    @property
+    def mtime(self):
+        return self.mtime_ns / 1e9
+
+    @property
+    def stat_key(self):
+        """Same (mtime_ns, size, inode) key the facts store validates with"""
+        return (self.mtime_ns, self.size, self.inode)
+
+
+def source_file_from_stat(path, st):
+    """Build a manifest entry from an os.stat result"""
+    language = SOURCE_LANGUAGES.get(os.path.splitext(path)[1])
+    return SourceFile(path, st.st_size, st.st_mtime_ns, st.st_ino, language)
+
+
+def _glob_to_regex(pattern):
+    """Translate a gitignore glob (with ** support) to a regex"""
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1 : end].replace("\\", "\\\\")
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """Minimal .gitignore semantics: globs, **, negation, dir-only, anchoring"""
+
+    def __init__(self):
+        self.rules = []  # (regex, negate, dir_only)
+
+    def add_file(self, gitignore_path, base_dir):
+        """Load rules from a .gitignore that lives in base_dir"""
+        try:
+            with open(gitignore_path, "r", encoding="utf-8", errors="ignore") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return
+
+        prefix = "" if base_dir in ("", ".") else base_dir.rstrip("/") + "/"
+        for line in lines:
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            line = line.lstrip("\\")
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+
+            # A slash anywhere but the end anchors the pattern to base_dir
+            if "/" in line:
+                regex = re.escape(prefix) + _glob_to_regex(line.lstrip("/"))
+            else:
+                regex = re.escape(prefix) + "(?:.*/)?" + _glob_to_regex(line)
+            self.rules.append((re.compile(regex + r"\Z"), negate, dir_only))
+
+    def ignored(self, rel_path, is_dir):
+        """Last matching rule wins"""
+        result = False
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negate
+        return result
+
+
+class FileManifest:
+    """Snapshot of every source file under a root: (path, size, mtime, language).
+
+    `generation` increases whenever the set of files or any of their stats
+    changes, so caches can key on it instead of walking the tree again.
+    `fingerprint` is a stable content digest of the same data, usable across
+    processes.
+    """
+
+    def __init__(self, root, files, generation=0):
+        self.root = root
+        self.files = files
+        self.generation = generation
+        self._fingerprint = None
+
+    def __len__(self):
+        return len(self.files)
+
+    def __contains__(self, path):
+        return path in self.files
+
+    def get(self, path):
+        return self.files.get(path)
+
+    def paths(self, languages=None):
+        """Paths in discovery order, optionally filtered by language"""
+        if languages is None:
+            return list(self.files)
+        return [p for p, f in self.files.items() if f.language in languages]
+
+    def latest_mtime(self):
+        """Newest source modification time (seconds), 0 if empty"""
+        return max((f.mtime_ns for f in self.files.values()), default=0) / 1e9
+
+    @property
+    def fingerprint(self):
+        if self._fingerprint is None:
+            h = hashlib.blake2b(digest_size=16)
+            for f in self.files.values():
+                h.update(f"{f.path}\0{f.size}\0{f.mtime_ns}\n".encode())
+            self._fingerprint = h.hexdigest()
+        return self._fingerprint
+
+    def update_path(self, path, ignore_file=".gitignore"):
+        """Refresh one entry after a watcher event (removes it if gone, or if
+        discover_sources() would exclude it)"""
+        entry = None
+        if not is_excluded_path(path, self.root, ignore_file):
+            try:
+                entry = source_file_from_stat(path, os.stat(path))
+            except OSError:
+                pass
+
+        if entry is None or entry.language is None:
+            changed = self.files.pop(path, None) is not None
+        else:
+            changed = self.files.get(path) != entry
+            self.files[path] = entry
+        if changed:
+            self.generation += 1
+            self._fingerprint = None
+        return entry
+
+
+def _is_excluded(rel_path, name, is_dir, ignore):
+    if name.startswith("."):
+        return True
+    if is_dir and name in DEFAULT_EXCLUDED_DIRS:
+        return True
+    if any(fnmatch.fnmatch(rel_path, p) for p in EXTRA_EXCLUDES):
+        return True
+    return ignore.ignored(rel_path, is_dir)
+
+
+def is_excluded_path(path, root="src/", ignore_file=".gitignore"):
+    """Would discover_sources(root) skip path? Applies the same rules to just
+    the directories between root and path (paths outside root are excluded)"""
+    rel = os.path.relpath(path, root)
+    if rel.startswith(os.pardir):
+        return True
+    ignore = IgnoreRules()
+    ignore.add_file(ignore_file, "")
+    directory = os.path.normpath(root)
+    ignore.add_file(os.path.join(directory, ".gitignore"), directory)
+    parts = rel.split(os.sep)
+    for name in parts[:-1]:
+        directory = os.path.normpath(os.path.join(directory, name))
+        if _is_excluded(directory, name, True, ignore):
+            return True
+        ignore.add_file(os.path.join(directory, ".gitignore"), directory)
+    return _is_excluded(os.path.normpath(path), parts[-1], False, ignore)
+
+
+def discover_sources(root="src/", ignore_file=".gitignore"):
+    """Walk root once with os.scandir and return {path: SourceFile}.
+
+    Honours the repo-level .gitignore, any nested .gitignore files, the
+    default excluded directories and AGENTWINTER_EXCLUDE globs. Paths keep
+    the same shape as glob("src/**/*.ts") output.
+    """
+    ignore = IgnoreRules()
+    ignore.add_file(ignore_file, "")
+
+    files = []
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        nested_ignore = os.path.join(directory, ".gitignore")
+        if os.path.isfile(nested_ignore):
+            ignore.add_file(nested_ignore, os.path.normpath(directory))
+
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            rel_path = os.path.normpath(entry.path)
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not _is_excluded(rel_path, entry.name, True, ignore):
+                        subdirs.append(entry.path)
+                    continue
+                language = SOURCE_LANGUAGES.get(os.path.splitext(entry.name)[1])
+                if language is None or not entry.is_file():
+                    continue
+                if _is_excluded(rel_path, entry.name, False, ignore):
+                    continue
+                st = entry.stat()
+            except OSError:
+                continue
+            files.append(
+                SourceFile(entry.path, st.st_size, st.st_mtime_ns, st.st_ino, language)
+            )
+
+        # Reverse so the stack pops directories in name order
+        stack.extend(sorted(subdirs, reverse=True))
+
+    files.sort(key=lambda f: f.path)
+    return {f.path: f for f in files}
+
+
+_manifest = None
+
+# Held while a watcher batch updates the manifest and the indexes built from
+# it; readers that key results by generation take it too, so they never pair
+# the new generation with indexes that haven't caught up yet
+index_lock = threading.RLock()
+
+
+def scan_sources(root="src/"):
+    """Rescan root and make the result the shared manifest"""
+    global _manifest
+    files = discover_sources(root)
+    previous = _manifest
+    manifest = FileManifest(root, files)
+    if previous is not None and previous.root == root:
+        manifest.generation = previous.generation + (
+            0 if previous.files == files else 1
+        )
+    _manifest = manifest
+    return manifest
+
+
+def get_manifest(root="src/"):
+    """Current shared manifest, scanning only if there isn't one yet"""
+    if _manifest is None or _manifest.root != root:
+        return scan_sources(root)
+    return _manifest
@@ -0,0 +1,313 @@
+"""Compact record types for parsed file facts"""
+
+import base64
+import re
+import weakref
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from sys import intern
+
+# Order of the per-kind blocks in FileFacts.spans
+SPAN_KINDS = ("imports", "functions", "components", "stores", "exports")
+SPAN_WIDTH = 6
+
+# Lines and columns are 0-based (Tree-sitter points); columns count bytes
+Span = namedtuple("Span", "start_byte end_byte start_line start_col end_line end_col")
+
+_NEWLINE = re.compile(b"\n")
+
+# How much of a file the facts cover (see parser budgets)
+MODE_FULL = "full"
+MODE_HEADER = "header"  # imports/exports from the first N KB only
+MODE_SKIPPED = "skipped"  # too large to read at all
+
+# Import name recorded for `export * from './x'` (re-exports count as imports
+# so barrel files link into the import graph)
+REEXPORT_ALL = "*"
+
+# One shared ImportRef per distinct (name, source) pair - the same
+# `createSignal` from `solid-js` appears in hundreds of files. Weak, so a
+# ref no file imports any more (e.g. edited away in watch mode) is freed.
+_import_refs = weakref.WeakValueDictionary()
+
+
+def make_import(name, source):
+    """Get the shared ImportRef for (name, source)"""
+    key = (name, source)
+    ref = _import_refs.get(key)
+    if ref is None:
+        ref = _import_refs[key] = ImportRef(name, source)
+    return ref
+
+
+def compute_line_offsets(code):
+    """Byte offset where each line starts"""
+    offsets = array("I", [0])
+    offsets.extend(m.end() for m in _NEWLINE.finditer(code))
+    return offsets
+
+
+def span_from_offsets(line_offsets, start_byte, end_byte):
+    """Span for a byte range, using a line-offset table"""
+    start_line = bisect_right(line_offsets, start_byte) - 1
+    end_line = bisect_right(line_offsets, end_byte) - 1
+    return Span(
+        start_byte,
+        end_byte,
+        start_line,
+        start_byte - line_offsets[start_line],
+        end_line,
+        end_byte - line_offsets[end_line],
+    )
+
+
+def _pack(arr):
+    return base64.b64encode(arr.tobytes()).decode("ascii")
+
+
+def _unpack(text):
+    arr = array("I")
+    arr.frombytes(base64.b64decode(text))
+    return arr
+
+
+class ImportRef:
+    """One imported name and the module specifier it comes from.
+
+    Instances are shared (see make_import), so treat them as immutable.
+    """
+
+    __slots__ = ("name", "source", "__weakref__")
+
+    def __init__(self, name, source):
+        self.name = intern(name)
+        self.source = intern(source)
+
+    def __eq__(self, other):
+        if not isinstance(other, ImportRef):
+            return NotImplemented
+        return self.name == other.name and self.source == other.source
+
+    def __hash__(self):
+        return hash((self.name, self.source))
+
+    def __repr__(self):
+        return f"ImportRef({self.name!r}, {self.source!r})"
+
+    def __reduce__(self):
+        # Unpickling (pool workers) goes back through the shared table
+        return (make_import, (self.name, self.source))
+
+
+class FileFacts:
+    """Imports, definitions and exports extracted from one source file.
+
+    Names and paths are interned, imports are shared ImportRefs, and every
+    collection is a tuple, so a large parsed_files map costs a fraction of
+    the old dict-of-lists-of-dicts.
+
+    Positions live in one flat array: SPAN_WIDTH ints per entry, one block
+    per kind in SPAN_KINDS order, parallel to the name tuples. Together with
+    the line-offset table this lets tools report locations and slice
+    snippets without re-parsing or re-scanning the file.
+
+    `mode` says whether the whole file was indexed (MODE_FULL) or only
+    partially, with `reason` saying why (size, minified, timeout...).
+    """
+
+    __slots__ = (
+        "path",
+        "imports",
+        "functions",
+        "components",
+        "stores",
+        "exports",
+        "spans",
+        "line_offsets",
+        "mode",
+        "reason",
+    )
+
+    def __init__(
+        self,
+        path,
+        imports=(),
+        functions=(),
+        components=(),
+        stores=(),
+        exports=(),
+        spans=None,
+        line_offsets=None,
+        mode=MODE_FULL,
+        reason=None,
+    ):
+        self.path = intern(path)
+        self.imports = tuple(imports)
+        self.functions = tuple(intern(n) for n in functions)
+        self.components = tuple(intern(n) for n in components)
+        self.stores = tuple(intern(n) for n in stores)
+        self.exports = tuple(intern(n) for n in exports)
+        self.spans = spans if spans is not None else array("I")
+        self.line_offsets = line_offsets if line_offsets is not None else array("I")
+        self.mode = mode
+        self.reason = reason
+
+    def approx_size(self):
+        """Rough bytes this record holds on its own, for cache budgets (names
+        are interned and ImportRefs shared, so they count as pointers)"""
+        names = (
+            len(self.imports)
+            + len(self.functions)
+            + len(self.components)
+            + len(self.stores)
+            + len(self.exports)
+        )
+        arrays = len(self.spans) * self.spans.itemsize
+        arrays += len(self.line_offsets) * self.line_offsets.itemsize
+        return 400 + 8 * names + arrays
+
+    def has_symbols(self):
+        """True if anything worth indexing was found"""
+        return bool(self.imports or self.functions or self.components or self.stores)
+
+    def get_spans(self, kind):
+        """Spans for one kind, parallel to that kind's names (empty if unknown)"""
+        offset = 0
+        for k in SPAN_KINDS:
+            if k == kind:
+                break
+            offset += len(getattr(self, k))
+        count = len(getattr(self, kind))
+        if len(self.spans) < (offset + count) * SPAN_WIDTH:
+            return []
+        flat = self.spans
+        return [
+            Span(*flat[i : i + SPAN_WIDTH])
+            for i in range(offset * SPAN_WIDTH, (offset + count) * SPAN_WIDTH, SPAN_WIDTH)
+        ]
+
+    def locate(self, name, kinds=SPAN_KINDS):
+        """[(kind, Span)] for every definition, import or export of name"""
+        found = []
+        for kind in kinds:
+            names = getattr(self, kind)
+            if kind == "imports":
+                hits = [i for i, imp in enumerate(names) if imp.name == name]
+            else:
+                hits = [i for i, n in enumerate(names) if n == name]
+            if hits:
+                spans = self.get_spans(kind)
+                found.extend((kind, spans[i]) for i in hits if i < len(spans))
+        return found
+
+    def snippet(self, span, max_lines=None):
+        """Source text of the whole lines a span covers, read by offset"""
+        offsets = self.line_offsets
+        if not offsets or span.start_line >= len(offsets):
+            return None
+        last_line = span.end_line
+        if max_lines is not None:
+            last_line = min(last_line, span.start_line + max_lines - 1)
+        start = offsets[span.start_line]
+        end = offsets[last_line + 1] if last_line + 1 < len(offsets) else None
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(start)
+                data = f.read(end - start) if end is not None else f.read()
+        except OSError:
+            return None
+        return data.decode("utf-8", errors="ignore").rstrip("\n")
+
+    def __eq__(self, other):
+        if not isinstance(other, FileFacts):
+            return NotImplemented
+        return (
+            self.path == other.path
+            and self.imports == other.imports
+            and self.functions == other.functions
+            and self.components == other.components
+            and self.stores == other.stores
+            and self.exports == other.exports
+            and self.spans == other.spans
+            and self.mode == other.mode
+        )
+
+    def __repr__(self):
+        mode = "" if self.mode == MODE_FULL else f", mode={self.mode!r}"
+        return (
+            f"FileFacts({self.path!r}, imports={len(self.imports)}, "
+            f"functions={len(self.functions)}, components={len(self.components)}, "
+            f"stores={len(self.stores)}, exports={len(self.exports)}{mode})"
+        )
+
+    def __reduce__(self):
+        return (
+            FileFacts,
+            (
+                self.path,
+                self.imports,
+                self.functions,
+                self.components,
+                self.stores,
+                self.exports,
+                self.spans,
+                self.line_offsets,
+                self.mode,
+                self.reason,
+            ),
+        )
+
+    def to_row(self):
+        """JSON-friendly row for the facts store"""
+        return [
+            self.path,
+            [[imp.name, imp.source] for imp in self.imports],
+            list(self.functions),
+            list(self.components),
+            list(self.stores),
+            list(self.exports),
+            _pack(self.spans),
+            _pack(self.line_offsets),
+            self.mode,
+            self.reason,
+        ]
+
+    @classmethod
+    def from_row(cls, row):
+        (
+            path,
+            imports,
+            functions,
+            components,
+            stores,
+            exports,
+            spans,
+            offsets,
+            mode,
+            reason,
+        ) = row
+        return cls(
+            path,
+            [make_import(name, source) for name, source in imports],
+            functions,
+            components,
+            stores,
+            exports,
+            _unpack(spans),
+            _unpack(offsets),
+            mode,
+            reason,
+        )
+
+    def to_dict(self):
+        """Legacy dict shape, for display/JSON output"""
+        return {
+            "imports": [{"name": i.name, "from": i.source} for i in self.imports],
+            "functions": list(self.functions),
+            "components": list(self.components),
+            "stores": list(self.stores),
+            "exports": list(self.exports),
+            "mode": self.mode,
+            "file_path": self.path,
+        }
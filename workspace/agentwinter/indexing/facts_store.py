@@ -0,0 +1,215 @@
+"""Persistent on-disk store for parsed file facts"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+from .facts import FileFacts
+
+CACHE_DIR = os.getenv("AGENTWINTER_CACHE_DIR", "workspace/.agentwinter")
+FACTS_DB_PATH = os.path.join(CACHE_DIR, "facts.db")
+
+# Bump whenever the parser extracts facts differently, so old rows are ignored
+FACTS_VERSION = 6
+
+
+def file_digest(file_path):
+    """Hash file contents (blake2b, 128-bit)"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def stat_key(st):
+    """Cheap change detector: (mtime_ns, size, inode)"""
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class FactsStore:
+    """SQLite-backed facts cache keyed by path.
+
+    A row is reused when the file's (mtime, size, inode) is unchanged. If the
+    stat differs (touch, checkout, copy) the content hash decides, so only
+    files whose bytes really changed get re-parsed.
+    """
+
+    def __init__(self, db_path=FACTS_DB_PATH):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS facts (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                facts TEXT NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+        self.rows = None
+        self.pending = {}
+        self.hits = 0
+        self.rehashed_hits = 0
+        self.misses = 0
+
+    def _load(self):
+        """Read every row once; lookups are then pure dict hits"""
+        if self.rows is not None:
+            return
+        cur = self.conn.execute(
+            "SELECT path, mtime_ns, size, inode, digest, version, facts FROM facts"
+        )
+        self.rows = {
+            row[0]: row[1:] for row in cur if row[5] == FACTS_VERSION
+        }
+
+    def lookup(self, file_path, key=None):
+        """Return cached facts for file_path, or None if it must be re-parsed.
+
+        key is the file's (mtime_ns, size, inode), e.g. from the manifest.
+        """
+        with self.lock:
+            self._load()
+            row = self.rows.get(file_path)
+            if row is None:
+                self.misses += 1
+                return None
+
+            try:
+                key = key or stat_key(os.stat(file_path))
+            except OSError:
+                self.misses += 1
+                return None
+
+            mtime_ns, size, inode, digest, _version, facts_json = row
+            if key == (mtime_ns, size, inode):
+                self.hits += 1
+                return FileFacts.from_row(json.loads(facts_json))
+
+            if key[1] != size:
+                self.misses += 1
+                return None
+
+            # Stat changed but size didn't - let the content decide
+            try:
+                if file_digest(file_path) != digest:
+                    self.misses += 1
+                    return None
+            except OSError:
+                self.misses += 1
+                return None
+
+            new_row = (*key, digest, FACTS_VERSION, facts_json)
+            self.rows[file_path] = new_row
+            self.pending[file_path] = new_row
+            self.rehashed_hits += 1
+            return FileFacts.from_row(json.loads(facts_json))
+
+    def get(self, file_path):
+        """Stored facts for file_path, unvalidated and without loading every row.
+
+        Only for callers that already know the file is unchanged (e.g. the
+        index snapshot matched the manifest fingerprint).
+        """
+        with self.lock:
+            if self.rows is not None:
+                row = self.rows.get(file_path)
+                facts_json = row[5] if row else None
+            else:
+                row = self.conn.execute(
+                    "SELECT facts FROM facts WHERE path = ? AND version = ?",
+                    (file_path, FACTS_VERSION),
+                ).fetchone()
+                facts_json = row[0] if row else None
+        return FileFacts.from_row(json.loads(facts_json)) if facts_json else None
+
+    def put(self, file_path, facts, key_before):
+        """Record facts parsed from file_path (stat key taken before parsing)"""
+        try:
+            digest = file_digest(file_path)
+            key_after = stat_key(os.stat(file_path))
+        except OSError:
+            return
+
+        # File changed while we were parsing it - don't cache a torn result
+        if key_after != tuple(key_before):
+            return
+
+        row = (*key_after, digest, FACTS_VERSION, json.dumps(facts.to_row()))
+        with self.lock:
+            self._load()
+            self.rows[file_path] = row
+            self.pending[file_path] = row
+
+    def prune(self, live_paths):
+        """Forget files that no longer exist"""
+        with self.lock:
+            self._load()
+            dead = [p for p in self.rows if p not in live_paths]
+            for path in dead:
+                del self.rows[path]
+                self.pending.pop(path, None)
+            if dead:
+                self.conn.executemany(
+                    "DELETE FROM facts WHERE path = ?", [(p,) for p in dead]
+                )
+                self.conn.commit()
+
+    def flush(self):
+        """Write pending rows to disk in one transaction"""
+        with self.lock:
+            if not self.pending:
+                return
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO facts "
+                "(path, mtime_ns, size, inode, digest, version, facts) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(path, *row) for path, row in self.pending.items()],
+            )
+            self.conn.commit()
+            self.pending.clear()
+
+    def clear(self):
+        """Drop all cached facts"""
+        with self.lock:
+            self.conn.execute("DELETE FROM facts")
+            self.conn.commit()
+            self.rows = {}
+            self.pending.clear()
+
+    def stats(self):
+        """Get store statistics"""
+        with self.lock:
+            return {
+                "files": len(self.rows) if self.rows is not None else 0,
+                "hits": self.hits + self.rehashed_hits,
+                "rehashed_hits": self.rehashed_hits,
+                "misses": self.misses,
+            }
+
+
+_store = None
+_store_failed = False
+
+
+def get_facts_store():
+    """Shared store instance, or None if the cache dir is unusable"""
+    global _store, _store_failed
+    if _store is None and not _store_failed:
+        try:
+            _store = FactsStore()
+        except (OSError, sqlite3.Error):
+            _store_failed = True
+    return _store
@@ -1,5 +1,6 @@
 """Live file watching for automatic re-indexing"""
 
+import threading
 import time
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
@@ -8,76 +9,162 @@ try:
     from .cache import clear_parse_cache
 except ImportError:
 
-    def clear_parse_cache():
+    def clear_parse_cache(filepath=None):
         return None
 
 
-class CodeFileHandler(FileSystemEventHandler):
-    """Handle code file change events"""
+WATCHED_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx")
+QUIET_SECONDS = 0.5  # Deliver once nothing has changed for this long
+MAX_WAIT_SECONDS = 5  # ...or after this long, if changes never stop
+
+
+def collapse_events(previous, event):
+    """Net effect of two events on one path ('created'/'modified'/'deleted').
 
-    def __init__(self, on_change_callback):
-        self.on_change = on_change_callback
-        self.last_modified = {}
-        self.debounce_seconds = 1  # Ignore rapid successive changes
+    Only whether the file still exists really matters - the batch is applied
+    to what's on disk - but created/deleted also tell the indexer to refresh
+    import resolution and the directory listing.
+    """
+    if previous is None or previous == event:
+        return event
+    if event == "deleted":
+        return "deleted"
+    if previous == "created":
+        return "created"  # created, then written to
+    return "modified"  # deleted and recreated (atomic save), or modified again
+
+
+class CodeFileHandler(FileSystemEventHandler):
+    """Collect code file events and deliver them in batches.
+
+    Events are coalesced per path and delivered once the tree has been quiet
+    for quiet_seconds (trailing edge, so the final state of every file is
+    seen), or after max_wait_seconds of constant activity. Batches go to
+    on_batch({path: event}) on one worker thread, in order - never on the
+    watchdog thread.
+    """
+
+    def __init__(
+        self,
+        on_batch_callback,
+        quiet_seconds=QUIET_SECONDS,
+        max_wait_seconds=MAX_WAIT_SECONDS,
+    ):
+        self.on_batch = on_batch_callback
+        self.quiet_seconds = quiet_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self.condition = threading.Condition()
+        self.pending = {}  # path -> collapsed event
+        self.first_event = None
+        self.last_event = None
+        self.stopped = False
+        self.worker = None
 
     def should_process(self, file_path):
         """Check if we should process this file"""
-        # Only process code files
-        if not file_path.endswith((".ts", ".tsx", ".js", ".jsx")):
-            return False
-
-        # Debounce - ignore if changed within last second
-        now = time.time()
-        if file_path in self.last_modified:
-            if now - self.last_modified[file_path] < self.debounce_seconds:
-                return False
+        return file_path.endswith(WATCHED_EXTENSIONS)
 
-        self.last_modified[file_path] = now
-        return True
+    def record(self, file_path, event_type):
+        """Add one event to the pending batch"""
+        if not self.should_process(file_path):
+            return
+        with self.condition:
+            self.pending[file_path] = collapse_events(
+                self.pending.get(file_path), event_type
+            )
+            now = time.monotonic()
+            if self.first_event is None:
+                self.first_event = now
+            self.last_event = now
+            self.condition.notify()
 
     def on_modified(self, event):
         """File was modified"""
-        if event.is_directory:
-            return
-
-        if self.should_process(event.src_path):
-            self.on_change(event.src_path, "modified")
+        if not event.is_directory:
+            self.record(event.src_path, "modified")
 
     def on_created(self, event):
         """File was created"""
-        if event.is_directory:
-            return
-
-        if self.should_process(event.src_path):
-            self.on_change(event.src_path, "created")
+        if not event.is_directory:
+            self.record(event.src_path, "created")
 
     def on_deleted(self, event):
         """File was deleted"""
-        if event.is_directory:
-            return
+        if not event.is_directory:
+            self.record(event.src_path, "deleted")
+
+    def on_moved(self, event):
+        """File was renamed (watchdog also reports each file of a moved dir)"""
+        if not event.is_directory:
+            self.record(event.src_path, "deleted")
+            self.record(event.dest_path, "created")
+
+    def take_batch(self):
+        """Wait for a quiet window, then hand over the pending batch (None
+        once stopped)"""
+        with self.condition:
+            while not self.stopped:
+                if not self.pending:
+                    self.condition.wait()
+                    continue
+                due = min(
+                    self.last_event + self.quiet_seconds,
+                    self.first_event + self.max_wait_seconds,
+                )
+                wait = due - time.monotonic()
+                if wait <= 0:
+                    batch, self.pending = self.pending, {}
+                    self.first_event = self.last_event = None
+                    return batch
+                self.condition.wait(wait)
+            return None
+
+    def _deliver(self):
+        while True:
+            batch = self.take_batch()
+            if batch is None:
+                return
+            try:
+                self.on_batch(batch)
+            except Exception as e:
+                print(f"⚠️  Watch update failed: {e}")
 
-        if event.src_path.endswith((".ts", ".tsx", ".js", ".jsx")):
-            self.on_change(event.src_path, "deleted")
+    def start(self):
+        self.worker = threading.Thread(
+            target=self._deliver, name="agentwinter-watch", daemon=True
+        )
+        self.worker.start()
+
+    def stop(self):
+        """Stop delivering (changes still pending are dropped)"""
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        if self.worker is not None:
+            self.worker.join()
 
 
 class FileWatcher:
     """Watch directory for file changes"""
 
-    def __init__(self, watch_path="src/", on_change_callback=None):
+    def __init__(
+        self, watch_path="src/", on_batch_callback=None, quiet_seconds=QUIET_SECONDS
+    ):
         self.watch_path = watch_path
         self.observer = Observer()
-        self.on_change = on_change_callback or self.default_callback
+        self.on_batch = on_batch_callback or self.default_callback
+        self.handler = CodeFileHandler(self.on_batch, quiet_seconds)
 
-    def default_callback(self, file_path, event_type):
-        """Default callback if none provided"""
-        clear_parse_cache()  # Clear cache on any change
+    def default_callback(self, changes):
         """Default callback if none provided"""
-        print(f"📝 {event_type.title()}: {file_path}")
+        for file_path, event_type in sorted(changes.items()):
+            clear_parse_cache(file_path)  # Drop the changed file's cached parse
+            print(f"📝 {event_type.title()}: {file_path}")
 
     def start(self):
         """Start watching for changes"""
-        handler = CodeFileHandler(self.on_change)
-        self.observer.schedule(handler, self.watch_path, recursive=True)
+        self.handler.start()
+        self.observer.schedule(self.handler, self.watch_path, recursive=True)
         self.observer.start()
         print(f"👀 Watching {self.watch_path} for changes...")
 
@@ -85,14 +172,15 @@ class FileWatcher:
         """Stop watching"""
         self.observer.stop()
         self.observer.join()
+        self.handler.stop()
 
     def is_alive(self):
         """Check if watcher is running"""
         return self.observer.is_alive()
 
 
-def watch_files(watch_path="src/", on_change_callback=None):
+def watch_files(watch_path="src/", on_batch_callback=None):
     """Convenience function to start watching"""
-    watcher = FileWatcher(watch_path, on_change_callback)
+    watcher = FileWatcher(watch_path, on_batch_callback)
     watcher.start()
     return watcher
@@ -0,0 +1,313 @@
+"""File-level import graph with cached strongly-connected components"""
+
+from collections import deque
+
+from .resolver import get_resolver
+
+DEPENDENTS = "dependents"
+DEPENDENCIES = "dependencies"
+
+
+def feature_of(path):
+    """'proximity' for src/features/proximity/..., else None"""
+    if "features/" not in path:
+        return None
+    return path.split("features/")[1].split("/")[0]
+
+
+class ImportGraph:
+    """Which file imports which, as adjacency sets over integer node ids.
+
+    Every parsed file is a node (a member); files that are only ever
+    imported (e.g. types-only modules) are nodes while something imports
+    them. Both directions are kept (out: what a file imports, inc: who
+    imports it) so dependents and dependencies are equally cheap, plus a
+    feature -> files map for the feature-level views.
+
+    Transitive queries run over the condensation DAG - strongly connected
+    components (import cycles) collapsed to single nodes - which is
+    computed once with an iterative Tarjan and cached, along with every
+    closure asked for and the feature-to-feature edges. Any node or edge
+    change drops those caches; re-applying a file whose imports didn't
+    change is free.
+    """
+
+    def __init__(self):
+        self.ids = {}  # path -> node id
+        self.paths = []  # node id -> path (None once freed)
+        self.free_ids = []
+        self.out = []  # node id -> {node id it imports}
+        self.inc = []  # node id -> {node id importing it}
+        self.members = {}  # node id -> None, for files in parsed_files
+        self.features = {}  # feature -> {path: None}, members only
+        self.version = 0  # bumped on every node/edge change
+        self._scc = None  # (comp_of, members, dag_out, dag_in)
+        self._closures = {}  # (direction, component) -> frozenset of components
+        self._feature_edges = None
+        self.source = None  # the parsed_files this was built from
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, path):
+        return path in self.ids
+
+    def _node(self, path):
+        node = self.ids.get(path)
+        if node is None:
+            if self.free_ids:
+                node = self.free_ids.pop()
+                self.paths[node] = path
+            else:
+                node = len(self.paths)
+                self.paths.append(path)
+                self.out.append(set())
+                self.inc.append(set())
+            self.ids[path] = node
+            self._invalidate()
+        return node
+
+    def _release(self, node):
+        """Free node if it is neither a member nor on any edge"""
+        if node in self.members or self.out[node] or self.inc[node]:
+            return
+        del self.ids[self.paths[node]]
+        self.paths[node] = None
+        self.free_ids.append(node)
+        self._invalidate()
+
+    def _set_member(self, node, member):
+        path = self.paths[node]
+        feature = feature_of(path)
+        if member and node not in self.members:
+            self.members[node] = None
+            if feature:
+                self.features.setdefault(feature, {})[path] = None
+        elif not member and node in self.members:
+            del self.members[node]
+            if feature:
+                files = self.features[feature]
+                files.pop(path, None)
+                if not files:
+                    del self.features[feature]
+
+    def _invalidate(self):
+        self.version += 1
+        self._scc = None
+        self._closures.clear()
+        self._feature_edges = None
+
+    def edge_count(self):
+        return sum(len(targets) for targets in self.out)
+
+    def set_imports(self, path, targets, member=True):
+        """Make path's outgoing edges exactly targets (paths).
+
+        member=False: path is no longer a parsed file (deleted, or nothing
+        worth indexing); it stays a node only while something imports it.
+        """
+        if not member and not targets and path not in self.ids:
+            return
+        node = self._node(path)
+        self._set_member(node, member)
+        new = {self._node(t) for t in targets if t != path}
+        old = self.out[node]
+        if new != old:
+            for target in new - old:
+                self.inc[target].add(node)
+            self.out[node] = new
+            for target in old - new:
+                self.inc[target].discard(node)
+                self._release(target)
+            self._invalidate()
+        self._release(node)
+
+    def update_file(self, path, facts):
+        """Re-resolve one file's imports (facts None: no longer a parsed file)"""
+        imports = _resolved_imports(path, facts, get_resolver())
+        self.set_imports(path, imports, member=facts is not None)
+
+    def refresh(self, parsed_files):
+        """Re-resolve every file - after files appear or disappear, since that
+        can change what other files' imports point at"""
+        resolver = get_resolver()
+        for path in [p for p in self.ids if p not in parsed_files]:
+            self.set_imports(path, (), member=False)
+        for path, facts in parsed_files.items():
+            self.set_imports(path, _resolved_imports(path, facts, resolver))
+
+    def imports_of(self, path):
+        node = self.ids.get(path)
+        return sorted(self.paths[n] for n in self.out[node]) if node is not None else []
+
+    def imported_by(self, path):
+        node = self.ids.get(path)
+        return sorted(self.paths[n] for n in self.inc[node]) if node is not None else []
+
+    def feature_files(self, feature):
+        """Sorted member files under src/features/<feature>/"""
+        return sorted(self.features.get(feature, ()))
+
+    def feature_edges(self):
+        """{(from feature, to feature): file imports} across features (cached)"""
+        if self._feature_edges is None:
+            edges = {}
+            for feature, files in self.features.items():
+                for path in files:
+                    for target in self.out[self.ids[path]]:
+                        other = feature_of(self.paths[target])
+                        if other and other != feature:
+                            key = (feature, other)
+                            edges[key] = edges.get(key, 0) + 1
+            self._feature_edges = edges
+        return self._feature_edges
+
+    def _components(self):
+        """Iterative Tarjan: (comp_of, members, dag_out, dag_in), cached"""
+        if self._scc is not None:
+            return self._scc
+
+        size = len(self.paths)
+        index = [-1] * size
+        low = [0] * size
+        on_stack = [False] * size
+        comp_of = [-1] * size
+        stack, members = [], []
+        counter = 0
+
+        for root in self.ids.values():
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, iter(self.out[root]))]
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if index[child] == -1:
+                        index[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack[child] = True
+                        work.append((child, iter(self.out[child])))
+                        break
+                    if on_stack[child] and index[child] < low[node]:
+                        low[node] = index[child]
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        if low[node] < low[parent]:
+                            low[parent] = low[node]
+                    if low[node] == index[node]:
+                        comp, group = len(members), []
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = False
+                            comp_of[member] = comp
+                            group.append(member)
+                            if member == node:
+                                break
+                        members.append(group)
+
+        dag_out = [set() for _ in members]
+        dag_in = [set() for _ in members]
+        for comp, group in enumerate(members):
+            for node in group:
+                for target in self.out[node]:
+                    other = comp_of[target]
+                    if other != comp:
+                        dag_out[comp].add(other)
+                        dag_in[other].add(comp)
+
+        self._scc = (comp_of, members, dag_out, dag_in)
+        return self._scc
+
+    def _closure(self, direction, comp):
+        key = (direction, comp)
+        reached = self._closures.get(key)
+        if reached is None:
+            _, _, dag_out, dag_in = self._components()
+            edges = dag_in if direction == DEPENDENTS else dag_out
+            seen = {comp}
+            queue = deque([comp])
+            while queue:
+                for other in edges[queue.popleft()]:
+                    if other not in seen:
+                        seen.add(other)
+                        queue.append(other)
+            seen.discard(comp)
+            reached = self._closures[key] = frozenset(seen)
+        return reached
+
+    def transitive(self, path, direction=DEPENDENTS):
+        """Every file that (transitively) imports path, or that path imports.
+
+        Files in an import cycle with path are included in both directions.
+        """
+        node = self.ids.get(path)
+        if node is None:
+            return set()
+        comp_of, members, _, _ = self._components()
+        comp = comp_of[node]
+        result = {self.paths[n] for n in members[comp] if n != node}
+        for other in self._closure(direction, comp):
+            result.update(self.paths[n] for n in members[other])
+        return result
+
+    def cycle_of(self, path):
+        """Other files in an import cycle with path (empty if none)"""
+        node = self.ids.get(path)
+        if node is None:
+            return []
+        comp_of, members, _, _ = self._components()
+        return sorted(self.paths[n] for n in members[comp_of[node]] if n != node)
+
+    def stats(self):
+        comp_count = len(self._scc[1]) if self._scc is not None else None
+        return {
+            "files": len(self.members),
+            "nodes": len(self.ids),
+            "edges": self.edge_count(),
+            "components": comp_count,
+            "cached_closures": len(self._closures),
+            "version": self.version,
+        }
+
+
+def _resolved_imports(path, facts, resolver):
+    if facts is None:
+        return ()
+    targets = {}
+    for imp in facts.imports:
+        target = resolver.resolve(imp.source, path)
+        if target is not None:
+            targets[target] = None
+    return targets
+
+
+def build_graph(parsed_files):
+    """ImportGraph over parsed_files, resolved with the shared resolver"""
+    graph = ImportGraph()
+    graph.refresh(parsed_files)
+    graph.source = parsed_files
+    return graph
+
+
+_graph = None
+
+
+def get_import_graph(parsed_files=None):
+    """Shared graph, (re)built when handed a different parsed_files.
+
+    With no parsed_files, returns the current graph (or None) without
+    building - e.g. for the watcher, which only updates a graph that exists.
+    """
+    global _graph
+    if parsed_files is not None and (
+        _graph is None or _graph.source is not parsed_files
+    ):
+        _graph = build_graph(parsed_files)
+    return _graph
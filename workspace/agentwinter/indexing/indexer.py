@@ -1,45 +1,277 @@
 """Build and query symbol index from parsed files"""
 
+from collections import Counter
+from collections.abc import Mapping
 
-def build_index(parsed_files):
-    """Build symbol index: {symbol_name: {defined_in: [], used_in: []}}"""
-    index = {}
+from .facts import REEXPORT_ALL
+from .name_index import SUGGESTION_LIMIT, NameIndex
 
-    for filepath, facts in parsed_files.items():
-        # Index definitions
-        for func in facts.get("functions", []):
-            index.setdefault(func, {"defined_in": [], "used_in": []})
-            if filepath not in index[func]["defined_in"]:
-                index[func]["defined_in"].append(filepath)
 
-        for comp in facts.get("components", []):
-            index.setdefault(comp, {"defined_in": [], "used_in": []})
-            if filepath not in index[comp]["defined_in"]:
-                index[comp]["defined_in"].append(filepath)
+# Symbol kinds, strongest first (an entry's "kind" is the strongest it is
+# defined as; listings include it under every kind it is defined as)
+KINDS = ("store", "component", "function", "import")
+_FACT_KINDS = (("stores", "store"), ("components", "component"), ("functions", "function"))
+
+
+def _file_symbols(facts):
+    """(defined, used) for one file: ((name, kind), ...) and (name, ...)"""
+    if facts is None:
+        return (), ()
+    defined = dict.fromkeys(
+        (name, kind) for field, kind in _FACT_KINDS for name in getattr(facts, field)
+    )
+    used = dict.fromkeys(
+        imp.name for imp in facts.imports if imp.name != REEXPORT_ALL
+    )
+    return tuple(defined), tuple(used)
+
+
+def _is_store_name(symbol):
+    return "store" in symbol.lower()
+
+
+class SymbolIndex(Mapping):
+    """Symbol index: {symbol_name: {defined_in, used_in, kind}}
+
+    defined_in/used_in are ordered sets (dict keys, in discovery order), so
+    adding or removing a file is O(1) per symbol however popular it is.
+    kind is the symbol's strongest definition kind, or "import" if it is
+    only ever imported. The per-kind listings include a symbol under every
+    kind any file defines it as, so a name that is a component in one file
+    and a function in another is listed as both.
+
+    Besides the primary map it keeps:
+    - a file -> (defined, used) reverse map, so a changed file is applied by
+      touching only that file's symbols;
+    - per-kind secondary indexes (by_kind), with sorted views cached until
+      that kind changes, so listing stores/components is a lookup;
+    - a NameIndex (prefix + trigram) over symbol names, built on first use
+      and then kept in step, for suggestions on a miss.
+    """
+
+    def __init__(self):
+        self.symbols = {}
+        self.file_symbols = {}
+        self.by_kind = {kind: {} for kind in KINDS}
+        self._sorted = {}
+        # symbol -> {kind: number of files defining it as that kind}
+        self._kind_counts = {}
+        self._names = None
+
+    def __getitem__(self, symbol):
+        return self.symbols[symbol]
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self.symbols
+
+    def _entry(self, symbol):
+        entry = self.symbols.get(symbol)
+        if entry is None:
+            entry = self.symbols[symbol] = {
+                "defined_in": {},
+                "used_in": {},
+                "kind": "import",
+            }
+            self._kind_counts[symbol] = dict.fromkeys(KINDS[:-1], 0)
+            if self._names is not None:
+                self._names.add(symbol)
+        return entry
+
+    def _set_kind(self, symbol, entry):
+        """Recompute entry's kind and which secondary indexes list it"""
+        counts = self._kind_counts[symbol]
+        entry["kind"] = next((k for k in KINDS[:-1] if counts[k]), "import")
+        for kind in KINDS:
+            if kind == "import":
+                listed = entry["kind"] == "import"
+            elif kind == "store":
+                # Also store-named symbols (e.g. an imported authStore)
+                listed = counts[kind] > 0 or _is_store_name(symbol)
+            else:
+                listed = counts[kind] > 0
+            if not listed:
+                self._unlist(symbol, kind)
+            elif symbol not in self.by_kind[kind]:
+                self.by_kind[kind][symbol] = None
+                self._sorted.pop(kind, None)
+
+    def _unlist(self, symbol, kind):
+        if self.by_kind[kind].pop(symbol, 0) is None:
+            self._sorted.pop(kind, None)
+
+    def _drop_if_empty(self, symbol, entry):
+        if entry["defined_in"] or entry["used_in"]:
+            self._set_kind(symbol, entry)
+            return
+        del self.symbols[symbol]
+        del self._kind_counts[symbol]
+        if self._names is not None:
+            self._names.remove(symbol)
+        for kind in KINDS:
+            self._unlist(symbol, kind)
+
+    def _define(self, symbol, kind, filepath):
+        entry = self._entry(symbol)
+        entry["defined_in"][filepath] = None
+        self._kind_counts[symbol][kind] += 1
+        self._set_kind(symbol, entry)
+
+    def _undefine(self, symbol, kind, filepath, keep_file=False):
+        """Drop one (symbol, kind) definition; keep_file: filepath still
+        defines symbol as another kind"""
+        entry = self.symbols.get(symbol)
+        if entry is None or filepath not in entry["defined_in"]:
+            return
+        self._kind_counts[symbol][kind] -= 1
+        if not keep_file:
+            del entry["defined_in"][filepath]
+        self._drop_if_empty(symbol, entry)
+
+    def _use(self, symbol, filepath):
+        entry = self._entry(symbol)
+        entry["used_in"][filepath] = None
+        self._set_kind(symbol, entry)
 
-        for store in facts.get("stores", []):
-            index.setdefault(store, {"defined_in": [], "used_in": []})
-            if filepath not in index[store]["defined_in"]:
-                index[store]["defined_in"].append(filepath)
+    def _unuse(self, symbol, filepath):
+        entry = self.symbols.get(symbol)
+        if entry is None or entry["used_in"].pop(filepath, 0) is not None:
+            return
+        self._drop_if_empty(symbol, entry)
+
+    def apply_file(self, filepath, old_facts, new_facts):
+        """Replace filepath's contribution (old_facts -> new_facts).
+
+        Only symbols that actually changed are touched, so a save costs time
+        proportional to the file, not the repo. old_facts is only consulted
+        if the file isn't in the reverse map yet.
+        """
+        old_defined, old_used = self.file_symbols.get(filepath) or _file_symbols(
+            old_facts
+        )
+        new_defined, new_used = _file_symbols(new_facts)
+
+        if old_defined != new_defined:
+            old_set, new_set = set(old_defined), set(new_defined)
+            removed = [pair for pair in old_defined if pair not in new_set]
+            # A file stays in defined_in until its last kind for the symbol goes
+            kinds_left = Counter(symbol for symbol, _ in new_defined)
+            kinds_left.update(symbol for symbol, _ in removed)
+            for symbol, kind in removed:
+                kinds_left[symbol] -= 1
+                self._undefine(symbol, kind, filepath, kinds_left[symbol] > 0)
+            for symbol, kind in new_defined:
+                if (symbol, kind) not in old_set:
+                    self._define(symbol, kind, filepath)
+
+        if old_used != new_used:
+            old_set, new_set = set(old_used), set(new_used)
+            for symbol in old_used:
+                if symbol not in new_set:
+                    self._unuse(symbol, filepath)
+            for symbol in new_used:
+                if symbol not in old_set:
+                    self._use(symbol, filepath)
+
+        if new_defined or new_used:
+            self.file_symbols[filepath] = (new_defined, new_used)
+        else:
+            self.file_symbols.pop(filepath, None)
+
+    def remove_file(self, filepath):
+        """Drop everything filepath defined or used"""
+        self.apply_file(filepath, None, None)
+
+    def symbols_in_file(self, filepath):
+        """(defined, used) for filepath: ((name, kind), ...) and (name, ...)"""
+        return self.file_symbols.get(filepath, ((), ()))
+
+    def names_of_kind(self, kind):
+        """Sorted symbol names of one kind (cached until that kind changes)"""
+        names = self._sorted.get(kind)
+        if names is None:
+            names = self._sorted[kind] = sorted(self.by_kind.get(kind, ()))
+        return names
+
+    def name_index(self):
+        """Prefix/trigram index over symbol names (built on first use)"""
+        if self._names is None:
+            self._names = NameIndex(self.symbols)
+        return self._names
+
+    def resolve(self, name):
+        """Exact symbol for name, falling back to a unique case-insensitive match"""
+        if name in self.symbols:
+            return name
+        matches = self.name_index().exact(name)
+        return matches[0] if len(matches) == 1 else None
+
+    def suggest(self, name, limit=SUGGESTION_LIMIT):
+        """[(symbol, score)] closest names, for 'did you mean' on a miss"""
+        return self.name_index().similar(name, limit)
+
+    def first_definition(self, symbol):
+        """First file that defines symbol, or None"""
+        entry = self.symbols.get(symbol)
+        if entry is None:
+            return None
+        return next(iter(entry["defined_in"]), None)
+
+
+def index_from_file_symbols(file_symbols):
+    """Bulk-build a SymbolIndex from (filepath, defined, used) triples"""
+    index = SymbolIndex()
+    entry_for = index._entry
+    kind_counts = index._kind_counts
+
+    # Fill entries directly, then classify every symbol once
+    for filepath, defined, used in file_symbols:
+        # Index definitions
+        for symbol, kind in defined:
+            entry_for(symbol)["defined_in"][filepath] = None
+            kind_counts[symbol][kind] += 1
 
         # Index usages via imports
-        for imp in facts.get("imports", []):
-            name = imp["name"]
-            index.setdefault(name, {"defined_in": [], "used_in": []})
-            if filepath not in index[name]["used_in"]:
-                index[name]["used_in"].append(filepath)
+        for symbol in used:
+            entry_for(symbol)["used_in"][filepath] = None
 
+        if defined or used:
+            index.file_symbols[filepath] = (defined, used)
+
+    for symbol, entry in index.symbols.items():
+        index._set_kind(symbol, entry)
     return index
 
 
+def build_index(parsed_files):
+    """Build symbol index: {symbol_name: {defined_in, used_in, kind}}
+
+    parsed_files maps path -> FileFacts. Returns a SymbolIndex, which can
+    then be kept current with apply_file/remove_file.
+    """
+    return index_from_file_symbols(
+        (filepath, *_file_symbols(facts)) for filepath, facts in parsed_files.items()
+    )
+
+
 def query_symbol(index, symbol_name):
     """Query symbol by name"""
     return index.get(symbol_name)
 
 
 def list_symbols_by_type(index, symbol_type):
-    """List all symbols of a certain type (e.g., 'store')"""
-    if symbol_type == "stores":
-        return {k: v for k, v in index.items() if "store" in k.lower()}
-    # Add more types as needed
-    return {}
+    """List all symbols of a certain type (e.g., 'stores', 'components')"""
+    kind = symbol_type[:-1] if symbol_type.endswith("s") else symbol_type
+    if kind not in KINDS:
+        return {}
+    if hasattr(index, "names_of_kind"):
+        return {name: index[name] for name in index.names_of_kind(kind)}
+    # Plain dict index (e.g. loaded from JSON)
+    if kind == "store":
+        return {k: v for k, v in index.items() if _is_store_name(k)}
+    return {k: v for k, v in index.items() if v.get("kind") == kind}
@@ -0,0 +1,113 @@
+"""Prefix and fuzzy lookup over symbol names"""
+
+from bisect import bisect_left, insort
+from collections import Counter
+
+SUGGESTION_LIMIT = 5
+MIN_SCORE = 0.3
+
+
+def _trigrams(key):
+    """Trigrams of a lowercased name, padded so short names still get some"""
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """Sorted array (bisect prefix search) plus a trigram index over names.
+
+    Keys are lowercased so lookups are case-insensitive; each key maps back
+    to the original spellings. Supports add/remove so it can follow an
+    incrementally updated SymbolIndex.
+    """
+
+    def __init__(self, names=()):
+        self.names = {}  # lowercased -> {original: None}
+        for name in names:
+            self.names.setdefault(name.lower(), {})[name] = None
+        self.keys = sorted(self.names)  # sorted lowercased names
+        self.grams = {}  # trigram -> {lowercased key: None}
+        for key in self.keys:
+            for gram in _trigrams(key):
+                self.grams.setdefault(gram, {})[key] = None
+
+    def __len__(self):
+        return sum(len(spellings) for spellings in self.names.values())
+
+    def add(self, name):
+        key = name.lower()
+        spellings = self.names.get(key)
+        if spellings is None:
+            spellings = self.names[key] = {}
+            insort(self.keys, key)
+            for gram in _trigrams(key):
+                self.grams.setdefault(gram, {})[key] = None
+        spellings[name] = None
+
+    def remove(self, name):
+        key = name.lower()
+        spellings = self.names.get(key)
+        if spellings is None or spellings.pop(name, 0) is not None:
+            return
+        if spellings:
+            return
+        del self.names[key]
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            del self.keys[i]
+        for gram in _trigrams(key):
+            bucket = self.grams.get(gram)
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del self.grams[gram]
+
+    def exact(self, name):
+        """Original spellings that match name case-insensitively"""
+        return list(self.names.get(name.lower(), ()))
+
+    def prefix(self, prefix, limit=50):
+        """Names starting with prefix (case-insensitive), in sorted order"""
+        key = prefix.lower()
+        out = []
+        i = bisect_left(self.keys, key)
+        while i < len(self.keys) and self.keys[i].startswith(key):
+            out.extend(self.names[self.keys[i]])
+            if len(out) >= limit:
+                return out[:limit]
+            i += 1
+        return out
+
+    def similar(self, name, limit=SUGGESTION_LIMIT, min_score=MIN_SCORE):
+        """[(name, score)] best matches by trigram overlap, prefix boosted"""
+        key = name.lower()
+        query = _trigrams(key)
+        shared = Counter()
+        for gram in query:
+            for candidate in self.grams.get(gram, ()):
+                shared[candidate] += 1
+
+        scored = {}
+        for candidate, common in shared.items():
+            # Dice coefficient over trigram sets
+            score = 2 * common / (len(query) + len(_trigrams(candidate)))
+            if candidate.startswith(key):
+                score = max(score, 0.5) + 0.25
+            elif key in candidate:
+                score += 0.1
+            scored[candidate] = min(score, 1.0)
+
+        for candidate in self.prefix(key, limit):
+            candidate = candidate.lower()
+            scored.setdefault(candidate, 0.75)
+
+        ranked = sorted(scored.items(), key=lambda item: (-item[1], item[0]))
+        results = []
+        for candidate, score in ranked:
+            if score < min_score:
+                break
+            for original in self.names.get(candidate, ()):
+                results.append((original, round(score, 3)))
+            if len(results) >= limit:
+                break
+        return results[:limit]
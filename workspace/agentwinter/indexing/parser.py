@@ -1,184 +1,887 @@
 """Parse code files to extract imports, functions, components, stores"""
 
 import re
-import glob
+import mmap
+import multiprocessing
 import os
-from functools import lru_cache
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .bounded_cache import BoundedCache
+from .discovery import get_manifest
+from .facts import (
+    MODE_FULL,
+    MODE_HEADER,
+    MODE_SKIPPED,
+    REEXPORT_ALL,
+    SPAN_KINDS,
+    FileFacts,
+    Span,
+    compute_line_offsets,
+    make_import,
+    span_from_offsets,
+)
+from .facts_store import get_facts_store, stat_key
 
 try:
-    from tree_sitter_languages import get_parser
+    from tree_sitter_languages import get_language, get_parser
 
     TREE_SITTER_AVAILABLE = True
 except ImportError:
     TREE_SITTER_AVAILABLE = False
 
+# Below this many files to parse, pool startup costs more than it saves
+PARALLEL_MIN_FILES = 64
 
-def parse_with_regex(file_path):
-    """Regex-based fallback parser"""
+# Per-file budgets. Files over MAX_FILE_BYTES (or that look minified /
+# generated, or blow PARSE_TIMEOUT_MS) are indexed header-only: imports and
+# exports from the first HEADER_BYTES. Files over SKIP_FILE_BYTES aren't read.
+MAX_FILE_BYTES = int(os.getenv("AGENTWINTER_MAX_FILE_BYTES", 1024 * 1024))
+HEADER_BYTES = int(os.getenv("AGENTWINTER_HEADER_BYTES", 64 * 1024))
+SKIP_FILE_BYTES = int(os.getenv("AGENTWINTER_SKIP_FILE_BYTES", 32 * 1024 * 1024))
+PARSE_TIMEOUT_MS = int(os.getenv("AGENTWINTER_PARSE_TIMEOUT_MS", 2000))
+# A timeout depends on machine load, not the file, so those facts aren't
+# persisted - the next run tries a full parse again
+TIMEOUT_REASON = "timeout"
+
+# Minified/generated detection, run on the first few KB of a file
+SNIFF_BYTES = 4096
+MINIFIED_LINE_BYTES = 500
+GENERATED_MARKERS = (b"@generated", b"DO NOT EDIT", b"auto-generated")
+
+# Per-process parser instances (each pool worker builds its own)
+_parsers = {}
+
+# Fact-extraction patterns, compiled once per grammar into a single query
+FACT_QUERY_PATTERNS = (
+    "(import_statement (import_clause (identifier) @import.default)"
+    " source: (string) @import.source) @import.stmt",
+    "(import_statement (import_clause (named_imports"
+    " (import_specifier name: (identifier) @import.name)))"
+    " source: (string) @import.source) @import.stmt",
+    "(function_declaration name: (identifier) @function) @function.def",
+    "(function_expression name: (identifier) @function) @function.def",
+    "(function name: (identifier) @function) @function.def",
+    "(lexical_declaration (variable_declarator"
+    " name: (_) @decl.name value: (_) @decl.value) @decl)",
+    '(call_expression function: (identifier) @store_call (#eq? @store_call "createStore"))',
+    "(arrow_function) @arrow",
+    "(export_statement declaration: (_ name: (_) @export.name)) @export.stmt",
+    "(export_statement declaration: (lexical_declaration"
+    " (variable_declarator name: (identifier) @export.name))) @export.stmt",
+    "(export_statement (export_clause (export_specifier"
+    " name: (_) @export.name alias: (_)? @export.alias))) @export.stmt",
+    "(export_statement value: (_) @export.value) @export.stmt",
+    "(export_statement (export_clause (export_specifier name: (_) @reexport.name))"
+    " source: (string) @reexport.source) @reexport.stmt",
+    '(export_statement . "*" source: (string) @reexport.all) @reexport.stmt',
+    "(export_statement (namespace_export) source: (string) @reexport.all)"
+    " @reexport.stmt",
+)
+
+# Fallback scanner: every fact kind in one alternation, one pass per file.
+# Each branch starts with a literal keyword so the engine can skip ahead to
+# candidate positions; lastgroup says which branch matched. Brace lists span
+# lines, so multi-line imports work. `export`/`async` in front of function
+# and const matches are found by looking back (_EXPORTED).
+REGEX_SCANNER = re.compile(
+    rb"""
+    (?P<import>
+        import\s+(?:type\s+)?
+        (?:(?P<idefault>[\w$]+)\s*,?\s*)?
+        (?:\{(?P<inamed>[^}]*)\}|\*\s*as\s+[\w$]+)?
+        \s*from\s*['"](?P<isrc>[^'"\n]+)['"]
+    )
+    |export\s+(?:
+        (?P<default>
+            default\s+
+            (?:(?:async\s+)?function\b\s*\*?\s*(?P<dfn>[\w$]+)?
+              |class\s+(?P<dclass>[\w$]+)
+              |(?P<dvalue>[\w$]+)(?!\s*[(.=\[])
+            )?
+        )
+        |(?P<exportdecl>
+            (?:declare\s+)?(?:abstract\s+)?(?:interface|type|class|enum)\s+
+            (?P<xname>[\w$]+)
+        )
+        |(?P<exports>
+            (?:type\s*)?\{(?P<eclause>[^}]*)\}
+            (?:\s*from\s*['"](?P<esrc>[^'"\n]+)['"])?
+        )
+        |(?P<exportall>
+            \*(?:\s*as\s+[\w$]+)?\s*from\s*['"](?P<asrc>[^'"\n]+)['"]
+        )
+    )
+    |(?P<function>function\b\s*\*?\s*(?P<fn>[\w$]+))
+    |(?P<decl>
+        (?:const|let)\s+(?P<cname>[\w$]+|\[[^\]=]*\])
+        (?:\s*:[^=\n]+)?\s*=\s*
+        (?:(?P<cstore>createStore\b)
+          |(?P<carrow>(?:async\s*)?(?:\([^)]*\)|[\w$]+)\s*(?::[^=\n]+)?=>)
+        )?
+    )
+    """,
+    re.VERBOSE,
+)
+_EXPORTED = re.compile(rb"export\s+(?:async\s+)?\Z")
+_IDENTIFIER_BYTES = frozenset(
+    b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$"
+)
+_REGEX_KEYWORDS = {b"async", b"function", b"class", b"new", b"await"}
+
+FUNCTION_NODE_TYPES = ("function_declaration", "function_expression", "function")
+_queries = {}
+
+# Last (code, tree) per file re-parsed in watch mode. A tree takes roughly
+# TREE_BYTES_PER_BYTE times its source size in memory.
+TREE_CACHE_SIZE = 256
+TREE_CACHE_BYTES = int(os.getenv("AGENTWINTER_TREE_CACHE_BYTES", 256 * 1024 * 1024))
+TREE_BYTES_PER_BYTE = 16
+_trees = BoundedCache("trees", TREE_CACHE_SIZE, TREE_CACHE_BYTES)
+
+# parse_file results, checked against the file's stat key on every lookup
+PARSE_CACHE_SIZE = 1000
+PARSE_CACHE_BYTES = int(os.getenv("AGENTWINTER_PARSE_CACHE_BYTES", 64 * 1024 * 1024))
+parse_cache = BoundedCache("parse", PARSE_CACHE_SIZE, PARSE_CACHE_BYTES)
+
+# path -> (mode, reason) for files that weren't fully indexed
+_partial_files = {}
+
+
+def _get_parser(language):
+    """Get a cached Tree-sitter parser for this process"""
+    parser = _parsers.get(language)
+    if parser is None:
+        parser = _parsers[language] = get_parser(language)
+        if PARSE_TIMEOUT_MS > 0:
+            parser.set_timeout_micros(PARSE_TIMEOUT_MS * 1000)
+    return parser
+
+
+def _parse_tree(parser, code, old_tree=None):
+    """Parse within the time budget; None if it ran out"""
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-
-        facts = {
-            "imports": [],
-            "functions": [],
-            "components": [],
-            "stores": [],
-            "file_path": file_path,
-        }
-
-        # Imports
-        import_pattern = r'import\s+(?:{([^}]+)}|(\w+))\s+from\s+[\'"]([^\'"]+)[\'"]'
-        for match in re.finditer(import_pattern, content):
-            if match.group(1):
-                names = [n.strip() for n in match.group(1).split(",")]
-                source = match.group(3)
-                for name in names:
-                    facts["imports"].append({"name": name, "from": source})
-            elif match.group(2):
-                facts["imports"].append(
-                    {"name": match.group(2), "from": match.group(3)}
-                )
+        if old_tree is None:
+            return parser.parse(code)
+        return parser.parse(code, old_tree)
+    except ValueError:
+        # Timed out - reset so the next parse doesn't resume this one
+        parser.reset()
+        return None
 
-        # Functions
-        func_pattern = r"(?:export\s+)?(?:async\s+)?function\s+(\w+)"
-        facts["functions"] = re.findall(func_pattern, content)
 
-        # Components
-        comp_pattern = r"(?:export\s+)?const\s+(\w+)\s*=\s*\([^)]*\)\s*=>"
-        facts["components"] = re.findall(comp_pattern, content)
+def _sniff_generated(code):
+    """Reason string if code looks minified or generated, else None"""
+    head = code[:SNIFF_BYTES]
+    if any(marker in head for marker in GENERATED_MARKERS):
+        return "generated"
+    lines = head.count(b"\n") + 1
+    if len(head) >= SNIFF_BYTES and len(head) / lines > MINIFIED_LINE_BYTES:
+        return "minified"
+    return None
 
-        # Stores
-        store_pattern = r"(?:export\s+)?const\s+(\w+Store)\s*="
-        facts["stores"] = re.findall(store_pattern, content)
 
-        return facts
-    except BaseException:
+def _read_header(file_path):
+    """First HEADER_BYTES of a file via mmap (no full read)"""
+    with open(file_path, "rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm[:HEADER_BYTES]
+        except ValueError:
+            return b""  # empty file - can't be mapped
+
+
+def parse_header_only(file_path, reason, code=None):
+    """Imports and exports from the start of a file too big to parse fully"""
+    try:
+        header = code[:HEADER_BYTES] if code is not None else _read_header(file_path)
+    except OSError:
         return None
+    facts = _scan_regex(file_path, header, header_only=True)
+    facts.mode = MODE_HEADER
+    facts.reason = reason
+    return facts
 
 
-def parse_with_tree_sitter(file_path):
-    """Tree-sitter based parser"""
-    if not TREE_SITTER_AVAILABLE:
-        return parse_with_regex(file_path)
+def _persistable(facts):
+    """Whether facts can go into the facts store (not a timed-out parse)"""
+    return facts is not None and facts.reason != TIMEOUT_REASON
+
+
+def skipped_facts(file_path, reason):
+    """Placeholder facts for a file that wasn't read at all"""
+    return FileFacts(file_path, mode=MODE_SKIPPED, reason=reason)
 
+
+def _over_budget(file_path, size=None):
+    """Facts for a file over the size budget, or None if it fits"""
+    if size is None:
+        try:
+            size = os.stat(file_path).st_size
+        except OSError:
+            return None
+    if size > SKIP_FILE_BYTES:
+        return skipped_facts(file_path, f"size {size // 1024} KB")
+    if size > MAX_FILE_BYTES:
+        return parse_header_only(file_path, f"size {size // 1024} KB")
+    return None
+
+
+def _regex_names(clause):
+    """Names from an import/export brace list (`a, b as c, type d`)"""
+    names = []
+    for part in clause.split(b","):
+        words = part.split()
+        if words and words[0] == b"type" and len(words) > 1:
+            words = words[1:]
+        if words:
+            names.append(words)
+    return names
+
+
+def parse_with_regex(file_path):
+    """Regex-based fallback parser (one pass of REGEX_SCANNER)"""
     try:
         with open(file_path, "rb") as f:
             code = f.read()
+        return _scan_regex(file_path, code)
+    except BaseException:
+        return None
 
-        if file_path.endswith((".tsx", ".jsx")):
-            parser = get_parser("tsx")
-        elif file_path.endswith(".ts"):
-            parser = get_parser("typescript")
-        else:
-            parser = get_parser("javascript")
 
-        tree = parser.parse(code)
+def _scan_regex(file_path, code, header_only=False):
+    """Run REGEX_SCANNER over code (header_only: just imports and exports)"""
+    facts = _FactsBuilder(file_path, code)
+    if header_only:
 
-        facts = {
-            "imports": [],
-            "functions": [],
-            "components": [],
-            "stores": [],
-            "file_path": file_path,
-        }
+        def add(kind, value, span):
+            if kind in ("imports", "exports"):
+                facts.add(kind, value, span)
 
-        def extract_text(node):
-            return code[node.start_byte : node.end_byte].decode(
-                "utf-8", errors="ignore"
-            )
+    else:
+        add = facts.add
 
-        def visit(node):
-            if node.type == "import_statement":
-                try:
-                    for child in node.children:
-                        if child.type == "string":
-                            source = extract_text(child).strip("\"'")
-                            for n in node.children:
-                                if n.type == "import_clause":
-                                    for spec in n.children:
-                                        if spec.type in [
-                                            "identifier",
-                                            "import_specifier",
-                                        ]:
-                                            name = (
-                                                extract_text(spec)
-                                                .split(" as ")[0]
-                                                .strip()
-                                            )
-                                            facts["imports"].append(
-                                                {"name": name, "from": source}
-                                            )
-                except BaseException:
-                    pass
-
-            if node.type in ["function_declaration", "function_expression"]:
-                try:
-                    for child in node.children:
-                        if child.type == "identifier":
-                            facts["functions"].append(extract_text(child))
-                            break
-                except BaseException:
-                    pass
-
-            if node.type == "lexical_declaration":
-                try:
-                    for child in node.children:
-                        if child.type == "variable_declarator":
-                            name_node = child.child_by_field_name("name")
-                            if name_node:
-                                name = extract_text(name_node)
-                                value_node = child.child_by_field_name("value")
-                                if value_node:
-                                    value_text = extract_text(value_node)
-                                    if "createStore" in value_text or "Store" in name:
-                                        facts["stores"].append(name)
-                                    elif "=>" in value_text:
-                                        facts["components"].append(name)
-                except BaseException:
-                    pass
-
-            for child in node.children:
-                visit(child)
-
-        visit(tree.root_node)
-        return (
-            facts
-            if facts["imports"] or facts["functions"]
-            else parse_with_regex(file_path)
+    for match in REGEX_SCANNER.finditer(code):
+        start = match.start()
+        if start and code[start - 1] in _IDENTIFIER_BYTES:
+            continue  # keyword was the tail of a longer identifier
+        kind = match.lastgroup
+        span = facts.span_of(start, match.end())
+        group = match.group
+
+        if kind == "import":
+            source = group("isrc").decode("utf-8", errors="ignore")
+            if group("idefault"):
+                add("imports", make_import(group("idefault").decode(), source), span)
+            if group("inamed") is not None:
+                for words in _regex_names(group("inamed")):
+                    add("imports", make_import(words[0].decode(), source), span)
+
+        elif kind == "default":
+            name = group("dfn") or group("dclass") or group("dvalue")
+            if group("dfn"):
+                add("functions", name.decode(), span)
+            if name in _REGEX_KEYWORDS:
+                name = None
+            add("exports", name.decode() if name else "default", span)
+
+        elif kind == "function":
+            name = group("fn").decode()
+            add("functions", name, span)
+            if _EXPORTED.search(code, max(0, start - 32), start):
+                add("exports", name, span)
+
+        elif kind == "decl":
+            name = group("cname").decode()
+            if "Store" in name or group("cstore"):
+                add("stores", name, span)
+            elif group("carrow"):
+                add("components", name, span)
+            if _EXPORTED.search(code, max(0, start - 32), start):
+                add("exports", name, span)
+
+        elif kind == "exportdecl":
+            add("exports", group("xname").decode(), span)
+
+        elif kind == "exports":
+            source = group("esrc")
+            source = source.decode("utf-8", errors="ignore") if source else None
+            for words in _regex_names(group("eclause")):
+                add("exports", words[-1].decode(), span)
+                if source:
+                    add("imports", make_import(words[0].decode(), source), span)
+
+        elif kind == "exportall":
+            source = group("asrc").decode("utf-8", errors="ignore")
+            add("imports", make_import(REEXPORT_ALL, source), span)
+
+    return facts.build()
+
+
+def _language_for(file_path):
+    """Tree-sitter grammar name for a file"""
+    if file_path.endswith((".tsx", ".jsx")):
+        return "tsx"
+    if file_path.endswith(".ts"):
+        return "typescript"
+    return "javascript"
+
+
+class _FactsBuilder:
+    """Mutable lists to collect names and spans into while walking a file"""
+
+    def __init__(self, file_path, code):
+        self.file_path = file_path
+        self.line_offsets = compute_line_offsets(code)
+        self.names = {kind: [] for kind in SPAN_KINDS}
+        self.spans = {kind: [] for kind in SPAN_KINDS}
+
+    def add(self, kind, value, span):
+        self.names[kind].append(value)
+        self.spans[kind].append(span)
+
+    def span_of(self, start_byte, end_byte):
+        return span_from_offsets(self.line_offsets, start_byte, end_byte)
+
+    def build(self):
+        """Freeze into a compact FileFacts record"""
+        flat = array("I")
+        for kind in SPAN_KINDS:
+            for span in self.spans[kind]:
+                flat.extend(span)
+        return FileFacts(
+            self.file_path,
+            self.names["imports"],
+            self.names["functions"],
+            self.names["components"],
+            self.names["stores"],
+            self.names["exports"],
+            flat,
+            self.line_offsets,
         )
+
+
+def _node_span(node):
+    return Span(node.start_byte, node.end_byte, *node.start_point, *node.end_point)
+
+
+def _text(code, node):
+    return code[node.start_byte : node.end_byte].decode("utf-8", errors="ignore")
+
+
+def _get_query(language):
+    """Compiled fact-extraction query for a grammar (None if unavailable).
+
+    Patterns whose node types the bundled grammar doesn't know (e.g.
+    function_expression vs function across grammar versions) are dropped
+    rather than failing the whole query.
+    """
+    if language not in _queries:
+        query = None
+        try:
+            lang = get_language(language)
+            valid = []
+            for pattern in FACT_QUERY_PATTERNS:
+                try:
+                    lang.query(pattern)
+                    valid.append(pattern)
+                except Exception:
+                    continue
+            if valid:
+                query = lang.query("\n".join(valid))
+        except Exception:
+            query = None
+        _queries[language] = query
+    return _queries[language]
+
+
+def _contains_start(starts, lo, hi):
+    """Does any offset in sorted `starts` fall within [lo, hi)?"""
+    i = bisect_left(starts, lo)
+    return i < len(starts) and starts[i] < hi
+
+
+def _classify_declarations(facts, code, declarations, arrow_starts, store_starts):
+    """Sort const/let declarators into stores and arrow components.
+
+    A declarator is a store if its name mentions Store or its value contains
+    a createStore() call, otherwise a component if its value contains an
+    arrow function. Containment is a bisect over node offsets collected in
+    the same pass, instead of decoding every value to substring-search it.
+    """
+    arrow_starts.sort()
+    store_starts.sort()
+    for name_node, value_node, decl_node in declarations:
+        name = _text(code, name_node)
+        lo, hi = value_node.start_byte, value_node.end_byte
+        if "Store" in name or _contains_start(store_starts, lo, hi):
+            facts.add("stores", name, _node_span(decl_node))
+        elif _contains_start(arrow_starts, lo, hi):
+            facts.add("components", name, _node_span(decl_node))
+
+
+def _export_name(code, value_node):
+    """Name for `export default <value>` - the identifier, else 'default'"""
+    if value_node.type == "identifier":
+        return _text(code, value_node)
+    return "default"
+
+
+def _extract_with_query(query, tree, code, file_path):
+    """Collect facts from one native query pass over the tree"""
+    facts = _FactsBuilder(file_path, code)
+    declarations, arrow_starts, store_starts = [], [], []
+
+    for _, captures in query.matches(tree.root_node):
+        if "import.source" in captures:
+            name_node = captures.get("import.name") or captures.get("import.default")
+            if name_node is not None:
+                source = _text(code, captures["import.source"]).strip("\"'")
+                facts.add(
+                    "imports",
+                    make_import(_text(code, name_node), source),
+                    _node_span(captures["import.stmt"]),
+                )
+        elif "function" in captures:
+            facts.add(
+                "functions",
+                _text(code, captures["function"]),
+                _node_span(captures["function.def"]),
+            )
+        elif "decl.name" in captures:
+            declarations.append(
+                (captures["decl.name"], captures["decl.value"], captures["decl"])
+            )
+        elif "arrow" in captures:
+            arrow_starts.append(captures["arrow"].start_byte)
+        elif "store_call" in captures:
+            # Failed #eq? predicates come back as empty capture dicts
+            store_starts.append(captures["store_call"].start_byte)
+        elif "reexport.stmt" in captures:
+            name_node = captures.get("reexport.name")
+            source_node = captures.get("reexport.source") or captures["reexport.all"]
+            name = _text(code, name_node) if name_node is not None else REEXPORT_ALL
+            facts.add(
+                "imports",
+                make_import(name, _text(code, source_node).strip("\"'")),
+                _node_span(captures["reexport.stmt"]),
+            )
+        elif "export.stmt" in captures:
+            if "export.value" in captures:
+                name = _export_name(code, captures["export.value"])
+            else:
+                name = _text(code, captures.get("export.alias") or captures["export.name"])
+            facts.add("exports", name, _node_span(captures["export.stmt"]))
+
+    _classify_declarations(facts, code, declarations, arrow_starts, store_starts)
+    return facts.build()
+
+
+def _collect_import(node, code, facts):
+    """Imports from one import_statement node (cursor fallback)"""
+    source_node = node.child_by_field_name("source")
+    if source_node is None:
+        return
+    source = _text(code, source_node).strip("\"'")
+    span = _node_span(node)
+    for clause in node.named_children:
+        if clause.type != "import_clause":
+            continue
+        for spec in clause.named_children:
+            if spec.type == "identifier":
+                facts.add("imports", make_import(_text(code, spec), source), span)
+            elif spec.type == "named_imports":
+                for named in spec.named_children:
+                    name_node = named.child_by_field_name("name")
+                    if named.type == "import_specifier" and name_node is not None:
+                        facts.add(
+                            "imports", make_import(_text(code, name_node), source), span
+                        )
+
+
+def _collect_export(node, code, facts):
+    """Exported names from one export_statement node (cursor fallback)
+
+    `export ... from` also counts as importing from its source.
+    """
+    span = _node_span(node)
+    source_node = node.child_by_field_name("source")
+    source = _text(code, source_node).strip("\"'") if source_node else None
+    declaration = node.child_by_field_name("declaration")
+    value = node.child_by_field_name("value")
+    if declaration is not None:
+        if declaration.type == "lexical_declaration":
+            for child in declaration.named_children:
+                name_node = child.child_by_field_name("name")
+                if child.type == "variable_declarator" and name_node is not None:
+                    if name_node.type == "identifier":
+                        facts.add("exports", _text(code, name_node), span)
+        else:
+            name_node = declaration.child_by_field_name("name")
+            if name_node is not None:
+                facts.add("exports", _text(code, name_node), span)
+    elif value is not None:
+        facts.add("exports", _export_name(code, value), span)
+    else:
+        for clause in node.named_children:
+            if clause.type != "export_clause":
+                continue
+            for spec in clause.named_children:
+                name_node = spec.child_by_field_name("alias") or spec.child_by_field_name(
+                    "name"
+                )
+                if spec.type == "export_specifier" and name_node is not None:
+                    facts.add("exports", _text(code, name_node), span)
+                    if source is not None:
+                        imported = spec.child_by_field_name("name")
+                        facts.add(
+                            "imports", make_import(_text(code, imported), source), span
+                        )
+        if source is not None and not any(
+            clause.type == "export_clause" for clause in node.named_children
+        ):
+            facts.add("imports", make_import(REEXPORT_ALL, source), span)
+
+
+def _extract_with_cursor(tree, code, file_path):
+    """Iterative TreeCursor walk, used when no query is available.
+
+    Produces the same facts as the query path without Python recursion, so
+    deeply nested JSX can't hit the recursion limit.
+    """
+    facts = _FactsBuilder(file_path, code)
+    declarations, arrow_starts, store_starts = [], [], []
+
+    cursor = tree.walk()
+    while True:
+        node = cursor.node
+        node_type = node.type
+
+        if node_type == "import_statement":
+            _collect_import(node, code, facts)
+        elif node_type == "export_statement":
+            _collect_export(node, code, facts)
+        elif node_type in FUNCTION_NODE_TYPES and node.is_named:
+            name_node = node.child_by_field_name("name")
+            if name_node is not None and name_node.type == "identifier":
+                facts.add("functions", _text(code, name_node), _node_span(node))
+        elif node_type == "lexical_declaration":
+            for child in node.named_children:
+                if child.type == "variable_declarator":
+                    name_node = child.child_by_field_name("name")
+                    value_node = child.child_by_field_name("value")
+                    if name_node is not None and value_node is not None:
+                        declarations.append((name_node, value_node, child))
+        elif node_type == "arrow_function":
+            arrow_starts.append(node.start_byte)
+        elif node_type == "call_expression":
+            fn = node.child_by_field_name("function")
+            if fn is not None and fn.type == "identifier":
+                if _text(code, fn) == "createStore":
+                    store_starts.append(fn.start_byte)
+
+        if cursor.goto_first_child():
+            continue
+        while not cursor.goto_next_sibling():
+            if not cursor.goto_parent():
+                _classify_declarations(
+                    facts, code, declarations, arrow_starts, store_starts
+                )
+                return facts.build()
+
+
+def _extract_facts(tree, code, file_path):
+    """Collect imports, functions, components, stores from a parsed tree"""
+    query = _get_query(_language_for(file_path))
+    if query is None:
+        return _extract_with_cursor(tree, code, file_path)
+    return _extract_with_query(query, tree, code, file_path)
+
+
+def parse_with_tree_sitter(file_path, size=None):
+    """Tree-sitter based parser (within the per-file size/time budgets)"""
+    limited = _over_budget(file_path, size)
+    if limited is not None:
+        return limited
+
+    try:
+        with open(file_path, "rb") as f:
+            code = f.read()
+    except OSError:
+        return None
+
+    reason = _sniff_generated(code)
+    if reason:
+        return parse_header_only(file_path, reason, code)
+    if not TREE_SITTER_AVAILABLE:
+        return _scan_regex(file_path, code)
+
+    try:
+        tree = _parse_tree(_get_parser(_language_for(file_path)), code)
+        if tree is None:
+            return parse_header_only(file_path, TIMEOUT_REASON, code)
+        facts = _extract_facts(tree, code, file_path)
+        return facts if facts.imports or facts.functions else _scan_regex(file_path, code)
     except BaseException:
         return parse_with_regex(file_path)
 
 
-@lru_cache(maxsize=1000)
-def parse_file(file_path):
-    """Main entry point - try Tree-sitter, fallback to regex"""
-    return parse_with_tree_sitter(file_path)
+def _point_at(code, offset):
+    """(row, column) of a byte offset, as Tree-sitter expects"""
+    row = code.count(b"\n", 0, offset)
+    line_start = code.rfind(b"\n", 0, offset) + 1
+    return (row, offset - line_start)
+
+
+def _common_prefix_len(a, b):
+    """Length of the shared prefix of two byte strings (memcmp + bisection)"""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
 
 
-def parse_all_files():
-    """Parse all TypeScript/JavaScript files in src/"""
-    files = (
-        glob.glob("src/**/*.ts", recursive=True)
-        + glob.glob("src/**/*.tsx", recursive=True)
-        + glob.glob("src/**/*.jsx", recursive=True)
-        + glob.glob("src/**/*.js", recursive=True)
+def _compute_edit(old_code, new_code):
+    """Describe the change old_code -> new_code as one Tree-sitter edit"""
+    start = _common_prefix_len(old_code, new_code)
+    # Shared suffix, not overlapping the shared prefix
+    max_suffix = min(len(old_code), len(new_code)) - start
+    suffix = _common_prefix_len(
+        old_code[len(old_code) - max_suffix :][::-1],
+        new_code[len(new_code) - max_suffix :][::-1],
     )
+    old_end = len(old_code) - suffix
+    new_end = len(new_code) - suffix
+    return {
+        "start_byte": start,
+        "old_end_byte": old_end,
+        "new_end_byte": new_end,
+        "start_point": _point_at(old_code, start),
+        "old_end_point": _point_at(old_code, old_end),
+        "new_end_point": _point_at(new_code, new_end),
+    }
 
-    parsed_map = {}
-    parsed_count = 0
 
+def reparse_file(file_path):
+    """Re-parse one changed file, reusing its previous tree when we have one.
+
+    Tree-sitter only re-parses the region touched by the edit, so a save in
+    watch mode costs milliseconds instead of a full-repo rescan. The facts
+    store is updated so the next cold start sees the new facts.
+    """
+    try:
+        st = os.stat(file_path)
+        facts = _over_budget(file_path, st.st_size)
+        code = None
+        if facts is None:
+            with open(file_path, "rb") as f:
+                code = f.read()
+    except OSError:
+        forget_file(file_path)
+        return None
+
+    reason = _sniff_generated(code) if code is not None else None
+    if code is None or reason:
+        _trees.pop(file_path, None)
+        if reason:
+            facts = parse_header_only(file_path, reason, code)
+    elif not TREE_SITTER_AVAILABLE:
+        facts = _scan_regex(file_path, code)
+    else:
+        try:
+            parser = _get_parser(_language_for(file_path))
+            cached = _trees.pop(file_path, None)
+            if cached is None:
+                tree = _parse_tree(parser, code)
+            elif cached[0] == code:
+                tree = cached[1]
+            else:
+                old_code, old_tree = cached
+                old_tree.edit(**_compute_edit(old_code, code))
+                tree = _parse_tree(parser, code, old_tree)
+
+            if tree is None:
+                facts = parse_header_only(file_path, TIMEOUT_REASON, code)
+            else:
+                size = len(code) * TREE_BYTES_PER_BYTE
+                _trees.put(file_path, (code, tree), size=size)
+
+                facts = _extract_facts(tree, code, file_path)
+                if not (facts.imports or facts.functions):
+                    facts = _scan_regex(file_path, code)
+        except BaseException:
+            _trees.pop(file_path, None)
+            facts = parse_with_regex(file_path)
+
+    _note_mode(file_path, facts)
+
+    store = get_facts_store()
+    if store and _persistable(facts):
+        store.put(file_path, facts, stat_key(st))
+        store.flush()
+    return facts
+
+
+def forget_file(file_path):
+    """Drop the cached tree and parse result for a deleted file"""
+    _trees.pop(file_path, None)
+    parse_cache.invalidate(file_path)
+    _partial_files.pop(file_path, None)
+
+
+def _note_mode(file_path, facts):
+    """Track files indexed header-only or skipped, for !cache"""
+    if facts is not None and facts.mode != MODE_FULL:
+        _partial_files[file_path] = (facts.mode, facts.reason)
+    else:
+        _partial_files.pop(file_path, None)
+
+
+def restore_parse_report(partial):
+    """Reinstate {path: (mode, reason)} saved alongside an index snapshot"""
+    _partial_files.clear()
+    _partial_files.update({path: tuple(value) for path, value in partial.items()})
+
+
+def get_partial_files():
+    """{path: (mode, reason)} for files that weren't fully indexed"""
+    return dict(_partial_files)
+
+
+def get_parse_report():
+    """{'header': {path: reason}, 'skipped': {path: reason}} for the last parse"""
+    report = {MODE_HEADER: {}, MODE_SKIPPED: {}}
+    for path, (mode, reason) in _partial_files.items():
+        report.setdefault(mode, {})[path] = reason
+    return report
+
+
+def parse_file(file_path):
+    """Main entry point - try Tree-sitter, fallback to regex.
+
+    Cached until the file's (mtime, size, inode) changes.
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        parse_cache.invalidate(file_path)
+        return None
+    return parse_cache.get_or_compute(
+        file_path,
+        lambda: parse_with_tree_sitter(file_path, st.st_size),
+        stat_key(st),
+    )
+
+
+def _parse_chunk(file_paths):
+    """Pool worker: parse a chunk of files"""
+    return [(path, parse_with_tree_sitter(path)) for path in file_paths]
+
+
+def _chunk_by_size(sized_paths, workers):
+    """Split (path, size) pairs into chunks of roughly equal byte volume.
+
+    Largest files go first so a huge file doesn't become the straggler at
+    the end; many chunks per worker keeps the pool balanced.
+    """
+    total = sum(size for _, size in sized_paths)
+    target = max(total // (workers * 8), 1)
+
+    chunks = []
+    chunk, chunk_bytes = [], 0
+    for path, size in sorted(sized_paths, key=lambda item: item[1], reverse=True):
+        chunk.append(path)
+        chunk_bytes += size
+        if chunk_bytes >= target or len(chunk) >= 256:
+            chunks.append(chunk)
+            chunk, chunk_bytes = [], 0
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def _parse_in_pool(sized_paths, workers):
+    """Parse files across a process pool, yielding (path, facts) as chunks finish"""
+    # fork avoids re-importing the whole agentwinter package in every worker
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [
+            pool.submit(_parse_chunk, chunk)
+            for chunk in _chunk_by_size(sized_paths, workers)
+        ]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def parse_all_files(use_store=True, workers=0, manifest=None):
+    """Parse all TypeScript/JavaScript files in src/
+
+    Files come from the shared discovery manifest (scanned once per refresh).
+    Facts are reused from the on-disk store for files whose contents haven't
+    changed since the last run; only the rest are parsed. With workers > 1
+    the remaining files are parsed in a process pool.
+    """
+    manifest = manifest or get_manifest()
+    files = manifest.paths()
+
+    store = get_facts_store() if use_store else None
+    results = {}
+    to_parse = []  # (path, manifest entry) for files the store couldn't answer
+
+    for source in manifest.files.values():
+        facts = store.lookup(source.path, source.stat_key) if store else None
+        if facts is None:
+            to_parse.append((source.path, source))
+        else:
+            results[source.path] = facts
+
+    source_by_path = dict(to_parse)
+    parsed = None
+    if workers > 1 and len(to_parse) >= PARALLEL_MIN_FILES:
+        try:
+            parsed = _parse_in_pool(
+                [(path, source.size) for path, source in to_parse], workers
+            )
+            for filepath, facts in parsed:
+                results[filepath] = facts
+                if store and _persistable(facts):
+                    store.put(filepath, facts, source_by_path[filepath].stat_key)
+        except (OSError, RuntimeError) as e:
+            # No usable pool here (e.g. sandboxed /dev/shm) - parse in-process
+            print(f"⚠️  Parallel parse unavailable ({e}), parsing serially")
+            parsed = None
+
+    if parsed is None:
+        for filepath, source in to_parse:
+            if filepath in results:
+                continue
+            # Not via parse_file's cache - the file is known to have changed
+            facts = parse_with_tree_sitter(filepath, source.size)
+            results[filepath] = facts
+            if store and _persistable(facts):
+                store.put(filepath, facts, source.stat_key)
+
+    # Assemble in discovery order so output doesn't depend on pool scheduling
+    parsed_map = {}
+    _partial_files.clear()
     for filepath in files:
-        if os.path.isfile(filepath):
-            facts = parse_file(filepath)
-            if facts and (
-                facts["imports"]
-                or facts["functions"]
-                or facts["components"]
-                or facts["stores"]
-            ):
-                parsed_map[filepath] = facts
-                parsed_count += 1
-
-    return parsed_map, parsed_count, len(files)
+        facts = results.get(filepath)
+        _note_mode(filepath, facts)
+        if facts and facts.has_symbols():
+            parsed_map[filepath] = facts
+
+    if store:
+        try:
+            store.prune(set(files))
+            store.flush()
+        except Exception:
+            pass
+
+    return parsed_map, len(parsed_map), len(files)
@@ -0,0 +1,294 @@
+"""Query embeddings cached in memory, on disk and in Redis, so repeats skip the model"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from .bounded_cache import BoundedCache
+from .facts_store import CACHE_DIR
+from .shared_cache import get_redis_tier
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+QUERY_EMBEDDINGS_DIR = os.path.join(CACHE_DIR, "query_embeddings")
+QUERY_EMBEDDING_CAPACITY = int(os.getenv("AGENTWINTER_QUERY_EMBEDDINGS", 20000))
+# float16 halves the file; similarity scores move in the 4th decimal place
+QUERY_EMBEDDING_DTYPE = os.getenv("AGENTWINTER_QUERY_EMBEDDING_DTYPE", "float32")
+
+# Embeddings don't depend on the repo, so Redis keeps them for a week
+SHARED_EMBEDDING_TTL = 7 * 24 * 3600
+
+# In-process tier, keyed by (model id, normalized query)
+embedding_cache = BoundedCache(
+    "embedding", max_entries=500, max_bytes=32 * 1024 * 1024, ttl=300
+)
+
+_SPACES = re.compile(r"\s+")
+_EDGE_PUNCTUATION = "?!.,;:'\"` "
+
+
+def normalize_query(text):
+    """Cache key for a query: case, spacing and trailing '?' don't matter.
+
+    'Where is authStore used?' and 'where is  authstore used' share one
+    embedding (nomic's tokenizer is uncased, so casefolding loses nothing).
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _SPACES.sub(" ", text).strip(_EDGE_PUNCTUATION)
+
+
+class QueryEmbeddingStore:
+    """Fixed-capacity on-disk table of query embeddings for one model.
+
+    Vectors live in a memory-mapped (capacity x dim) array; a SQLite table
+    maps each normalized query to its row and last-use time. When full, the
+    least recently used row is overwritten. Slot allocation runs in an
+    IMMEDIATE transaction, so several processes can share the files.
+    """
+
+    def __init__(
+        self,
+        model_id,
+        directory=QUERY_EMBEDDINGS_DIR,
+        capacity=QUERY_EMBEDDING_CAPACITY,
+        dtype=QUERY_EMBEDDING_DTYPE,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r"[^\w.-]+", "_", model_id)
+        self.model_id = model_id
+        self.db_path = os.path.join(directory, f"{slug}.db")
+        self.vectors_path = os.path.join(directory, f"{slug}.{dtype}")
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None
+        )
+        try:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.OperationalError:
+            pass  # Another process is switching it (WAL is persistent)
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                query TEXT PRIMARY KEY,
+                slot INTEGER NOT NULL UNIQUE,
+                used REAL NOT NULL
+            )
+            """
+        )
+        self.vectors = None
+        self.dim = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        if meta.get("dim"):
+            layout = (meta.get("capacity"), meta.get("dtype"))
+            if layout == (str(capacity), self.dtype.name):
+                self._open(int(meta["dim"]))
+            if self.vectors is None:
+                # Different capacity/dtype, or the vector file went missing
+                self.conn.execute("DELETE FROM entries")
+                self.conn.execute("DELETE FROM meta")
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def _open(self, dim):
+        """Map the vector file, creating it at full size if needed.
+
+        The check-and-create runs in an IMMEDIATE transaction, so when two
+        processes start together only one creates the file - the other can't
+        truncate vectors the first has already recorded in `entries`.
+        """
+        expected = self.capacity * dim * self.dtype.itemsize
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                exists = (
+                    os.path.exists(self.vectors_path)
+                    and os.path.getsize(self.vectors_path) == expected
+                )
+                if not exists:
+                    with open(self.vectors_path, "wb") as f:
+                        f.truncate(expected)
+                    # Any rows point into the file we just replaced
+                    self.conn.execute("DELETE FROM entries")
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.vectors = np.memmap(
+                self.vectors_path,
+                dtype=self.dtype,
+                mode="r+",
+                shape=(self.capacity, dim),
+            )
+        except (OSError, ValueError, sqlite3.Error):
+            self.vectors = None
+            return
+        self.dim = dim
+
+    def get(self, query):
+        """float32 vector for a normalized query, or None"""
+        with self.lock:
+            row = None
+            if self.vectors is not None:
+                row = self.conn.execute(
+                    "SELECT slot FROM entries WHERE query = ?", (query,)
+                ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute(
+                "UPDATE entries SET used = ? WHERE query = ?", (time.time(), query)
+            )
+            self.hits += 1
+            return np.array(self.vectors[row[0]], dtype=np.float32)
+
+    def put(self, query, vector):
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        with self.lock:
+            if self.vectors is None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES "
+                    "('dim', ?), ('capacity', ?), ('dtype', ?), ('model', ?)",
+                    (
+                        str(len(vector)),
+                        str(self.capacity),
+                        self.dtype.name,
+                        self.model_id,
+                    ),
+                )
+                self._open(len(vector))
+                if self.vectors is None:
+                    return
+            if len(vector) != self.dim:
+                return
+
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    "SELECT slot FROM entries WHERE query = ?", (query,)
+                ).fetchone()
+                if row is not None:
+                    slot = row[0]
+                else:
+                    count = self.conn.execute(
+                        "SELECT COUNT(*) FROM entries"
+                    ).fetchone()[0]
+                    slot = count
+                    if count >= self.capacity:
+                        slot = self.conn.execute(
+                            "SELECT slot FROM entries ORDER BY used LIMIT 1"
+                        ).fetchone()[0]
+                        self.conn.execute("DELETE FROM entries WHERE slot = ?", (slot,))
+                        self.evictions += 1
+                self.vectors[slot] = vector
+                self.vectors.flush()
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO entries (query, slot, used) "
+                    "VALUES (?, ?, ?)",
+                    (query, slot, time.time()),
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM entries")
+
+    def stats(self):
+        with self.lock:
+            return {
+                "model": self.model_id,
+                "entries": len(self),
+                "capacity": self.capacity,
+                "dim": self.dim,
+                "dtype": self.dtype.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_stores = {}
+_failed = set()
+
+
+def get_query_embedding_store(model_id):
+    """Shared store for model_id, or None (no numpy, or unusable cache dir)"""
+    if not NUMPY_AVAILABLE or model_id in _failed:
+        return None
+    store = _stores.get(model_id)
+    if store is None:
+        try:
+            store = _stores[model_id] = QueryEmbeddingStore(model_id)
+        except (OSError, sqlite3.Error):
+            _failed.add(model_id)
+    return store
+
+
+def query_embedding_stats():
+    """stats() of every store opened in this process"""
+    return [store.stats() for store in _stores.values()]
+
+
+def clear_query_embeddings():
+    embedding_cache.clear()
+    for store in _stores.values():
+        store.clear()
+
+
+def _shared_key(model_id, query):
+    digest = hashlib.blake2b(f"{model_id}\0{query}".encode(), digest_size=16)
+    return f"agentwinter:embedding:{digest.hexdigest()}"
+
+
+def _from_shared(model_id, query):
+    data = get_redis_tier().get(_shared_key(model_id, query))
+    if data is None or len(data) % 4:
+        return None
+    return np.frombuffer(data, dtype=np.float32).copy()
+
+
+def embed_query(text, embedding_model, model_id):
+    """Embedding of a search query: memory, disk, Redis, then the model"""
+    query = normalize_query(text)
+    vector = embedding_cache.get((model_id, query))
+    if vector is not None:
+        return vector
+
+    store = get_query_embedding_store(model_id)
+    vector = store.get(query) if store is not None else None
+    if vector is None:
+        vector = _from_shared(model_id, query) if NUMPY_AVAILABLE else None
+        if vector is None:
+            # Encode the normalized text, so every spelling shares one vector
+            vector = embedding_model.encode(query)
+            if NUMPY_AVAILABLE:
+                data = np.asarray(vector, dtype=np.float32).tobytes()
+                get_redis_tier().set(
+                    _shared_key(model_id, query), data, SHARED_EMBEDDING_TTL
+                )
+        if store is not None:
+            store.put(query, vector)
+    embedding_cache.put((model_id, query), vector, size=getattr(vector, "nbytes", None))
+    return vector
@@ -0,0 +1,205 @@
+"""Resolve import specifiers to source files the way TypeScript does"""
+
+import json
+import os
+import re
+
+from .discovery import get_manifest
+
+# Probe order for a bare path, then for a directory's index file
+EXTENSIONS = (".ts", ".tsx", ".js", ".jsx")
+INDEX_FILES = tuple("index" + ext for ext in EXTENSIONS)
+
+# `import "./x.js"` may mean x.ts (TS keeps the emitted extension in imports)
+_SWAP_EXTENSIONS = {".js": (".ts", ".tsx"), ".jsx": (".tsx",)}
+
+_JSONC_NOISE = re.compile(r'("(?:\\.|[^"\\])*")|//[^\n]*|/\*.*?\*/', re.S)
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+
+
+def _load_jsonc(path):
+    """json.load for tsconfig files, which allow comments and trailing commas"""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    text = _JSONC_NOISE.sub(lambda m: m.group(1) or "", text)
+    return json.loads(_TRAILING_COMMA.sub(r"\1", text))
+
+
+def load_tsconfig(path="tsconfig.json", _depth=0):
+    """(base_url, [(prefix, suffix, [targets])]) from tsconfig compilerOptions.
+
+    Follows relative `extends`. base_url and targets are normalized paths
+    relative to the working directory; paths patterns are split at their
+    `*` and sorted longest prefix first, as TypeScript matches them.
+    """
+    try:
+        config = _load_jsonc(path)
+    except (OSError, ValueError):
+        return None, []
+
+    base_url, patterns = None, []
+    parent = config.get("extends")
+    if isinstance(parent, str) and parent.startswith(".") and _depth < 5:
+        parent_path = os.path.join(os.path.dirname(path), parent)
+        if not parent_path.endswith(".json"):
+            parent_path += ".json"
+        base_url, patterns = load_tsconfig(parent_path, _depth + 1)
+
+    options = config.get("compilerOptions") or {}
+    config_dir = os.path.dirname(path) or "."
+    if "baseUrl" in options:
+        base_url = os.path.normpath(os.path.join(config_dir, options["baseUrl"]))
+    if "paths" in options:
+        # paths are relative to baseUrl, or to the tsconfig if there isn't one
+        paths_base = base_url or config_dir
+        patterns = []
+        for pattern, targets in options["paths"].items():
+            prefix, star, suffix = pattern.partition("*")
+            if not star:
+                prefix, suffix = pattern, None
+            patterns.append(
+                (
+                    prefix,
+                    suffix,
+                    [os.path.normpath(os.path.join(paths_base, t)) for t in targets],
+                )
+            )
+        patterns.sort(key=lambda p: len(p[0]), reverse=True)
+    return base_url, patterns
+
+
+def _candidates(base):
+    """Files a module path may refer to, in TypeScript's probe order"""
+    out = [base]
+    stem, ext = os.path.splitext(base)
+    out.extend(stem + swap for swap in _SWAP_EXTENSIONS.get(ext, ()))
+    out.extend(base + ext for ext in EXTENSIONS)
+    out.extend(os.path.join(base, index) for index in INDEX_FILES)
+    return out
+
+
+class ModuleResolver:
+    """Specifier -> source file, memoized, over a fixed set of known files.
+
+    Handles relative paths, extension and index probing, and tsconfig
+    `paths`/`baseUrl`. Results (hits and misses) are cached per
+    (importing directory, specifier) - or per specifier when it isn't
+    relative - and every probed path remembers which entries depended on
+    it, so adding or removing a file only drops the entries that probed
+    that exact path.
+    """
+
+    def __init__(self, files, tsconfig="tsconfig.json", source_root="src/"):
+        self.files = {os.path.normpath(f) for f in files}
+        self.base_url, self.patterns = load_tsconfig(tsconfig)
+        self.source_root = os.path.normpath(source_root)
+        self.table = {}  # (directory or None, specifier) -> path or None
+        self.probed = {}  # candidate path -> {table key: None}
+        self.generation = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.table)
+
+    def _probe(self, key, bases):
+        for base in bases:
+            for candidate in _candidates(base):
+                keys = self.probed.get(candidate)
+                if keys is None:
+                    keys = self.probed[candidate] = {}
+                keys[key] = None
+                if candidate in self.files:
+                    return candidate
+        return None
+
+    def _bases(self, specifier, directory):
+        """Module paths to probe for specifier, in priority order"""
+        if specifier.startswith("."):
+            return [os.path.normpath(os.path.join(directory, specifier))]
+
+        for prefix, suffix, targets in self.patterns:
+            if suffix is None:
+                if specifier == prefix:
+                    return targets
+                continue
+            if (
+                specifier.startswith(prefix)
+                and specifier.endswith(suffix)
+                and len(specifier) >= len(prefix) + len(suffix)
+            ):
+                matched = specifier[len(prefix) : len(specifier) - len(suffix)]
+                return [os.path.normpath(t.replace("*", matched, 1)) for t in targets]
+
+        if self.base_url is not None:
+            return [os.path.normpath(os.path.join(self.base_url, specifier))]
+        # No tsconfig: still accept repo-rooted specifiers like "src/x"
+        if specifier.split("/", 1)[0] == self.source_root:
+            return [os.path.normpath(specifier)]
+        return []
+
+    def resolve(self, specifier, from_file):
+        """Path of the file specifier refers to from from_file, or None
+        (external packages and unresolvable imports)"""
+        if not specifier:
+            return None
+        relative = specifier.startswith(".")
+        directory = os.path.dirname(os.path.normpath(from_file)) if relative else None
+        key = (directory, specifier)
+        try:
+            result = self.table[key]
+            self.hits += 1
+            return result
+        except KeyError:
+            pass
+        self.misses += 1
+        result = self.table[key] = self._probe(key, self._bases(specifier, directory))
+        return result
+
+    def _invalidate(self, path):
+        for key in self.probed.pop(path, ()):
+            self.table.pop(key, None)
+
+    def add_file(self, path):
+        path = os.path.normpath(path)
+        if path not in self.files:
+            self.files.add(path)
+            self._invalidate(path)
+
+    def remove_file(self, path):
+        path = os.path.normpath(path)
+        if path in self.files:
+            self.files.discard(path)
+            self._invalidate(path)
+
+    def sync(self, manifest):
+        """Apply files that appeared/disappeared since the last sync"""
+        if manifest.generation == self.generation:
+            return
+        current = {os.path.normpath(p) for p in manifest.files}
+        for path in self.files - current:
+            self.remove_file(path)
+        for path in current - self.files:
+            self.add_file(path)
+        self.generation = manifest.generation
+
+    def stats(self):
+        return {
+            "files": len(self.files),
+            "entries": len(self.table),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_resolver = None
+
+
+def get_resolver(manifest=None):
+    """Shared resolver, kept in step with the discovery manifest"""
+    global _resolver
+    manifest = manifest or get_manifest()
+    if _resolver is None or _resolver.source_root != os.path.normpath(manifest.root):
+        _resolver = ModuleResolver(manifest.files, source_root=manifest.root)
+    _resolver.sync(manifest)
+    return _resolver
@@ -0,0 +1,133 @@
+"""Reuse semantic search results for queries that mean the same thing"""
+
+import os
+import threading
+import time
+
+from .shared_cache import index_generation
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Cosine similarity at which two queries count as the same question
+SEMANTIC_CACHE_THRESHOLD = float(
+    os.getenv("AGENTWINTER_SEMANTIC_CACHE_THRESHOLD", "0.95")
+)
+SEMANTIC_CACHE_SIZE = 256
+SEMANTIC_CACHE_TTL = 300
+
+
+class SemanticCache:
+    """Recent search results, looked up by query-embedding similarity.
+
+    Embeddings are kept as unit rows of one matrix, so a lookup is a single
+    matrix-vector product. A hit needs cosine >= threshold, an entry made
+    with at least the requested limit (results are ranked, so the top
+    `limit` of a longer list are the same answer), and the same index
+    generation - everything is dropped when the sources change.
+    """
+
+    def __init__(
+        self,
+        threshold=SEMANTIC_CACHE_THRESHOLD,
+        max_entries=SEMANTIC_CACHE_SIZE,
+        ttl=SEMANTIC_CACHE_TTL,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.generation = None
+        self.matrix = None  # max_entries x dim, unit rows
+        self.entries = []  # row -> (query, limit, result, expires, last_used)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _sync_generation(self):
+        generation = index_generation()
+        if generation != self.generation:
+            self.entries = []
+            self.generation = generation
+
+    def lookup(self, vector, limit):
+        """(result, cached query, similarity) for a near-identical earlier
+        query, or None"""
+        if not NUMPY_AVAILABLE or self.threshold > 1:
+            return None
+        vector = _unit(vector)
+        with self.lock:
+            self._sync_generation()
+            if not self.entries or vector is None or len(vector) != self.dim:
+                self.misses += 1
+                return None
+            similarity = self.matrix[: len(self.entries)] @ vector
+            now = time.monotonic()
+            for row in np.argsort(-similarity):
+                if similarity[row] < self.threshold:
+                    break
+                query, cached_limit, result, expires, _ = self.entries[row]
+                if cached_limit >= limit and expires > now:
+                    self.entries[row] = (query, cached_limit, result, expires, now)
+                    self.hits += 1
+                    return result, query, float(similarity[row])
+            self.misses += 1
+            return None
+
+    @property
+    def dim(self):
+        return None if self.matrix is None else self.matrix.shape[1]
+
+    def put(self, query, vector, limit, result):
+        if not NUMPY_AVAILABLE:
+            return
+        vector = _unit(vector)
+        if vector is None:
+            return
+        with self.lock:
+            self._sync_generation()
+            if self.matrix is None or len(vector) != self.dim:
+                self.matrix = np.zeros((self.max_entries, len(vector)), np.float32)
+                self.entries = []
+            now = time.monotonic()
+            entry = (query, limit, result, now + self.ttl, now)
+            if len(self.entries) < self.max_entries:
+                row = len(self.entries)
+                self.entries.append(entry)
+            else:
+                # Replace the least recently used entry
+                row = min(range(len(self.entries)), key=lambda r: self.entries[r][4])
+                self.entries[row] = entry
+            self.matrix[row] = vector
+
+    def clear(self):
+        with self.lock:
+            self.entries = []
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else None
+
+
+_semantic_cache = SemanticCache()
+
+
+def get_semantic_cache():
+    """Shared near-duplicate cache used by semantic_search"""
+    return _semantic_cache
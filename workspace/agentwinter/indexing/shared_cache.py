@@ -0,0 +1,190 @@
+"""Two-tier result cache: in-process BoundedCache plus Redis shared by every process"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+
+from .bounded_cache import BoundedCache
+from .discovery import get_manifest
+
+try:
+    import redis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+REDIS_URL = os.getenv("AGENTWINTER_REDIS_URL", "redis://localhost:6379/1")
+SHARED_CACHE_ENABLED = os.getenv("AGENTWINTER_SHARED_CACHE", "1") != "0"
+REDIS_TIMEOUT = 0.25  # seconds; a slow Redis must never be slower than a miss
+RETRY_SECONDS = 30  # after a failure, don't try Redis again for this long
+
+
+def _digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# Every process working in the same checkout shares one namespace
+REPO_ID = _digest(os.path.realpath("."))[:12]
+
+
+class RedisTier:
+    """Byte values in Redis, or a no-op while Redis isn't reachable"""
+
+    def __init__(self, url=REDIS_URL):
+        self.url = url
+        self.client = None
+        self.lock = threading.Lock()
+        self.down_until = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+
+    def _client(self):
+        if not (REDIS_AVAILABLE and SHARED_CACHE_ENABLED):
+            return None
+        with self.lock:
+            if self.client is None and time.monotonic() >= self.down_until:
+                try:
+                    client = redis.Redis.from_url(
+                        self.url,
+                        socket_timeout=REDIS_TIMEOUT,
+                        socket_connect_timeout=REDIS_TIMEOUT,
+                    )
+                    client.ping()
+                    self.client = client
+                except (redis.RedisError, OSError):
+                    self._failed()
+            return self.client
+
+    def _failed(self):
+        self.errors += 1
+        self.client = None
+        self.down_until = time.monotonic() + RETRY_SECONDS
+
+    def get(self, key):
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            data = client.get(key)
+        except (redis.RedisError, OSError):
+            with self.lock:
+                self._failed()
+            return None
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    def set(self, key, data, ttl):
+        client = self._client()
+        if client is None:
+            return
+        try:
+            client.set(key, data, ex=ttl)
+            self.writes += 1
+        except (redis.RedisError, OSError):
+            with self.lock:
+                self._failed()
+
+    def stats(self):
+        return {
+            "connected": self.client is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "errors": self.errors,
+        }
+
+
+_redis_tier = RedisTier()
+
+
+def get_redis_tier():
+    """Shared L2 tier (a no-op if Redis is missing, down or disabled)"""
+    return _redis_tier
+
+
+def index_generation():
+    """Content fingerprint of the indexed sources - the same in every process,
+    and different after any file changes"""
+    return get_manifest().fingerprint
+
+
+class SharedCache:
+    """L1 (this process) in front of L2 (Redis, every process on the repo).
+
+    Keys are namespaced by repo and, with per_generation, by the index
+    generation, so nothing cached before a reindex is ever served after it.
+    L2 values are compact zlib'd JSON with a TTL.
+    """
+
+    def __init__(
+        self,
+        name,
+        ttl=300,
+        max_entries=200,
+        max_bytes=16 * 1024 * 1024,
+        per_generation=True,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.per_generation = per_generation
+        self.local = BoundedCache(name, max_entries, max_bytes, ttl=ttl)
+        self.shared = get_redis_tier()
+
+    def __len__(self):
+        return len(self.local)
+
+    def _key(self, key):
+        generation = index_generation() if self.per_generation else "-"
+        return f"agentwinter:{REPO_ID}:{self.name}:{generation}:{_digest(key)}"
+
+    def get(self, key, default=None):
+        full_key = self._key(key)
+        missing = object()
+        value = self.local.get(full_key, missing)
+        if value is not missing:
+            return value
+        data = self.shared.get(full_key)
+        if data is None:
+            return default
+        try:
+            text = zlib.decompress(data)
+            value = json.loads(text)
+        except (zlib.error, ValueError):
+            return default
+        self.local.put(full_key, value, size=len(text))
+        return value
+
+    def put(self, key, value):
+        full_key = self._key(key)
+        try:
+            text = json.dumps(value, separators=(",", ":")).encode()
+        except (TypeError, ValueError):
+            self.local.put(full_key, value)  # not JSON-able: this process only
+            return
+        # The JSON length stands in for the in-memory size (no second pass);
+        # L2 gets it zlib-compressed, since results are mostly repetitive text
+        self.local.put(full_key, value, size=len(text))
+        self.shared.set(full_key, zlib.compress(text, 6), self.ttl)
+
+    def get_or_compute(self, key, compute):
+        """get(), else compute() and put() it (None isn't cached)"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            if value is not None:
+                self.put(key, value)
+        return value
+
+    def clear(self):
+        """Clear this process's tier (other processes may still use L2)"""
+        self.local.clear()
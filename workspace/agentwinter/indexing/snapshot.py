@@ -0,0 +1,372 @@
+"""On-disk symbol index snapshot for instant startup"""
+
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Mapping, MutableMapping
+
+from .facts_store import CACHE_DIR, FACTS_VERSION, get_facts_store
+from .indexer import KINDS, index_from_file_symbols
+from .name_index import SUGGESTION_LIMIT, NameIndex
+from .parser import (
+    TIMEOUT_REASON,
+    get_partial_files,
+    parse_with_tree_sitter,
+    restore_parse_report,
+)
+
+SNAPSHOT_PATH = os.path.join(CACHE_DIR, "index.db")
+
+# Bump whenever the schema or what gets stored changes
+SNAPSHOT_VERSION = 2
+
+# SQLite maps the file instead of read()ing pages into its own cache
+MMAP_BYTES = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE files (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE);
+CREATE TABLE symbols (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL
+);
+CREATE INDEX symbols_nocase ON symbols (name COLLATE NOCASE);
+CREATE TABLE postings (
+    symbol_id INTEGER NOT NULL,
+    role INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    PRIMARY KEY (symbol_id, role, file_id, kind)
+) WITHOUT ROWID;
+CREATE INDEX postings_by_file ON postings (file_id, role, symbol_id, kind);
+CREATE TABLE by_kind (
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (kind, name)
+) WITHOUT ROWID;
+"""
+
+# postings.role
+DEFINED, USED = 0, 1
+
+
+def save_snapshot(symbol_index, parsed_files, fingerprint, path=SNAPSHOT_PATH):
+    """Write symbol_index to disk, stamped with the manifest fingerprint.
+
+    Written to a temp file and renamed into place, so a reader never sees a
+    half-written snapshot.
+    """
+    tmp_path = path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        file_ids = {p: i for i, p in enumerate(parsed_files)}
+        symbol_ids = {name: i for i, name in enumerate(symbol_index)}
+
+        postings = []
+        for filepath, (defined, used) in symbol_index.file_symbols.items():
+            file_id = file_ids.setdefault(filepath, len(file_ids))
+            postings.extend(
+                (symbol_ids[name], DEFINED, file_id, kind) for name, kind in defined
+            )
+            postings.extend((symbol_ids[name], USED, file_id, "") for name in used)
+
+        meta = {
+            "version": SNAPSHOT_VERSION,
+            "facts_version": FACTS_VERSION,
+            "fingerprint": fingerprint,
+            "symbols": len(symbol_ids),
+            "files": len(file_ids),
+            "partial_files": json.dumps(get_partial_files()),
+        }
+
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.executescript("PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF;")
+            conn.executescript(SCHEMA)
+            conn.executemany(
+                "INSERT INTO meta VALUES (?, ?)",
+                [(k, str(v)) for k, v in meta.items()],
+            )
+            conn.executemany(
+                "INSERT INTO files VALUES (?, ?)",
+                [(i, p) for p, i in file_ids.items()],
+            )
+            conn.executemany(
+                "INSERT INTO symbols VALUES (?, ?, ?)",
+                [
+                    (i, name, symbol_index[name]["kind"])
+                    for name, i in symbol_ids.items()
+                ],
+            )
+            conn.executemany("INSERT INTO postings VALUES (?, ?, ?, ?)", postings)
+            conn.executemany(
+                "INSERT INTO by_kind VALUES (?, ?)",
+                [(kind, name) for kind in KINDS for name in symbol_index.by_kind[kind]],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp_path, path)
+        return True
+    except (OSError, sqlite3.Error):
+        return False
+
+
+def load_snapshot(fingerprint, path=SNAPSHOT_PATH):
+    """SnapshotIndex for path if it was written for this exact manifest, else None"""
+    if not os.path.exists(path):
+        return None
+    try:
+        conn = sqlite3.connect(
+            f"file:{path}?mode=ro", uri=True, check_same_thread=False
+        )
+        conn.execute(f"PRAGMA mmap_size={MMAP_BYTES}")
+        meta = dict(conn.execute("SELECT key, value FROM meta"))
+    except sqlite3.Error:
+        return None
+
+    if (
+        meta.get("version") != str(SNAPSHOT_VERSION)
+        or meta.get("facts_version") != str(FACTS_VERSION)
+        or meta.get("fingerprint") != fingerprint
+    ):
+        conn.close()
+        return None
+
+    partial = json.loads(meta.get("partial_files", "{}"))
+    if any(reason == TIMEOUT_REASON for _, reason in partial.values()):
+        # Rebuild, so the timed-out files get a full parse this time
+        conn.close()
+        return None
+
+    restore_parse_report(partial)
+    return SnapshotIndex(conn, meta)
+
+
+def clear_snapshot(path=SNAPSHOT_PATH):
+    """Delete the on-disk snapshot"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class SnapshotIndex(Mapping):
+    """Read-only SymbolIndex backed by the on-disk snapshot.
+
+    Opening it costs the same for 100 files or 100k: entries are read (and
+    cached) only when looked up. The first apply_file/remove_file (watch
+    mode) thaws it into an in-memory SymbolIndex and delegates from then on.
+    """
+
+    def __init__(self, conn, meta):
+        self.conn = conn
+        self.lock = threading.Lock()
+        self.meta = meta
+        self._entries = {}
+        self._sorted = {}
+        self._names = None
+        self._live = None
+
+    def _query(self, sql, args=()):
+        with self.lock:
+            return self.conn.execute(sql, args).fetchall()
+
+    def __getitem__(self, symbol):
+        if self._live is not None:
+            return self._live[symbol]
+        entry = self._entries.get(symbol)
+        if entry is None:
+            rows = self._query(
+                "SELECT s.kind, p.role, f.path FROM symbols s "
+                "JOIN postings p ON p.symbol_id = s.id "
+                "JOIN files f ON f.id = p.file_id "
+                "WHERE s.name = ? ORDER BY p.role, p.file_id",
+                (symbol,),
+            )
+            if not rows:
+                raise KeyError(symbol)
+            entry = {"defined_in": {}, "used_in": {}, "kind": rows[0][0]}
+            for _, role, filepath in rows:
+                entry["used_in" if role == USED else "defined_in"][filepath] = None
+            self._entries[symbol] = entry
+        return entry
+
+    def __contains__(self, symbol):
+        if self._live is not None:
+            return symbol in self._live
+        if symbol in self._entries:
+            return True
+        return bool(self._query("SELECT 1 FROM symbols WHERE name = ?", (symbol,)))
+
+    def __iter__(self):
+        if self._live is not None:
+            return iter(self._live)
+        return (name for (name,) in self._query("SELECT name FROM symbols ORDER BY id"))
+
+    def __len__(self):
+        if self._live is not None:
+            return len(self._live)
+        return int(self.meta["symbols"])
+
+    def names_of_kind(self, kind):
+        """Sorted symbol names of one kind"""
+        if self._live is not None:
+            return self._live.names_of_kind(kind)
+        names = self._sorted.get(kind)
+        if names is None:
+            names = self._sorted[kind] = [
+                name
+                for (name,) in self._query(
+                    "SELECT name FROM by_kind WHERE kind = ? ORDER BY name", (kind,)
+                )
+            ]
+        return names
+
+    def first_definition(self, symbol):
+        """First file that defines symbol, or None"""
+        if self._live is not None:
+            return self._live.first_definition(symbol)
+        entry = self.get(symbol)
+        return next(iter(entry["defined_in"]), None) if entry else None
+
+    def symbols_in_file(self, filepath):
+        """(defined, used) for filepath: ((name, kind), ...) and (name, ...)"""
+        if self._live is not None:
+            return self._live.symbols_in_file(filepath)
+        rows = self._query(
+            "SELECT p.role, s.name, p.kind FROM files f "
+            "JOIN postings p ON p.file_id = f.id "
+            "JOIN symbols s ON s.id = p.symbol_id "
+            "WHERE f.path = ? ORDER BY p.role, p.symbol_id",
+            (filepath,),
+        )
+        defined = tuple((name, kind) for role, name, kind in rows if role == DEFINED)
+        used = tuple(name for role, name, _ in rows if role == USED)
+        return defined, used
+
+    def name_index(self):
+        """Prefix/trigram index over symbol names (built on first use)"""
+        if self._live is not None:
+            return self._live.name_index()
+        if self._names is None:
+            self._names = NameIndex(iter(self))
+        return self._names
+
+    def resolve(self, name):
+        """Exact symbol for name, falling back to a unique case-insensitive match"""
+        if self._live is not None:
+            return self._live.resolve(name)
+        if name in self:
+            return name
+        matches = self._query(
+            "SELECT name FROM symbols WHERE name = ? COLLATE NOCASE LIMIT 2", (name,)
+        )
+        return matches[0][0] if len(matches) == 1 else None
+
+    def suggest(self, name, limit=SUGGESTION_LIMIT):
+        """[(symbol, score)] closest names, for 'did you mean' on a miss"""
+        return self.name_index().similar(name, limit)
+
+    def thaw(self):
+        """Load the whole snapshot into an in-memory SymbolIndex"""
+        if self._live is None:
+            paths = dict(self._query("SELECT id, path FROM files"))
+            names = dict(self._query("SELECT id, name FROM symbols ORDER BY id"))
+            per_file = {}
+            for file_id, role, symbol_id, kind in self._query(
+                "SELECT file_id, role, symbol_id, kind FROM postings "
+                "ORDER BY file_id, role, symbol_id"
+            ):
+                defined, used = per_file.setdefault(file_id, ([], []))
+                if role == DEFINED:
+                    defined.append((names[symbol_id], kind))
+                else:
+                    used.append(names[symbol_id])
+            self._live = index_from_file_symbols(
+                (paths[file_id], tuple(defined), tuple(used))
+                for file_id, (defined, used) in sorted(per_file.items())
+            )
+            self._entries.clear()
+            self._names = None
+        return self._live
+
+    @property
+    def file_symbols(self):
+        return self.thaw().file_symbols
+
+    @property
+    def by_kind(self):
+        return self.thaw().by_kind
+
+    def apply_file(self, filepath, old_facts, new_facts):
+        """Replace filepath's contribution (thaws the snapshot first)"""
+        self.thaw().apply_file(filepath, old_facts, new_facts)
+
+    def remove_file(self, filepath):
+        """Drop everything filepath defined or used (thaws the snapshot first)"""
+        self.thaw().remove_file(filepath)
+
+    def parsed_files(self):
+        """Lazy parsed_files mapping over the files this snapshot indexed"""
+        return SnapshotFiles(self)
+
+
+class SnapshotFiles(MutableMapping):
+    """parsed_files view for a snapshot: path -> FileFacts, loaded on access.
+
+    Facts come from the facts store one file at a time (falling back to a
+    fresh parse if the row is gone). Watch mode can set/delete entries as
+    with the plain dict parse_all_files returns.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self._paths = None
+        self._loaded = {}
+
+    @property
+    def paths(self):
+        if self._paths is None:
+            rows = self.snapshot._query("SELECT path FROM files ORDER BY id")
+            self._paths = dict.fromkeys(path for (path,) in rows)
+        return self._paths
+
+    def __getitem__(self, filepath):
+        facts = self._loaded.get(filepath)
+        if facts is not None:
+            return facts
+        if filepath not in self.paths:
+            raise KeyError(filepath)
+        store = get_facts_store()
+        facts = store.get(filepath) if store else None
+        if facts is None:
+            facts = parse_with_tree_sitter(filepath)
+        if facts is None:
+            raise KeyError(filepath)
+        self._loaded[filepath] = facts
+        return facts
+
+    def __setitem__(self, filepath, facts):
+        self.paths[filepath] = None
+        self._loaded[filepath] = facts
+
+    def __delitem__(self, filepath):
+        del self.paths[filepath]
+        self._loaded.pop(filepath, None)
+
+    def __contains__(self, filepath):
+        return filepath in self.paths
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def __len__(self):
+        if self._paths is None:
+            return int(self.snapshot.meta["files"])
+        return len(self._paths)
@@ -0,0 +1,284 @@
+"""In-memory trigram index over source lines for fast literal/regex search"""
+
+import re
+import threading
+from array import array
+
+from .discovery import get_manifest
+from .parser import MAX_FILE_BYTES
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+MAX_RESULTS = 50
+MAX_LINE_CHARS = 200
+# How long a search waits for a background build before giving up
+BUILD_WAIT_SECONDS = 30
+
+
+def _trigrams(text):
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _split_lines(text):
+    """Lines numbered the way editors, grep and FileFacts.line_offsets do:
+    split on "\n" only (str.splitlines also breaks on \x0c, \u2028...)"""
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    return [line[:-1] if line.endswith("\r") else line for line in lines]
+
+
+def _literal_runs(pattern, flags=0):
+    """Literal substrings every match of pattern must contain, or None if
+    they can't be worked out (then every line is a candidate).
+
+    Only looks at the top level: a run is a sequence of plain characters;
+    anything else (classes, groups, repeats, alternation) ends it.
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except Exception:
+        return None
+    runs, current = [], []
+    for op, arg in parsed:
+        if op is sre_parse.LITERAL:
+            current.append(chr(arg))
+            continue
+        if op is sre_parse.BRANCH:
+            return None
+        runs.append("".join(current))
+        current = []
+    runs.append("".join(current))
+    return [run for run in runs if len(run) >= 3]
+
+
+class TextIndex:
+    """Trigram index over the distinct lines of every source file.
+
+    Source code repeats itself a lot (imports, braces, boilerplate), so
+    lines are interned: each distinct line gets an id, its lowercased
+    trigrams go into the postings once, and files are arrays of line ids.
+    A search intersects postings to get candidate lines, checks only those,
+    then maps them back to file:line.
+
+    Updated per file by the watcher; build() only re-reads files whose
+    manifest entry changed since the last build.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.ready = threading.Event()
+        self.line_ids = {}  # line text -> id
+        self.texts = []  # id -> line text (None once unused)
+        self.free_ids = []
+        self.grams = {}  # trigram -> {line id: None}
+        self.line_files = {}  # line id -> {path: None}
+        self.file_lines = {}  # path -> array of line ids, in file order
+        self.file_keys = {}  # path -> manifest stat key at index time
+        self.searches = 0
+        self.builder = None
+        self.build_error = None  # why the last build() failed, if it did
+
+    def __len__(self):
+        return len(self.file_lines)
+
+    def _intern(self, line):
+        line_id = self.line_ids.get(line)
+        if line_id is not None:
+            return line_id
+        if self.free_ids:
+            line_id = self.free_ids.pop()
+            self.texts[line_id] = line
+        else:
+            line_id = len(self.texts)
+            self.texts.append(line)
+        self.line_ids[line] = line_id
+        for gram in _trigrams(line.lower()):
+            bucket = self.grams.get(gram)
+            if bucket is None:
+                bucket = self.grams[gram] = {}
+            bucket[line_id] = None
+        return line_id
+
+    def _release(self, line_id):
+        line = self.texts[line_id]
+        del self.line_ids[line]
+        del self.line_files[line_id]
+        for gram in _trigrams(line.lower()):
+            bucket = self.grams.get(gram)
+            if bucket is not None:
+                bucket.pop(line_id, None)
+                if not bucket:
+                    del self.grams[gram]
+        self.texts[line_id] = None
+        self.free_ids.append(line_id)
+
+    def _remove(self, path):
+        ids = self.file_lines.pop(path, None)
+        self.file_keys.pop(path, None)
+        if ids is None:
+            return
+        for line_id in set(ids):
+            files = self.line_files[line_id]
+            files.pop(path, None)
+            if not files:
+                self._release(line_id)
+
+    def _add(self, path, text, key=None):
+        self._remove(path)
+        ids = array("I", map(self._intern, _split_lines(text)))
+        for line_id in set(ids):
+            files = self.line_files.get(line_id)
+            if files is None:
+                files = self.line_files[line_id] = {}
+            files[path] = None
+        self.file_lines[path] = ids
+        self.file_keys[path] = key
+
+    def _read(self, path, size=None):
+        if size is not None and size > MAX_FILE_BYTES:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                return f.read(MAX_FILE_BYTES + 1)[:MAX_FILE_BYTES]
+        except OSError:
+            return None
+
+    def build(self, manifest=None):
+        """Index every file in the manifest (re-reading only changed ones).
+
+        A failure is kept in build_error for search() to report, and ready
+        is set either way, so nothing waits on a build that died.
+        """
+        try:
+            manifest = manifest or get_manifest()
+            with self.lock:
+                for path in [p for p in self.file_lines if p not in manifest]:
+                    self._remove(path)
+                for path, entry in manifest.files.items():
+                    if (
+                        path in self.file_lines
+                        and self.file_keys[path] == entry.stat_key
+                    ):
+                        continue
+                    text = self._read(path, entry.size)
+                    if text is None:
+                        self._remove(path)
+                    else:
+                        self._add(path, text, entry.stat_key)
+            self.build_error = None
+        except Exception as e:
+            self.build_error = e
+        finally:
+            self.ready.set()
+
+    def build_in_background(self, manifest=None):
+        """build() in a daemon thread; searches wait until it finishes"""
+        self.ready.clear()
+        self.builder = threading.Thread(
+            target=self.build, args=(manifest,), daemon=True
+        )
+        self.builder.start()
+        return self.builder
+
+    def update_file(self, path):
+        """Re-index one file after a watcher event (drops it if unreadable)"""
+        entry = get_manifest().get(path)
+        text = self._read(path, entry.size if entry else None)
+        with self.lock:
+            if text is None:
+                self._remove(path)
+            else:
+                self._add(path, text, entry.stat_key if entry else None)
+
+    def remove_file(self, path):
+        with self.lock:
+            self._remove(path)
+
+    def _candidates(self, needles):
+        """Line ids whose text may contain every needle (None = all lines)"""
+        grams = set()
+        for needle in needles:
+            grams |= _trigrams(needle.lower())
+        if not grams:
+            return None
+        buckets = sorted((self.grams.get(g, {}) for g in grams), key=len)
+        result = set(buckets[0])
+        for bucket in buckets[1:]:
+            if not result:
+                break
+            result.intersection_update(bucket)
+        return result
+
+    def search(
+        self,
+        query,
+        regex=False,
+        case_sensitive=False,
+        path_prefix=None,
+        max_results=MAX_RESULTS,
+    ):
+        """(matches, total): [(path, line_number, line)] sorted by path and
+        line, cut at max_results; total counts every match. Matching is per
+        line, like grep. Raises re.error for a bad regex, and RuntimeError if
+        the index isn't built after BUILD_WAIT_SECONDS or its build failed.
+        """
+        flags = 0 if case_sensitive else re.IGNORECASE
+        if regex:
+            matcher = re.compile(query, flags)
+            needles = _literal_runs(query, flags)
+        else:
+            matcher = re.compile(re.escape(query), flags)
+            needles = [query]
+
+        if self.builder is None and not self.ready.is_set():
+            self.build()
+        if not self.ready.wait(BUILD_WAIT_SECONDS):
+            raise RuntimeError("Search index is still building, try again shortly")
+        if self.build_error is not None:
+            raise RuntimeError(f"Search index build failed: {self.build_error}")
+        with self.lock:
+            self.searches += 1
+            candidates = self._candidates(needles) if needles is not None else None
+            if candidates is None:
+                candidates = [i for i, t in enumerate(self.texts) if t is not None]
+
+            hits = {}  # path -> {line id: None}
+            for line_id in candidates:
+                if not matcher.search(self.texts[line_id]):
+                    continue
+                for path in self.line_files[line_id]:
+                    if path_prefix and not path.startswith(path_prefix):
+                        continue
+                    hits.setdefault(path, {})[line_id] = None
+
+            matches, total = [], 0
+            for path in sorted(hits):
+                wanted = hits[path]
+                for number, line_id in enumerate(self.file_lines[path], 1):
+                    if line_id not in wanted:
+                        continue
+                    total += 1
+                    if len(matches) < max_results:
+                        line = self.texts[line_id].strip()[:MAX_LINE_CHARS]
+                        matches.append((path, number, line))
+            return matches, total
+
+    def stats(self):
+        return {
+            "files": len(self.file_lines),
+            "lines": len(self.line_ids),
+            "trigrams": len(self.grams),
+            "searches": self.searches,
+        }
+
+
+_text_index = TextIndex()
+
+
+def get_text_index():
+    """Shared index used by the code_search tool"""
+    return _text_index
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Per-file fact extraction benchmark: legacy recursive visitor vs the
+precompiled query pass (and its TreeCursor fallback).
+
+Parsing is done once up front, so only extraction is timed.
+
+Usage (from the repo root):
+    python3 workspace/benchmarks/bench_extraction.py
+    python3 workspace/benchmarks/bench_extraction.py --repeat 20 "src/**/*.tsx"
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from agentwinter.indexing import parser as aw_parser  # noqa: E402
+
+
+def legacy_extract(tree, code, file_path):
+    """The recursive visit() extractor this benchmark measures against"""
+    facts = {
+        "imports": [],
+        "functions": [],
+        "components": [],
+        "stores": [],
+        "file_path": file_path,
+    }
+
+    def extract_text(node):
+        return code[node.start_byte : node.end_byte].decode("utf-8", errors="ignore")
+
+    def visit(node):
+        if node.type == "import_statement":
+            for child in node.children:
+                if child.type == "string":
+                    source = extract_text(child).strip("\"'")
+                    for n in node.children:
+                        if n.type == "import_clause":
+                            for spec in n.children:
+                                if spec.type in ["identifier", "import_specifier"]:
+                                    name = extract_text(spec).split(" as ")[0].strip()
+                                    facts["imports"].append({"name": name, "from": source})
+
+        if node.type in ["function_declaration", "function_expression"]:
+            for child in node.children:
+                if child.type == "identifier":
+                    facts["functions"].append(extract_text(child))
+                    break
+
+        if node.type == "lexical_declaration":
+            for child in node.children:
+                if child.type == "variable_declarator":
+                    name_node = child.child_by_field_name("name")
+                    if name_node:
+                        name = extract_text(name_node)
+                        value_node = child.child_by_field_name("value")
+                        if value_node:
+                            value_text = extract_text(value_node)
+                            if "createStore" in value_text or "Store" in name:
+                                facts["stores"].append(name)
+                            elif "=>" in value_text:
+                                facts["components"].append(name)
+
+        for child in node.children:
+            visit(child)
+
+    visit(tree.root_node)
+    return facts
+
+
+def query_extract(tree, code, file_path):
+    query = aw_parser._get_query(aw_parser._language_for(file_path))
+    return aw_parser._extract_with_query(query, tree, code, file_path)
+
+
+EXTRACTORS = {
+    "legacy visit()": legacy_extract,
+    "query": query_extract,
+    "cursor fallback": aw_parser._extract_with_cursor,
+}
+
+
+def load_trees(patterns):
+    files = sorted({f for p in patterns for f in glob.glob(p, recursive=True)})
+    trees = []
+    for path in files:
+        if not os.path.isfile(path):
+            continue
+        with open(path, "rb") as f:
+            code = f.read()
+        tree = aw_parser._get_parser(aw_parser._language_for(path)).parse(code)
+        trees.append((path, code, tree))
+    return trees
+
+
+def bench(extract, trees, repeat):
+    """Best-of-`repeat` extraction time per file, in microseconds"""
+    per_file = []
+    for path, code, tree in trees:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            try:
+                extract(tree, code, path)
+            except RecursionError:
+                best = float("nan")
+                break
+            best = min(best, time.perf_counter() - start)
+        per_file.append((best * 1e6, len(code), path))
+    return per_file
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument(
+        "patterns",
+        nargs="*",
+        default=["src/**/*.ts", "src/**/*.tsx", "src/**/*.js", "src/**/*.jsx"],
+    )
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--top", type=int, default=5, help="slowest files to list")
+    args = ap.parse_args()
+
+    if not aw_parser.TREE_SITTER_AVAILABLE:
+        sys.exit("tree-sitter not available")
+
+    trees = load_trees(args.patterns)
+    total_kb = sum(len(code) for _, code, _ in trees) / 1024
+    print(f"{len(trees)} files, {total_kb:.0f} KB, best of {args.repeat}\n")
+    print(f"{'extractor':<18}{'median µs':>12}{'mean µs':>12}{'total ms':>12}{'MB/s':>10}")
+
+    results = {}
+    for name, extract in EXTRACTORS.items():
+        per_file = bench(extract, trees, args.repeat)
+        times = [t for t, _, _ in per_file if t == t]
+        results[name] = per_file
+        total = sum(times)
+        print(
+            f"{name:<18}{statistics.median(times):>12.1f}"
+            f"{statistics.mean(times):>12.1f}{total / 1000:>12.2f}"
+            f"{(total_kb / 1024) / (total / 1e6):>10.1f}"
+        )
+        failed = len(per_file) - len(times)
+        if failed:
+            print(f"{'':<18}({failed} files hit the recursion limit)")
+
+    print("\nSlowest files (legacy -> query):")
+    legacy = {p: t for t, _, p in results["legacy visit()"]}
+    for t, size, path in sorted(results["query"], reverse=True)[: args.top]:
+        print(f"  {path} ({size / 1024:.0f} KB): {legacy[path]:.0f} -> {t:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
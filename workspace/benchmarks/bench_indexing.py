@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+End-to-end indexing benchmark on synthetic SolidJS corpora.
+
+For each corpus size and parser (tree-sitter / regex) this times
+parse_all_files, build_index, build_import_graph and run_treesitter_query,
+and reports throughput and peak RSS. Each (size, parser) run happens in its
+own subprocess so peak RSS isn't polluted by earlier runs. Results can be
+saved as a baseline and later runs compared against it.
+
+Usage (from the repo root):
+    python3 workspace/benchmarks/bench_indexing.py --sizes 1k,10k
+    python3 workspace/benchmarks/bench_indexing.py --sizes 1k --save-baseline
+    python3 workspace/benchmarks/bench_indexing.py --sizes 100k --parsers regex
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKSPACE_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, WORKSPACE_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from corpus import ensure_corpus  # noqa: E402
+
+DEFAULT_CORPUS_DIR = os.path.join(WORKSPACE_DIR, ".agentwinter", "bench-corpus")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline_indexing.json")
+STAGES = (
+    "parse_all_files",
+    "build_index",
+    "build_import_graph",
+    "run_treesitter_query",
+)
+PARSERS = ("treesitter", "regex")
+QUERY = '(call_expression function: (identifier) @fn (#eq? @fn "createStore"))'
+
+
+def parse_size(text):
+    """'1k' -> 1000, '100k' -> 100000, '2500' -> 2500"""
+    text = text.strip().lower()
+    if text.endswith("k"):
+        return int(float(text[:-1]) * 1000)
+    return int(text)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_one(corpus_root, parser_name, skip):
+    """Child process: run every stage once on corpus_root, return a result dict"""
+    os.chdir(corpus_root)
+    # Keep the facts store out of the way - we want cold parses
+    os.environ.setdefault(
+        "AGENTWINTER_CACHE_DIR", os.path.join(corpus_root, ".agentwinter")
+    )
+
+    from agentwinter.indexing import parser as aw_parser
+    from agentwinter.indexing.discovery import scan_sources
+    from agentwinter.indexing.indexer import build_index
+    from agentwinter.capabilities.dependency_graph import build_import_graph
+    from agentwinter.capabilities.run_treesitter_query import run_treesitter_query
+
+    if parser_name == "regex":
+        aw_parser.TREE_SITTER_AVAILABLE = False
+
+    result = {"stages": {}}
+    start = time.perf_counter()
+    manifest = scan_sources("src/")
+    result["stages"]["scan_sources"] = time.perf_counter() - start
+    total_bytes = sum(f.size for f in manifest.files.values())
+
+    start = time.perf_counter()
+    parsed_files, parsed_count, total_files = aw_parser.parse_all_files(
+        use_store=False, manifest=manifest
+    )
+    elapsed = time.perf_counter() - start
+    result["stages"]["parse_all_files"] = elapsed
+    result["files"] = total_files
+    result["parsed"] = parsed_count
+    result["files_per_s"] = total_files / elapsed if elapsed else 0.0
+    result["mb_per_s"] = total_bytes / (1024 * 1024) / elapsed if elapsed else 0.0
+
+    start = time.perf_counter()
+    symbol_index = build_index(parsed_files)
+    result["stages"]["build_index"] = time.perf_counter() - start
+    result["symbols"] = len(symbol_index)
+
+    if "build_import_graph" not in skip:
+        start = time.perf_counter()
+        graph = build_import_graph(parsed_files)
+        result["stages"]["build_import_graph"] = time.perf_counter() - start
+        result["graph_edges"] = len(graph["edges"])
+
+    if "run_treesitter_query" not in skip and aw_parser.TREE_SITTER_AVAILABLE:
+        start = time.perf_counter()
+        run_treesitter_query(QUERY, "tsx", max_results=20)
+        result["stages"]["run_treesitter_query"] = time.perf_counter() - start
+
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def run_in_subprocess(corpus_root, parser_name, skip):
+    """Run one configuration in a fresh interpreter and collect its JSON"""
+    cmd = [
+        sys.executable,
+        os.path.abspath(__file__),
+        "--child",
+        corpus_root,
+        parser_name,
+        "--skip",
+        ",".join(skip),
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(
+            proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed"
+        )
+    # Last stdout line is the JSON result (earlier lines may be parser warnings)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, tolerance):
+    """Print per-metric deltas against baseline; return list of regressions"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        metrics = dict(result["stages"], peak_rss_mb=result["peak_rss_mb"])
+        base_metrics = dict(base["stages"], peak_rss_mb=base["peak_rss_mb"])
+        for metric, value in metrics.items():
+            old = base_metrics.get(metric)
+            if not old or old < 1e-3:
+                continue
+            change = (value - old) / old
+            if change > tolerance:
+                regressions.append((key, metric, old, value, change))
+    return regressions
+
+
+def print_table(results):
+    header = f"{'config':<18}{'files':>8}{'files/s':>10}{'MB/s':>8}"
+    header += "".join(f"{stage[:12]:>14}" for stage in STAGES) + f"{'peak MB':>10}"
+    print(header)
+    for key, r in results.items():
+        row = f"{key:<18}{r['files']:>8}{r['files_per_s']:>10.0f}{r['mb_per_s']:>8.2f}"
+        for stage in STAGES:
+            value = r["stages"].get(stage)
+            row += f"{value:>13.3f}s" if value is not None else f"{'-':>14}"
+        row += f"{r['peak_rss_mb']:>10.0f}"
+        print(row)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument(
+        "--sizes", default="1k,10k", help="comma-separated, e.g. 1k,10k,100k"
+    )
+    ap.add_argument("--parsers", default=",".join(PARSERS))
+    ap.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument(
+        "--skip", default="", help="stages to skip, e.g. build_import_graph"
+    )
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument(
+        "--tolerance", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)"
+    )
+    ap.add_argument("--json", help="also write results to this file")
+    ap.add_argument(
+        "--child", nargs=2, metavar=("CORPUS", "PARSER"), help=argparse.SUPPRESS
+    )
+    args = ap.parse_args()
+
+    skip = {s.strip() for s in args.skip.split(",") if s.strip()}
+    if args.child:
+        print(json.dumps(run_one(args.child[0], args.child[1], skip)))
+        return
+
+    results = {}
+    for size_text in args.sizes.split(","):
+        size = parse_size(size_text)
+        root = os.path.join(os.path.abspath(args.corpus_dir), str(size))
+        start = time.perf_counter()
+        written = ensure_corpus(root, size, args.seed)
+        print(
+            f"📁 Corpus {size_text}: {written} files ({time.perf_counter() - start:.1f}s to prepare)"
+        )
+        for parser_name in args.parsers.split(","):
+            key = f"{size_text}/{parser_name}"
+            print(f"⏱️  {key}...", flush=True)
+            try:
+                results[key] = run_in_subprocess(root, parser_name, skip)
+            except (RuntimeError, ValueError) as e:
+                print(f"❌ {key} failed: {e}")
+
+    if not results:
+        sys.exit(1)
+
+    print()
+    print_table(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+        return
+
+    if not baseline:
+        print("\n(no baseline - run with --save-baseline to record one)")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for key, metric, old, new, change in regressions:
+            print(f"  {key} {metric}: {old:.3f} -> {new:.3f} (+{change:.0%})")
+        sys.exit(1)
+    print(f"\n✅ No regressions beyond {args.tolerance:.0%} against baseline")
+
+
+if __name__ == "__main__":
+    main()
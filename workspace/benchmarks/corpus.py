@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Synthetic SolidJS source tree generator for the indexing benchmarks.
+
+Produces a src/ tree shaped like this project: src/features/<feature>/ with a
+store (createStore + actions), hooks, .tsx arrow components, utils, a
+re-exporting index.ts, plus shared src/types/*.ts. Components import from
+their own store/hooks and from other features' index files, so the import
+graph has realistic fan-in/fan-out. Output is deterministic for a given
+(file count, seed).
+
+Usage (from the repo root):
+    python3 workspace/benchmarks/corpus.py /tmp/corpus-10k --files 10000
+"""
+
+import argparse
+import json
+import os
+import random
+
+GENERATOR_VERSION = 1
+FILES_PER_FEATURE = 20
+MARKER = ".corpus.json"
+
+WORDS = (
+    "profile",
+    "message",
+    "proximity",
+    "activity",
+    "notification",
+    "settings",
+    "auth",
+    "island",
+    "following",
+    "story",
+    "loading",
+    "error",
+    "balance",
+    "canvas",
+    "heart",
+    "conversation",
+    "feed",
+    "search",
+    "badge",
+    "session",
+)
+SOLID_IMPORTS = (
+    "createSignal",
+    "createMemo",
+    "createEffect",
+    "onMount",
+    "onCleanup",
+    "Show",
+    "For",
+)
+
+
+def _pascal(name):
+    return "".join(part[:1].upper() + part[1:] for part in name.split("_"))
+
+
+def _store_file(feature, type_name):
+    pascal = _pascal(feature)
+    return f"""import {{ createStore, produce }} from 'solid-js/store';
+import type {{ {type_name} }} from '../../../types/{feature}';
+
+export const [store, setStore] = createStore({{
+  items: [] as {type_name}[],
+  selectedId: null as string | null,
+  loading: false,
+}});
+
+export const {feature}Actions = {{
+  async load(): Promise<void> {{
+    setStore('loading', true);
+    const items = await fetch('/api/{feature}').then((r) => r.json());
+    setStore('items', items);
+    setStore('loading', false);
+  }},
+
+  select(id: string) {{
+    setStore('selectedId', id);
+  }},
+
+  update(id: string, patch: Partial<{type_name}>) {{
+    setStore(
+      produce((s) => {{
+        const item = s.items.find((i) => i.id === id);
+        if (item) Object.assign(item, patch);
+      }})
+    );
+  }},
+}};
+
+export function get{pascal}Count() {{
+  return store.items.length;
+}}
+"""
+
+
+def _hook_file(feature):
+    pascal = _pascal(feature)
+    return f"""import {{ createMemo, onMount }} from 'solid-js';
+import {{ store, {feature}Actions }} from '../store/{feature}Store';
+
+export function use{pascal}() {{
+  onMount(() => {feature}Actions.load());
+  const selected = createMemo(() =>
+    store.items.find((item) => item.id === store.selectedId)
+  );
+  return {{ store, selected, actions: {feature}Actions }};
+}}
+"""
+
+
+def _types_file(type_name, rng):
+    fields = "\n".join(
+        f"  {w}{i}: {rng.choice(('string', 'number', 'boolean'))};"
+        for i, w in enumerate(rng.sample(WORDS, 6))
+    )
+    return f"""export interface {type_name} {{
+  id: string;
+{fields}
+}}
+
+export type {type_name}Input = Omit<{type_name}, 'id'>;
+"""
+
+
+def _util_file(feature, index, rng):
+    name = f"{feature}Util{index}"
+    body = "\n".join(
+        f"  const v{i} = input.length * {rng.randint(1, 99)} + {i};"
+        for i in range(rng.randint(2, 12))
+    )
+    return f"""export function {name}(input: string): number {{
+{body}
+  return input.length;
+}}
+
+export const format{_pascal(feature)}{index} = (value: number) => value.toFixed(2);
+"""
+
+
+def _component_file(feature, component, others, rng):
+    solid = sorted(rng.sample(SOLID_IMPORTS, 3))
+    lines = [
+        f"import {{ {', '.join(solid)} }} from 'solid-js';",
+        f"import {{ store }} from '../store/{feature}Store';",
+        f"import {{ use{_pascal(feature)} }} from '../hooks/use{_pascal(feature)}';",
+    ]
+    for other_feature, other_component in others:
+        lines.append(f"import {{ {other_component} }} from '../../{other_feature}';")
+
+    children = "\n".join(
+        f'        <div class="row-{i}">{{props.label}} {{store.items.length}}</div>'
+        for i in range(rng.randint(2, 30))
+    )
+    used = "\n".join(f'        <{c} label="nested" />' for _, c in others)
+    lines.append(f"""
+interface {component}Props {{
+  label: string;
+}}
+
+export const {component} = (props: {component}Props) => {{
+  const {{ selected }} = use{_pascal(feature)}();
+  const [open, setOpen] = createSignal(false);
+
+  const handleClick = () => {{
+    setOpen(!open());
+  }};
+
+  return (
+    <Show when={{selected()}}>
+      <section class="{feature}" onClick={{handleClick}}>
+{children}
+{used}
+      </section>
+    </Show>
+  );
+}};
+""")
+    return "\n".join(lines)
+
+
+def _index_file(feature, components):
+    lines = [f"export {{ {c} }} from './components/{c}';" for c in components]
+    lines.append(
+        f"export {{ store as {feature}Store, {feature}Actions }} from './store/{feature}Store';"
+    )
+    lines.append(f"export * from './hooks/use{_pascal(feature)}';")
+    return "\n".join(lines) + "\n"
+
+
+def _feature_names(count):
+    names = []
+    for i in range(count):
+        word = WORDS[i % len(WORDS)]
+        names.append(word if i < len(WORDS) else f"{word}{i // len(WORDS)}")
+    return names
+
+
+def generate_corpus(root, n_files, seed=0):
+    """Write a synthetic src/ tree with about n_files files under root"""
+    rng = random.Random(seed)
+    src = os.path.join(root, "src")
+    features = _feature_names(max(1, n_files // FILES_PER_FEATURE))
+    candidates = []  # (feature, component) pairs other features may import
+    written = 0
+
+    def write(rel_path, text):
+        nonlocal written
+        path = os.path.join(src, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        written += 1
+
+    per_feature = max(1, n_files // len(features))
+    for feature in features:
+        type_name = _pascal(feature) + "Item"
+        write(f"types/{feature}.ts", _types_file(type_name, rng))
+        write(
+            f"features/{feature}/store/{feature}Store.ts",
+            _store_file(feature, type_name),
+        )
+        write(f"features/{feature}/hooks/use{_pascal(feature)}.ts", _hook_file(feature))
+
+        remaining = per_feature - 4
+        n_utils = remaining // 4
+        n_components = max(1, remaining - n_utils)
+        for u in range(n_utils):
+            write(
+                f"features/{feature}/utils/{feature}Util{u}.ts",
+                _util_file(feature, u, rng),
+            )
+
+        components = [f"{_pascal(feature)}View{c}" for c in range(n_components)]
+        # Only link to features written before this one, so there are no
+        # dangling imports when the corpus is cut short
+        for component in components:
+            others = rng.sample(candidates, min(len(candidates), rng.randint(0, 3)))
+            write(
+                f"features/{feature}/components/{component}.tsx",
+                _component_file(feature, component, others, rng),
+            )
+        candidates.extend((feature, c) for c in components[:2])
+        write(f"features/{feature}/index.ts", _index_file(feature, components))
+
+    with open(os.path.join(root, MARKER), "w") as f:
+        json.dump(
+            {
+                "files": n_files,
+                "written": written,
+                "seed": seed,
+                "version": GENERATOR_VERSION,
+            },
+            f,
+        )
+    return written
+
+
+def ensure_corpus(root, n_files, seed=0):
+    """Reuse the corpus at root if it was generated with the same settings"""
+    try:
+        with open(os.path.join(root, MARKER)) as f:
+            marker = json.load(f)
+        if (marker["files"], marker["seed"], marker["version"]) == (
+            n_files,
+            seed,
+            GENERATOR_VERSION,
+        ):
+            return marker["written"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return generate_corpus(root, n_files, seed)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("root", help="directory to create src/ in")
+    ap.add_argument("--files", type=int, default=1000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    written = generate_corpus(args.root, args.files, args.seed)
+    print(f"Wrote {written} files to {os.path.join(args.root, 'src')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Watcher batches apply the same exclusions as source discovery.
+
+Run from the repo root:
+    python3 -m pytest workspace/tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from agentwinter.core.main import handle_file_changes  # noqa: E402
+from agentwinter.indexing.discovery import scan_sources  # noqa: E402
+from agentwinter.indexing.indexer import build_index  # noqa: E402
+from agentwinter.indexing.parser import parse_all_files  # noqa: E402
+from agentwinter.indexing.text_index import get_text_index  # noqa: E402
+
+VISIBLE = os.path.join("src", "app.ts")
+IGNORED = os.path.join("src", "gen", "widget.ts")
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def test_batch_leaves_ignored_file_out_of_every_index(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _write(".gitignore", "src/gen/\n")
+    _write(VISIBLE, "export function AppShell() { return 1 }\n")
+    _write(IGNORED, "export function GeneratedWidget() { return 1 }\n")
+
+    manifest = scan_sources()
+    assert VISIBLE in manifest and IGNORED not in manifest
+    parsed_files, _, _ = parse_all_files(use_store=False, manifest=manifest)
+    symbol_index = build_index(parsed_files)
+    text_index = get_text_index()
+    text_index.build(manifest)
+
+    _write(VISIBLE, "export function AppShellV2() { return 2 }\n")
+    _write(IGNORED, "export function GeneratedWidgetV2() { return 2 }\n")
+    handle_file_changes(
+        {VISIBLE: "modified", IGNORED: "modified"},
+        {"value": ""},
+        parsed_files,
+        symbol_index,
+    )
+
+    assert IGNORED not in manifest
+    assert IGNORED not in parsed_files
+    assert IGNORED not in symbol_index.file_symbols
+    assert "GeneratedWidgetV2" not in symbol_index
+    assert text_index.search("GeneratedWidget")[1] == 0
+
+    # The file next to it is still picked up
+    assert "AppShellV2" in symbol_index
+    assert [path for path, _, _ in text_index.search("AppShellV2")[0]] == [VISIBLE]